@@ -0,0 +1,128 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from dateutil.relativedelta import relativedelta
+from django.db.models import Count, F, Sum, Window
+from django.db.models.functions import ExtractIsoWeekDay, ExtractMonth, Lag, TruncMonth, TruncWeek
+
+WEEKDAY_LABELS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+ANALYTICS_SECTIONS = ('category', 'month', 'week', 'weekday')
+
+
+def delta(total, previous_period, previous_total, expected_period):
+    # Periods without spend have no row, so LAG only holds the previous
+    # period's total when that row is the adjacent one; otherwise it was zero.
+    if previous_period != expected_period:
+        previous_total = Decimal('0')
+    return float(total - (previous_total or Decimal('0')))
+
+
+def by_category(expenses):
+    rows = expenses.values_list('category').annotate(
+        category_total=Sum('amount'),
+        category_count=Count('id')
+    ).order_by('-category_total', 'category')
+    return {
+        'labels': [category for category, _, _ in rows],
+        'totals': [float(total) for _, total, _ in rows],
+        'counts': [count for _, _, count in rows],
+    }
+
+
+def trunc_date(day, trunc):
+    if trunc is TruncMonth:
+        return day.replace(day=1)
+    return day - timedelta(days=day.weekday())
+
+
+def by_period(expenses, start, end, trunc, step, label, yearly_partition=None):
+    """
+    Spend per period overlapping [start, end), counting each period whole, with
+    the change from the previous period and, when ``yearly_partition`` is given,
+    from the same period a year earlier. Both come from LAG window functions over
+    the grouped rows; the query looks back one extra year so the first periods in
+    range have comparisons.
+    """
+    order = F('period').asc()
+    windows = {
+        'previous_period': Window(Lag('period'), order_by=order),
+        'previous_total': Window(Lag('period_total'), order_by=order),
+    }
+    if yearly_partition is not None:
+        windows['year_ago_period'] = Window(Lag('period'), partition_by=[yearly_partition], order_by=order)
+        windows['year_ago_total'] = Window(Lag('period_total'), partition_by=[yearly_partition], order_by=order)
+
+    first_period = trunc_date(start, trunc)
+    rows = expenses.filter(
+        date__gte=first_period - relativedelta(years=1),
+        date__lt=trunc_date(end - timedelta(days=1), trunc) + step
+    ).annotate(period=trunc('date')).values('period').annotate(
+        period_total=Sum('amount'),
+        period_count=Count('id')
+    ).annotate(**windows).order_by('period')
+
+    series = {'periods': [], 'totals': [], 'counts': [], 'deltas': []}
+    if yearly_partition is not None:
+        series['year_over_year_deltas'] = []
+
+    for row in rows:
+        period = row['period']
+        if period < first_period:
+            continue
+        series['periods'].append(label(period))
+        series['totals'].append(float(row['period_total']))
+        series['counts'].append(row['period_count'])
+        series['deltas'].append(
+            delta(row['period_total'], row['previous_period'], row['previous_total'], period - step)
+        )
+        if yearly_partition is not None:
+            series['year_over_year_deltas'].append(
+                delta(row['period_total'], row['year_ago_period'], row['year_ago_total'], period - relativedelta(years=1))
+            )
+    return series
+
+
+def by_weekday(expenses):
+    rows = dict(
+        (weekday, (total, count))
+        for weekday, total, count in expenses.annotate(
+            weekday=ExtractIsoWeekDay('date')
+        ).values_list('weekday').annotate(
+            weekday_total=Sum('amount'),
+            weekday_count=Count('id')
+        ).order_by()
+    )
+    return {
+        'labels': WEEKDAY_LABELS,
+        'totals': [float(rows.get(weekday, (0, 0))[0]) for weekday in range(1, 8)],
+        'counts': [rows.get(weekday, (0, 0))[1] for weekday in range(1, 8)],
+    }
+
+
+def spending_analytics(expenses, start, end, sections=ANALYTICS_SECTIONS):
+    """Build the requested analytics sections for ``expenses`` in [start, end)."""
+    in_range = expenses.filter(date__gte=start, date__lt=end)
+    totals = in_range.aggregate(total=Sum('amount'), count=Count('id'))
+    result = {
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'total': float(totals['total'] or 0),
+        'count': totals['count'],
+    }
+
+    if 'category' in sections:
+        result['category'] = by_category(in_range)
+    if 'month' in sections:
+        result['month'] = by_period(
+            expenses, start, end, TruncMonth, relativedelta(months=1),
+            lambda period: period.strftime('%Y-%m'),
+            yearly_partition=ExtractMonth('period')
+        )
+    if 'week' in sections:
+        result['week'] = by_period(
+            expenses, start, end, TruncWeek, timedelta(weeks=1),
+            lambda period: period.isoformat()
+        )
+    if 'weekday' in sections:
+        result['weekday'] = by_weekday(in_range)
+    return result
@@ -1,6 +1,17 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
 
 
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        from . import filters  # noqa: F401 registers the expense filter index check
+        from .authentication import evict_cached_user
+        from .timing import install_query_timer
+        connection_created.connect(install_query_timer)
+        post_save.connect(evict_cached_user, sender=settings.AUTH_USER_MODEL)
+        post_delete.connect(evict_cached_user, sender=settings.AUTH_USER_MODEL)
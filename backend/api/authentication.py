@@ -1,16 +1,119 @@
+from collections import OrderedDict
+from copy import copy
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .metrics import count_cache_lookup
+from .timing import timed
+
+
+class UserCache:
+    """
+    A small per-process LRU of user objects keyed by id, used to skip the
+    auth_user lookup on every request when AUTH_USER_CACHE_ENABLED is set.
+    Saving or deleting a user evicts their entry in this process; changes made
+    through another process (including deactivation) become visible once the
+    entry expires after AUTH_USER_CACHE_TTL seconds.
+    """
+
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, user_id):
+        # Token claims carry the id as a string; callers may pass an int.
+        user_id = str(user_id)
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is None:
+                count_cache_lookup('auth-user', 'user', hit=False)
+                return None
+            user, expires = entry
+            if expires <= time.monotonic():
+                del self.entries[user_id]
+                count_cache_lookup('auth-user', 'user', hit=False)
+                return None
+            self.entries.move_to_end(user_id)
+            count_cache_lookup('auth-user', 'user', hit=True)
+            return copy(user)
+
+    def set(self, user_id, user):
+        user_id = str(user_id)
+        with self.lock:
+            self.entries[user_id] = (copy(user), time.monotonic() + settings.AUTH_USER_CACHE_TTL)
+            self.entries.move_to_end(user_id)
+            while len(self.entries) > settings.AUTH_USER_CACHE_SIZE:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self.lock:
+            self.entries.pop(str(user_id), None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+user_cache = UserCache()
+
+
+def evict_cached_user(sender, instance, **kwargs):
+    """post_save/post_delete receiver: drop the saved user from this process's cache."""
+    user_cache.invalidate(instance.pk)
+
 
 class CookieJWTAuthentication(JWTAuthentication):
     def authenticate(self, request):
-        access_token = request.COOKIES.get('access_token')
+        with timed('auth'):
+            access_token = request.COOKIES.get('access_token')
         
-        if not access_token:
-            return None
+            if not access_token:
+                return None
         
+            try:
+                validated_token = self.get_validated_token(access_token)
+                user = self.get_user(validated_token)
+                return (user, validated_token)
+            except (InvalidToken, TokenError):
+                return None
+
+    def get_user(self, validated_token):
+        if not settings.AUTH_USER_CACHE_ENABLED:
+            return super().get_user(validated_token)
+
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        user = user_cache.get(user_id)
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(user_id, user)
+            return user
+
+        # Same checks as JWTAuthentication.get_user, against the cached copy.
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(_("The user's password has been changed."), code='password_changed')
+        return user
+
+    async def authenticate_async(self, request):
+        """
+        Resolve the user for async views through the same validation as
+        authenticate (token classes, blacklist, revocation and active checks,
+        which may query the database), run in the sync thread pool.
+        """
         try:
-            validated_token = self.get_validated_token(access_token)
-            user = self.get_user(validated_token)
-            return (user, validated_token)
-        except (InvalidToken, TokenError):
+            result = await sync_to_async(self.authenticate)(request)
+        except AuthenticationFailed:
             return None
+        return result[0] if result else None
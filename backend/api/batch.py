@@ -0,0 +1,117 @@
+
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from .cache import invalidate_user_data
+from .models import Expense, MonthlySpend
+from .serializers import ExpenseSerializer
+
+MAX_BATCH_OPERATIONS = 1000
+BATCH_OPERATIONS = ('create', 'update', 'delete')
+
+
+class BatchError(ValueError):
+    pass
+
+
+def apply_expense_batch(user, operations):
+    """
+    Validate a list of create/update/delete operations together and, when all of
+    them are valid, apply them in one transaction with bulk_create, bulk_update
+    and a single DELETE ... WHERE id IN. Returns ``(ok, results)``.
+    """
+    if not isinstance(operations, list) or not operations:
+        raise BatchError('operations must be a non-empty list')
+    if len(operations) > MAX_BATCH_OPERATIONS:
+        raise BatchError(f'A batch can contain at most {MAX_BATCH_OPERATIONS} operations')
+
+    ids = set()
+    for operation in operations:
+        if isinstance(operation, dict) and operation.get('op') in ('update', 'delete'):
+            try:
+                ids.add(int(operation.get('id')))
+            except (TypeError, ValueError):
+                pass
+    owned = Expense.objects.filter(author=user).in_bulk(ids)
+
+    create_validator = ExpenseSerializer()
+    update_validator = ExpenseSerializer(partial=True)
+
+    results = []
+    to_create = []
+    to_update = []
+    delete_ids = []
+    update_fields = set()
+    seen_ids = set()
+
+    for index, operation in enumerate(operations):
+        if not isinstance(operation, dict) or operation.get('op') not in BATCH_OPERATIONS:
+            results.append({'index': index, 'status': 'error', 'errors': {'op': ['Must be create, update or delete.']}})
+            continue
+
+        op = operation['op']
+        expense = None
+        if op != 'create':
+            try:
+                expense_id = int(operation.get('id'))
+            except (TypeError, ValueError):
+                results.append({'index': index, 'status': 'error', 'errors': {'id': ['A valid id is required.']}})
+                continue
+            if expense_id in seen_ids:
+                results.append({'index': index, 'status': 'error', 'errors': {'id': ['Expense appears more than once in this batch.']}})
+                continue
+            seen_ids.add(expense_id)
+            expense = owned.get(expense_id)
+            if expense is None:
+                results.append({'index': index, 'status': 'error', 'errors': {'id': ['Expense not found.']}})
+                continue
+
+        if op == 'delete':
+            delete_ids.append(expense.id)
+            results.append({'index': index, 'status': 'deleted', 'id': expense.id})
+            continue
+
+        validator = create_validator if op == 'create' else update_validator
+        try:
+            validated = validator.run_validation(operation.get('data') or {})
+        except serializers.ValidationError as exc:
+            results.append({'index': index, 'status': 'error', 'errors': exc.detail})
+            continue
+
+        if op == 'create':
+            expense = Expense(author=user, **validated)
+            to_create.append(expense)
+            results.append({'index': index, 'status': 'created', 'expense': expense})
+        else:
+            for field, value in validated.items():
+                setattr(expense, field, value)
+            update_fields.update(validated)
+            to_update.append(expense)
+            results.append({'index': index, 'status': 'updated', 'expense': expense})
+
+    if any(result['status'] == 'error' for result in results):
+        for result in results:
+            result.pop('expense', None)
+        return False, results
+
+    with transaction.atomic():
+        if delete_ids:
+            Expense.objects.filter(author=user, id__in=delete_ids).delete()
+        if to_create:
+            Expense.objects.bulk_create(to_create)
+        if to_update:
+            now = timezone.now()
+            for expense in to_update:
+                expense.updated_at = now
+            Expense.objects.bulk_update(to_update, sorted(update_fields | {'updated_at'}))
+        # Deletes and bulk_update go through ExpenseQuerySet, which keeps the rollups.
+        MonthlySpend.record(to_create)
+        invalidate_user_data(user.id)
+
+    for result in results:
+        expense = result.pop('expense', None)
+        if expense is not None:
+            result['id'] = expense.id
+            result['data'] = ExpenseSerializer(expense).data
+    return True, results
@@ -0,0 +1,125 @@
+from functools import wraps
+import hashlib
+import time
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.response import Response
+
+from .metrics import count_cache_lookup
+
+DATA_VERSION_KEY = 'spendio:data-version:{user_id}'
+RESPONSE_KEY = 'spendio:response:{scope}:{user_id}:{version}:{variant}'
+COUNTER_KEY = 'spendio:counter:{name}'
+
+
+def get_data_version(user_id):
+    key = DATA_VERSION_KEY.format(user_id=user_id)
+    version = cache.get(key)
+    if version is None:
+        # Seed from the clock so a version evicted from the cache can never
+        # come back with a value that older cached responses were stored under.
+        version = time.time_ns()
+        if not cache.add(key, version, timeout=None):
+            version = cache.get(key, version)
+    return version
+
+
+def bump_data_version(user_id):
+    key = DATA_VERSION_KEY.format(user_id=user_id)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        version = time.time_ns()
+        cache.set(key, version, timeout=None)
+        return version
+
+
+def invalidate_user_data(user_id):
+    transaction.on_commit(lambda: bump_data_version(user_id))
+
+
+def increment_counter(name, delta=1):
+    key = COUNTER_KEY.format(name=name)
+    try:
+        return cache.incr(key, delta)
+    except ValueError:
+        cache.add(key, 0, timeout=None)
+        return cache.incr(key, delta)
+
+
+def get_counter(name):
+    return cache.get(COUNTER_KEY.format(name=name), 0)
+
+
+def get_cache_stats(scopes):
+    stats = {}
+    for scope in scopes:
+        hits = get_counter(f'response-cache:{scope}:hits')
+        misses = get_counter(f'response-cache:{scope}:misses')
+        stats[scope] = {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': hits / (hits + misses) if hits + misses else 0
+        }
+    return stats
+
+
+def response_cache_key(scope, request):
+    variant = '&'.join(f'{key}={value}' for key, value in sorted(request.query_params.items()))
+    # Period views resolve "current month/year" at request time.
+    variant = f'{timezone.now().date().isoformat()}?{variant}'
+    return RESPONSE_KEY.format(
+        scope=scope,
+        user_id=request.user.id,
+        version=get_data_version(request.user.id),
+        variant=hashlib.sha1(variant.encode('utf-8')).hexdigest()
+    )
+
+
+CACHED_SCOPES = []
+
+
+def cache_per_user(scope):
+    CACHED_SCOPES.append(scope)
+
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            if not settings.RESPONSE_CACHE_ENABLED:
+                return method(self, request, *args, **kwargs)
+            
+            key = response_cache_key(scope, request)
+            data = cache.get(key)
+            if data is not None:
+                increment_counter(f'response-cache:{scope}:hits')
+                count_cache_lookup('response', scope, hit=True)
+                return Response(data)
+
+            increment_counter(f'response-cache:{scope}:misses')
+            count_cache_lookup('response', scope, hit=False)
+            response = method(self, request, *args, **kwargs)
+            if response.status_code == 200:
+                cache.set(key, response.data, timeout=settings.RESPONSE_CACHE_TIMEOUT)
+            return response
+        return wrapper
+    return decorator
+
+
+@checks.register(checks.Tags.caches)
+def check_shared_response_cache(app_configs=None, **kwargs):
+    """Cached responses are only invalidated everywhere when workers share the cache."""
+    backend = settings.CACHES['default']['BACKEND']
+    if settings.DEBUG or not settings.RESPONSE_CACHE_ENABLED or 'locmem' not in backend:
+        return []
+    return [
+        checks.Error(
+            'Response caching is enabled on a per-process LocMemCache, so writes handled '
+            'by one worker leave stale responses cached in the others.',
+            hint='Set CACHE_BACKEND to a shared cache such as Redis, or RESPONSE_CACHE_ENABLED=False.',
+            id='api.E002',
+        )
+    ]
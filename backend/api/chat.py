@@ -0,0 +1,273 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from openai import AsyncOpenAI
+
+from .cache import get_counter, increment_counter
+from .metrics import count_cache_lookup
+
+CHAT_MODEL = 'gpt-4o-mini'
+CHAT_MAX_TOKENS = 900
+CHAT_TEMPERATURE = 0.7
+CHAT_CACHE_KEY = 'spendio:chat-response:{digest}'
+
+SYSTEM_PROMPT = '''You are a specialized financial assistant focused on personal finance and budgeting advice. Your core responsibilities:
+
+                                1. Financial Focus: Only provide advice on finance, budgeting, spending, saving, and related topics. If asked about unrelated topics, politely redirect to financial matters.
+
+                                2. Data-Driven Analysis: When financial data is provided (expenses, budgets, subscriptions), analyze it thoroughly and provide specific, actionable advice on:
+                                - Budget optimization
+                                - Cost reduction opportunities
+                                - Spending pattern analysis
+                                - Savings recommendations
+                                - Subscription management
+
+                                3. Concise Responses: Keep all responses under 900 characters while being comprehensive and actionable.
+
+                                4. Practical Advice: Focus on realistic, implementable suggestions that users can act on immediately.
+
+                                5. Professional Tone: Be helpful, accurate, and professional while maintaining a friendly approach.
+
+                                6. No Formatting: Do not use markdown formatting, quotes, or special characters. Write in plain text only.
+
+                                Always prioritize actionable financial insights over general information.
+                            '''
+
+FINANCIAL_CONTEXT_TEMPLATE = (
+    '\n\nCURRENT FINANCIAL DATA CONTEXT:\n'
+    'Timeframe: {period}\n'
+    'Expenses: ${expense_total} total ({expense_count} transactions)\n'
+    'Top categories: {top_categories}\n'
+    'Budget: {budget}\n'
+    'Active Subscriptions: {subscription_count} subscriptions '
+    '(${subscription_monthly} per month, ${subscription_yearly} per year)\n'
+    'Use this data to provide specific, personalized financial advice.'
+)
+
+_upstream = {}
+_upstream_lock = threading.Lock()
+
+
+def build_system_content(context):
+    """Render a context from api.context.build_financial_context into the system prompt."""
+    system_content = SYSTEM_PROMPT
+
+    if context:
+        if context['start']:
+            period = f"{context['timeframe']} ({context['start']} to {context['end']}, end exclusive)"
+        else:
+            period = context['timeframe']
+
+        top_categories = ', '.join(
+            f"{row['category']} ${row['total']} ({row['count']})" for row in context['top_categories']
+        ) or 'none'
+
+        if context['budget_amount'] is None:
+            budget = 'none set'
+        elif context['budget_remaining'] is None:
+            budget = f"${context['budget_amount']} monthly"
+        else:
+            budget = f"${context['budget_amount']} monthly, ${context['budget_remaining']} remaining for this period"
+
+        system_content += FINANCIAL_CONTEXT_TEMPLATE.format(
+            period=period,
+            expense_total=context['expense_total'],
+            expense_count=context['expense_count'],
+            top_categories=top_categories,
+            budget=budget,
+            subscription_count=context['subscription_count'],
+            subscription_monthly=context['subscription_monthly'],
+            subscription_yearly=context['subscription_yearly']
+        )
+
+    return system_content
+
+
+def build_chat_messages(system_content, conversation_history, message):
+    messages = [
+        {
+            'role': 'system',
+            'content': system_content
+        }
+    ]
+
+    for msg in conversation_history[-4:]:
+        if msg.get('type') == 'user':
+            messages.append({
+                'role': 'user',
+                'content': msg.get('content', '')
+            })
+        elif msg.get('type') == 'ai':
+            messages.append({
+                'role': 'assistant',
+                'content': msg.get('content', '')
+            })
+
+    messages.append({
+        'role': 'user',
+        'content': message
+    })
+    return messages
+
+
+def upstream_loop():
+    """
+    Return the event loop that runs every upstream call of this process, started
+    once in a daemon thread. Under WSGI each request runs its async view on a new
+    loop, so the client's keep-alive pool and the concurrency limit are kept on
+    this loop instead, shared by all requests whichever server runs them.
+    """
+    with _upstream_lock:
+        # A forked worker does not inherit the parent's loop thread.
+        if _upstream.get('pid') != os.getpid():
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name='chat-upstream', daemon=True).start()
+            _upstream.clear()
+            _upstream.update(pid=os.getpid(), loop=loop)
+        return _upstream['loop']
+
+
+def get_async_client():
+    """Return the process's AsyncOpenAI client. Only call this on upstream_loop()."""
+    if 'client' not in _upstream:
+        _upstream['client'] = AsyncOpenAI(
+            api_key=os.getenv('OPEN_AI_API_KEY'),
+            base_url=settings.OPENAI_BASE_URL or None,
+            timeout=settings.CHAT_UPSTREAM_TIMEOUT,
+            max_retries=settings.CHAT_UPSTREAM_MAX_RETRIES
+        )
+    return _upstream['client']
+
+
+def upstream_slot():
+    """Semaphore bounding concurrent upstream completions per process. Only call this on upstream_loop()."""
+    if 'slot' not in _upstream:
+        _upstream['slot'] = asyncio.Semaphore(settings.CHAT_MAX_CONCURRENT_REQUESTS)
+    return _upstream['slot']
+
+
+async def request_completion(messages, user_id):
+    async with upstream_slot():
+        response = await get_async_client().chat.completions.create(
+            model=CHAT_MODEL,
+            messages=messages,
+            max_tokens=CHAT_MAX_TOKENS,
+            temperature=CHAT_TEMPERATURE,
+            user=str(user_id)
+        )
+    return response.choices[0].message.content
+
+
+async def request_stream(messages, user_id):
+    async with upstream_slot():
+        stream = await get_async_client().chat.completions.create(
+            model=CHAT_MODEL,
+            messages=messages,
+            max_tokens=CHAT_MAX_TOKENS,
+            temperature=CHAT_TEMPERATURE,
+            user=str(user_id),
+            stream=True
+        )
+        try:
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            await stream.close()
+
+
+async def create_completion(messages, user_id):
+    # Cancelling the awaiting request also cancels the upstream call.
+    return await asyncio.wrap_future(
+        asyncio.run_coroutine_threadsafe(request_completion(messages, user_id), upstream_loop())
+    )
+
+
+async def stream_completion(messages, user_id):
+    """Yield content deltas from a streamed upstream completion as they arrive."""
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+
+    def deliver(item):
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, item)
+        except RuntimeError:
+            pass  # The request's loop has already closed.
+
+    # The upstream loop hands (content, error) pairs to this request's loop;
+    # (None, None) marks the end of the stream.
+    async def produce():
+        try:
+            async for content in request_stream(messages, user_id):
+                deliver((content, None))
+        except Exception as exc:
+            deliver((None, exc))
+        else:
+            deliver((None, None))
+
+    producer = asyncio.run_coroutine_threadsafe(produce(), upstream_loop())
+    try:
+        while True:
+            content, error = await queue.get()
+            if error is not None:
+                raise error
+            if content is None:
+                return
+            yield content
+    finally:
+        producer.cancel()
+
+
+def sse_event(event, data):
+    return f'event: {event}\ndata: {json.dumps(data)}\n\n'
+
+
+def normalize_message(message):
+    return ' '.join(message.casefold().split()).rstrip('?!. ')
+
+
+def completion_cache_key(messages):
+    """
+    Key a completion on everything sent upstream: the system prompt (which
+    carries the financial context), the history turns and the normalized
+    question.
+    """
+    payload = json.dumps(
+        [CHAT_MODEL, CHAT_MAX_TOKENS, CHAT_TEMPERATURE, messages[:-1], normalize_message(messages[-1]['content'])],
+        sort_keys=True,
+        separators=(',', ':')
+    )
+    return CHAT_CACHE_KEY.format(digest=hashlib.sha256(payload.encode('utf-8')).hexdigest())
+
+
+async def get_cached_completion(key):
+    entry = await caches['chat'].aget(key)
+    count_cache_lookup('chat', 'completion', hit=entry is not None)
+    if entry is None:
+        await sync_to_async(increment_counter)('chat-cache:misses')
+        return None
+
+    await sync_to_async(increment_counter)('chat-cache:hits')
+    await sync_to_async(increment_counter)('chat-cache:saved-ms', entry['latency_ms'])
+    return entry['content']
+
+
+async def cache_completion(key, content, latency):
+    await caches['chat'].aset(key, {'content': content, 'latency_ms': round(latency * 1000)})
+
+
+def get_chat_cache_stats():
+    hits = get_counter('chat-cache:hits')
+    misses = get_counter('chat-cache:misses')
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': hits / (hits + misses) if hits + misses else 0,
+        'saved_upstream_ms': get_counter('chat-cache:saved-ms')
+    }
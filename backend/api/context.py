@@ -0,0 +1,91 @@
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Sum
+from django.utils import timezone
+
+from .cache import get_data_version
+from .dates import month_bounds, year_bounds
+from .models import MonthlySpend, Subscription, Budget
+
+CONTEXT_KEY = 'spendio:chat-context:{user_id}:{version}:{timeframe}:{today}'
+TIMEFRAMES = ('monthly', 'yearly', 'all-time')
+TOP_CATEGORY_COUNT = 5
+CENT = Decimal('0.01')
+
+
+def money(value):
+    return str(Decimal(value or 0).quantize(CENT))
+
+
+def build_financial_context(user, timeframe):
+    """
+    Summarise a user's finances for the chat prompt from the monthly rollups,
+    active subscriptions and current budget. Values are strings so the result
+    is JSON-safe and renders identically every time.
+    """
+    today = timezone.now().date()
+    rollups = MonthlySpend.objects.filter(author=user)
+    budget = Budget.objects.filter(author=user, is_active=True).order_by('-created_at').first()
+    budget_amount = budget.amount if budget else None
+
+    if timeframe == 'monthly':
+        start, end = month_bounds(today.year, today.month)
+        budget_limit = budget_amount
+    elif timeframe == 'yearly':
+        start, end = year_bounds(today.year)
+        budget_limit = budget_amount * 12 if budget_amount is not None else None
+    else:
+        start = end = None
+        budget_limit = None
+
+    if start is not None:
+        rollups = rollups.filter(month__gte=start, month__lt=end)
+
+    categories = list(
+        rollups.values('category')
+        .annotate(category_total=Sum('total'), category_count=Sum('count'))
+        .order_by('-category_total', 'category')
+    )
+    expense_total = sum((Decimal(row['category_total']) for row in categories), Decimal('0'))
+    expense_count = sum(row['category_count'] for row in categories)
+
+    subscriptions = Subscription.cost_totals(Subscription.objects.filter(author=user, is_active=True))
+
+    return {
+        'timeframe': timeframe,
+        'start': start.isoformat() if start else None,
+        'end': end.isoformat() if end else None,
+        'expense_total': money(expense_total),
+        'expense_count': expense_count,
+        'top_categories': [
+            {
+                'category': row['category'],
+                'total': money(row['category_total']),
+                'count': row['category_count']
+            }
+            for row in categories[:TOP_CATEGORY_COUNT]
+            if row['category_count']
+        ],
+        'subscription_count': subscriptions['count'],
+        'subscription_monthly': money(subscriptions['monthly']),
+        'subscription_yearly': money(subscriptions['yearly']),
+        'budget_amount': money(budget_amount) if budget_amount is not None else None,
+        'budget_remaining': money(budget_limit - expense_total) if budget_limit is not None else None,
+    }
+
+
+def get_financial_context(user, timeframe):
+    """Return build_financial_context memoized per user data version."""
+    key = CONTEXT_KEY.format(
+        user_id=user.id,
+        version=get_data_version(user.id),
+        timeframe=timeframe,
+        today=timezone.now().date().isoformat()
+    )
+    context = cache.get(key)
+    if context is None:
+        context = build_financial_context(user, timeframe)
+        cache.set(key, context, timeout=settings.RESPONSE_CACHE_TIMEOUT)
+    return context
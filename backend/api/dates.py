@@ -0,0 +1,34 @@
+from datetime import MAXYEAR, MINYEAR, date
+
+
+def month_bounds(year, month):
+    """Return the half-open [start, end) date range covering a calendar month."""
+    start = date(year, month, 1)
+    if month == 12:
+        end = date(year + 1, 1, 1)
+    else:
+        end = date(year, month + 1, 1)
+    return start, end
+
+
+def parse_month(params, today):
+    """
+    Read the month and year query parameters, defaulting to today's, and raise
+    ValueError when either is malformed or out of range.
+    """
+    month = int(params.get('month', today.month))
+    year = int(params.get('year', today.year))
+    # month_bounds needs the following January to exist as well.
+    if not 1 <= month <= 12 or not MINYEAR <= year < MAXYEAR:
+        raise ValueError('month or year out of range')
+    return year, month
+
+
+def year_bounds(year):
+    """Return the half-open [start, end) date range covering a calendar year."""
+    return date(year, 1, 1), date(year + 1, 1, 1)
+
+
+def parse_date(value):
+    """Parse a YYYY-MM-DD query parameter, raising ValueError when malformed."""
+    return date.fromisoformat(value)
@@ -0,0 +1,76 @@
+from functools import wraps
+import hashlib
+
+from django.db.models import Count, IntegerField, Max, Value
+from django.utils.cache import patch_cache_control
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def fetch_validators(querysets):
+    """
+    Fetch (count, max id, last modified) for every queryset in one UNION ALL
+    statement, without loading or serializing any rows.
+    """
+    parts = []
+    for position, queryset in enumerate(querysets):
+        parts.append(
+            queryset.order_by().annotate(
+                etag_group=Value(0, output_field=IntegerField())
+            ).values('etag_group').annotate(
+                etag_position=Value(position, output_field=IntegerField()),
+                etag_count=Count('id'),
+                etag_max_id=Max('id'),
+                etag_modified=Max('updated_at')
+            ).values_list('etag_position', 'etag_count', 'etag_max_id', 'etag_modified')
+        )
+
+    combined = parts[0].union(*parts[1:], all=True) if len(parts) > 1 else parts[0]
+    rows = {row[0]: row[1:] for row in combined}
+    return [rows.get(position, (0, None, None)) for position in range(len(querysets))]
+
+
+def compute_etag(request, querysets):
+    validators = fetch_validators(querysets)
+    raw = '|'.join([request.path, request.META.get('QUERY_STRING', ''), str(request.user.id)] + [
+        f'{count}:{max_id}:{modified.isoformat() if modified else ""}'
+        for count, max_id, modified in validators
+    ])
+    return '"%s"' % hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def etag_matches(request, etag):
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return False
+    candidates = [candidate.strip() for candidate in header.split(',')]
+    return '*' in candidates or any(
+        candidate.removeprefix('W/') == etag for candidate in candidates
+    )
+
+
+def conditional_get(method):
+    """
+    Answer GETs with 304 Not Modified when If-None-Match matches the view's
+    validator querysets (``get_etag_querysets``).
+    """
+    @wraps(method)
+    def wrapper(self, request, *args, **kwargs):
+        try:
+            querysets = self.get_etag_querysets(request)
+        except ValueError:
+            # Malformed parameters: the view itself answers with a 400.
+            return method(self, request, *args, **kwargs)
+        etag = compute_etag(request, querysets)
+
+        if etag_matches(request, etag):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = method(self, request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+
+        response['ETag'] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+    return wrapper
@@ -0,0 +1,118 @@
+import csv
+import json
+import zlib
+
+from django.http import StreamingHttpResponse
+
+from .dates import parse_date
+
+EXPORT_CHUNK_SIZE = 2000
+LINES_PER_WRITE = 500
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+}
+
+
+class ExportParameterError(ValueError):
+    pass
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+def to_export_value(value):
+    if value is None:
+        return ''
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value) if not isinstance(value, (bool, int, str)) else value
+
+
+def parse_categories(params):
+    """Collect ?category= values, accepting repeated and comma-separated forms."""
+    return [
+        category.strip()
+        for value in params.getlist('category')
+        for category in value.split(',')
+        if category.strip()
+    ]
+
+
+def filter_export_queryset(queryset, params, date_field):
+    try:
+        if params.get('start'):
+            queryset = queryset.filter(**{f'{date_field}__gte': parse_date(params['start'])})
+        if params.get('end'):
+            queryset = queryset.filter(**{f'{date_field}__lt': parse_date(params['end'])})
+    except ValueError:
+        raise ExportParameterError('Dates must use the YYYY-MM-DD format')
+
+    categories = parse_categories(params)
+    if categories:
+        queryset = queryset.filter(category__in=categories)
+    return queryset
+
+
+def iter_csv_lines(fields, rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow([to_export_value(value) for value in row])
+
+
+def iter_ndjson_lines(fields, rows):
+    for row in rows:
+        yield json.dumps(
+            {field: None if value is None else to_export_value(value) for field, value in zip(fields, row)},
+            separators=(',', ':')
+        ) + '\n'
+
+
+def iter_batched(lines):
+    batch = []
+    for line in lines:
+        batch.append(line)
+        if len(batch) >= LINES_PER_WRITE:
+            yield ''.join(batch).encode('utf-8')
+            batch = []
+    if batch:
+        yield ''.join(batch).encode('utf-8')
+
+
+def iter_gzip(chunks):
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def streaming_export(queryset, fields, params, filename):
+    """
+    Stream ``fields`` of ``queryset`` as CSV or NDJSON straight from a server-side
+    cursor, optionally gzip-compressed, without materializing the result set.
+    """
+    export_format = params.get('output', 'csv').lower()
+    if export_format not in EXPORT_FORMATS:
+        raise ExportParameterError('output must be one of: ' + ', '.join(EXPORT_FORMATS))
+    content_type, extension = EXPORT_FORMATS[export_format]
+
+    rows = queryset.values_list(*fields).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    lines = iter_csv_lines(fields, rows) if export_format == 'csv' else iter_ndjson_lines(fields, rows)
+    chunks = iter_batched(lines)
+
+    filename = f'{filename}.{extension}'
+    if params.get('gzip', '').lower() in ('1', 'true', 'yes'):
+        chunks = iter_gzip(chunks)
+        content_type = 'application/gzip'
+        filename += '.gz'
+
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,116 @@
+from decimal import Decimal, InvalidOperation
+
+from django.core import checks
+from django.db import connections
+from django.db.models.functions import Lower
+
+from .dates import parse_date
+from .exports import parse_categories
+from .models import Expense
+
+MAX_TITLE_PREFIX_LENGTH = 100
+DEFAULT_EXPENSE_SORT = '-date'
+
+
+class FilterError(ValueError):
+    pass
+
+
+def parse_amount(value):
+    try:
+        amount = Decimal(value)
+    except InvalidOperation:
+        raise ValueError(value)
+    if not amount.is_finite():
+        raise ValueError(value)
+    return amount
+
+
+DATE_ERROR = 'Dates must use the YYYY-MM-DD format'
+AMOUNT_ERROR = 'Amounts must be numbers'
+
+# Query parameter -> (lookup, parser, error, supporting index). Every lookup is
+# a range predicate on the column right after author in its index.
+EXPENSE_FILTERS = {
+    'start': ('date__gte', parse_date, DATE_ERROR, 'expense_author_date_idx'),
+    'end': ('date__lt', parse_date, DATE_ERROR, 'expense_author_date_idx'),
+    'min_amount': ('amount__gte', parse_amount, AMOUNT_ERROR, 'expense_author_amount_idx'),
+    'max_amount': ('amount__lte', parse_amount, AMOUNT_ERROR, 'expense_author_amount_idx'),
+}
+CATEGORY_INDEX = 'expense_author_category_idx'
+TITLE_PREFIX_INDEX = 'expense_author_title_idx'
+
+# ?sort= value -> (keyset ordering, supporting index)
+EXPENSE_SORTS = {
+    'date': (('date', 'id'), 'expense_author_date_idx'),
+    '-date': (('-date', '-id'), 'expense_author_date_idx'),
+    'amount': (('amount', 'id'), 'expense_author_amount_idx'),
+    '-amount': (('-amount', '-id'), 'expense_author_amount_idx'),
+}
+
+
+def fold_case(value, vendor):
+    # SQLite's lower() only folds ASCII, so fold the prefix the same way it
+    # folds the indexed titles.
+    if vendor == 'sqlite':
+        return ''.join(char.lower() if char.isascii() else char for char in value)
+    return value.lower()
+
+
+def filter_expenses(queryset, params):
+    """
+    Apply the whitelisted expense filters in ``params`` to ``queryset`` and
+    return it with the keyset ordering picked by ``sort``. Parameters outside
+    the whitelist are ignored.
+    """
+    for param, (lookup, parse, error, _) in EXPENSE_FILTERS.items():
+        if params.get(param):
+            try:
+                queryset = queryset.filter(**{lookup: parse(params[param])})
+            except ValueError:
+                raise FilterError(error)
+
+    categories = parse_categories(params)
+    if categories:
+        queryset = queryset.filter(category__in=categories)
+
+    prefix = fold_case(params.get('title', '').strip(), connections[queryset.db].vendor)
+    if prefix:
+        if len(prefix) > MAX_TITLE_PREFIX_LENGTH:
+            raise FilterError(f'title must be at most {MAX_TITLE_PREFIX_LENGTH} characters')
+        # A half-open range on lower(title) is what the expression index can
+        # seek; the startswith keeps collations that order characters
+        # unexpectedly from widening the match.
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        queryset = queryset.alias(title_key=Lower('title')).filter(
+            title_key__gte=prefix,
+            title_key__lt=upper,
+            title_key__startswith=prefix
+        )
+
+    sort = params.get('sort', DEFAULT_EXPENSE_SORT)
+    if sort not in EXPENSE_SORTS:
+        raise FilterError('sort must be one of: ' + ', '.join(EXPENSE_SORTS))
+    ordering = EXPENSE_SORTS[sort][0]
+    return queryset.order_by(*ordering), ordering
+
+
+@checks.register(checks.Tags.models)
+def check_expense_filter_indexes(app_configs=None, **kwargs):
+    """Every whitelisted expense filter and sort must be backed by an index on Expense."""
+    indexes = {index.name for index in Expense._meta.indexes}
+    required = {
+        *(index for _, _, _, index in EXPENSE_FILTERS.values()),
+        *(index for _, index in EXPENSE_SORTS.values()),
+        CATEGORY_INDEX,
+        TITLE_PREFIX_INDEX,
+    }
+    return [
+        checks.Error(
+            f'Expense list filters rely on the missing index {name!r}.',
+            hint='Restore the index in Expense.Meta.indexes or drop the filter from api.filters.',
+            obj=Expense,
+            id='api.E001',
+        )
+        for name in sorted(required - indexes)
+    ]
@@ -0,0 +1,167 @@
+import csv
+import html
+import io
+import re
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from rest_framework import serializers
+
+from .cache import invalidate_user_data
+from .models import Expense, MonthlySpend
+from .serializers import ExpenseSerializer
+
+CSV_COLUMNS = {
+    'title': 'title',
+    'name': 'title',
+    'payee': 'title',
+    'date': 'date',
+    'amount': 'amount',
+    'description': 'description',
+    'memo': 'description',
+    'category': 'category',
+}
+
+OFX_TAG = re.compile(r'<(/?)([A-Za-z0-9.]+)>([^<]*)')
+
+READ_CHUNK_SIZE = 64 * 1024
+
+
+def open_text(uploaded_file):
+    return io.TextIOWrapper(uploaded_file.file, encoding='utf-8-sig', newline='')
+
+
+def iter_csv_rows(stream):
+    reader = csv.reader(stream)
+    header = next(reader, None)
+    if header is None:
+        return
+    columns = [CSV_COLUMNS.get(name.strip().lower()) for name in header]
+
+    for values in reader:
+        if not any(value.strip() for value in values):
+            continue
+        row = {}
+        for column, value in zip(columns, values):
+            if column and value.strip() and column not in row:
+                row[column] = value.strip()
+        yield reader.line_num, row
+
+
+def iter_ofx_transactions(stream):
+    buffer = ''
+    current = None
+
+    def parse(text):
+        nonlocal current
+        for closing, name, value in OFX_TAG.findall(text):
+            name = name.upper()
+            if name == 'STMTTRN':
+                if closing and current is not None:
+                    yield current
+                    current = None
+                elif not closing:
+                    current = {}
+            elif current is not None and not closing:
+                current[name] = html.unescape(value.strip())
+
+    for chunk in iter(lambda: stream.read(READ_CHUNK_SIZE), ''):
+        buffer += chunk
+        cut = buffer.rfind('<')
+        if cut == -1:
+            buffer = ''
+            continue
+        # Keep the last tag around until we know its value is complete.
+        complete, buffer = buffer[:cut], buffer[cut:]
+        yield from parse(complete)
+    yield from parse(buffer)
+    if current is not None:
+        yield current
+
+
+def iter_ofx_rows(stream):
+    for index, transaction_data in enumerate(iter_ofx_transactions(stream), start=1):
+        posted = transaction_data.get('DTPOSTED', '')
+        row = {
+            'title': transaction_data.get('NAME') or transaction_data.get('PAYEE') or transaction_data.get('MEMO', ''),
+            'description': transaction_data.get('MEMO', ''),
+        }
+        if len(posted) >= 8:
+            row['date'] = f'{posted[0:4]}-{posted[4:6]}-{posted[6:8]}'
+
+        try:
+            amount = Decimal(transaction_data.get('TRNAMT', ''))
+        except InvalidOperation:
+            row['amount'] = transaction_data.get('TRNAMT', '')
+        else:
+            # Debits are negative in OFX; credits are income, not expenses.
+            if amount >= 0:
+                yield index, None
+                continue
+            row['amount'] = str(-amount)
+
+        yield index, row
+
+
+class ImportResult:
+    max_reported_errors = 100
+
+    def __init__(self):
+        self.created = 0
+        self.failed = 0
+        self.skipped = 0
+        self.errors = []
+
+    def add_error(self, row_number, detail):
+        self.failed += 1
+        if len(self.errors) < self.max_reported_errors:
+            self.errors.append({'row': row_number, 'errors': detail})
+
+    def as_dict(self):
+        return {
+            'created': self.created,
+            'failed': self.failed,
+            'skipped': self.skipped,
+            'errors': self.errors,
+            'errors_truncated': self.failed > len(self.errors),
+        }
+
+
+def import_expenses(user, rows, batch_size=1000):
+    """
+    Validate ``(row_number, data)`` pairs with the ExpenseSerializer rules and
+    insert the valid ones in bounded ``bulk_create`` batches inside a single
+    transaction. Invalid rows are reported without aborting the import.
+    """
+    result = ImportResult()
+    validator = ExpenseSerializer()
+    batch = []
+
+    def flush():
+        Expense.objects.bulk_create(batch)
+        MonthlySpend.record(batch)
+        result.created += len(batch)
+        batch.clear()
+
+    with transaction.atomic():
+        for row_number, data in rows:
+            if data is None:
+                result.skipped += 1
+                continue
+
+            try:
+                validated = validator.run_validation(data)
+            except serializers.ValidationError as exc:
+                result.add_error(row_number, exc.detail)
+                continue
+
+            batch.append(Expense(author=user, **validated))
+            if len(batch) >= batch_size:
+                flush()
+
+        if batch:
+            flush()
+        if result.created:
+            invalidate_user_data(user.id)
+
+    return result
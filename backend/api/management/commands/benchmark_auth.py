@@ -0,0 +1,73 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from decimal import Decimal
+from rest_framework_simplejwt.tokens import RefreshToken
+import statistics
+import time
+
+from api.authentication import user_cache
+from api.models import Expense, Subscription, Budget
+
+BENCHMARK_USERNAME = '__auth_benchmark'
+HOT_ENDPOINTS = [
+    '/api/expenses/',
+    '/api/expenses/monthly/',
+    '/api/subscriptions/',
+    '/api/budgets/current/',
+    '/api/dashboard/summary/',
+]
+
+
+class Command(BaseCommand):
+    help = 'Compare per-request queries and latency on hot read endpoints with and without the auth user cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Requests per endpoint and mode')
+
+    def handle(self, *args, **options):
+        User.objects.filter(username=BENCHMARK_USERNAME).delete()
+        user = User.objects.create_user(username=BENCHMARK_USERNAME)
+        today = timezone.now().date()
+        Expense.objects.bulk_create([
+            Expense(author=user, title=f'Expense {index}', amount=Decimal('12.50'), category='Food', date=today)
+            for index in range(50)
+        ])
+        Subscription.objects.create(author=user, title='Streaming', amount=Decimal('9.99'), renewal_date=today)
+        Budget.objects.create(author=user, amount=Decimal('1000'))
+
+        client = Client()
+        client.cookies['access_token'] = str(RefreshToken.for_user(user).access_token)
+
+        try:
+            with override_settings(ALLOWED_HOSTS=['testserver']):
+                self.stdout.write(f'{"endpoint":<28}{"mode":<10}{"queries":>9}{"p50 ms":>10}{"p95 ms":>10}')
+                for path in HOT_ENDPOINTS:
+                    for enabled in (False, True):
+                        with override_settings(AUTH_USER_CACHE_ENABLED=enabled):
+                            user_cache.clear()
+                            queries, latencies = self.measure(client, path, options['requests'])
+                        ordered = sorted(latencies)
+                        self.stdout.write(
+                            f'{path:<28}{"cached" if enabled else "db":<10}{queries:>9.1f}'
+                            f'{statistics.median(ordered) * 1000:>10.2f}'
+                            f'{ordered[int(len(ordered) * 0.95)] * 1000:>10.2f}'
+                        )
+        finally:
+            user_cache.clear()
+            User.objects.filter(username=BENCHMARK_USERNAME).delete()
+
+    def measure(self, client, path, count):
+        # Warm up the user cache and any response caches so both modes are compared in steady state.
+        client.get(path)
+
+        latencies = []
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(count):
+                started = time.perf_counter()
+                client.get(path)
+                latencies.append(time.perf_counter() - started)
+        return len(queries) / count, latencies
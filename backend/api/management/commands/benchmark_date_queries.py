@@ -0,0 +1,148 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Sum
+from datetime import date, timedelta
+from decimal import Decimal
+import random
+import time
+
+from api.dates import month_bounds
+from api.models import Expense, Subscription
+
+BENCH_USERNAME_PREFIX = '__bench_dates_'
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a large Expense/Subscription table and compare EXPLAIN plans and latencies of the '
+        'legacy EXTRACT-based month filters against half-open date ranges with composite indexes. '
+        'Runs in a throwaway test database, so the configured database is never touched '
+        '(on PostgreSQL the user needs CREATEDB, as for the test suite).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=2_000_000, help='Total expense rows to seed')
+        parser.add_argument('--users', type=int, default=20, help='Users to spread the rows across')
+        parser.add_argument('--years', type=int, default=10, help='How many years of history to seed')
+        parser.add_argument('--repeat', type=int, default=20, help='Timed runs per query')
+        parser.add_argument('--batch-size', type=int, default=10_000)
+
+    def handle(self, *args, **options):
+        # The baseline drops the composite indexes, so seed and measure in a
+        # scratch copy of the schema built the way the test runner builds it.
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            self.benchmark(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def benchmark(self, options):
+        rng = random.Random(0)
+        users = self.seed(rng, options)
+        target = users[0]
+        today = date.today()
+        month_start, month_end = month_bounds(today.year, today.month)
+
+        legacy_expenses = Expense.objects.filter(
+            author=target, date__month=today.month, date__year=today.year
+        )
+        range_expenses = Expense.objects.filter(
+            author=target, date__gte=month_start, date__lt=month_end
+        )
+        legacy_subscriptions = Subscription.objects.filter(
+            author=target, is_active=True,
+            renewal_date__month=today.month, renewal_date__year=today.year
+        )
+        range_subscriptions = Subscription.objects.filter(
+            author=target, is_active=True,
+            renewal_date__gte=month_start, renewal_date__lt=month_end
+        )
+
+        self.drop_indexes()
+        self.stdout.write(self.style.MIGRATE_HEADING('Before: EXTRACT predicates, default FK index only'))
+        self.report('expenses', legacy_expenses, options['repeat'])
+        self.report('subscriptions', legacy_subscriptions, options['repeat'])
+        self.restore_indexes()
+
+        self.stdout.write(self.style.MIGRATE_HEADING('After: half-open ranges, composite indexes'))
+        self.report('expenses', range_expenses, options['repeat'])
+        self.report('subscriptions', range_subscriptions, options['repeat'])
+
+    def seed(self, rng, options):
+        User.objects.bulk_create([
+            User(username=f'{BENCH_USERNAME_PREFIX}{i}') for i in range(options['users'])
+        ])
+        users = list(User.objects.filter(username__startswith=BENCH_USERNAME_PREFIX).order_by('id'))
+
+        span_days = 365 * options['years']
+        first_day = date.today() - timedelta(days=span_days)
+        per_user = max(options['rows'] // len(users), 1)
+        batch_size = options['batch_size']
+
+        self.stdout.write(f'Seeding {per_user * len(users)} expenses across {len(users)} users...')
+        for user in users:
+            batch = []
+            for _ in range(per_user):
+                batch.append(Expense(
+                    title='Bench expense',
+                    date=first_day + timedelta(days=rng.randrange(span_days + 1)),
+                    author=user,
+                    amount=Decimal(rng.randrange(100, 50_000)) / 100,
+                    category='Other',
+                ))
+                if len(batch) >= batch_size:
+                    Expense.objects.bulk_create(batch)
+                    batch = []
+            if batch:
+                Expense.objects.bulk_create(batch)
+
+            Subscription.objects.bulk_create([
+                Subscription(
+                    title='Bench subscription',
+                    amount=Decimal(rng.randrange(100, 5_000)) / 100,
+                    frequency=rng.choice(['monthly', 'yearly']),
+                    renewal_date=first_day + timedelta(days=rng.randrange(span_days + 1)),
+                    author=user,
+                    is_active=rng.random() < 0.8,
+                )
+                for _ in range(max(per_user // 100, 1))
+            ], batch_size=batch_size)
+
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(f'ANALYZE {Expense._meta.db_table}')
+                cursor.execute(f'ANALYZE {Subscription._meta.db_table}')
+        elif connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+
+        return users
+
+    def drop_indexes(self):
+        with connection.schema_editor() as schema_editor:
+            for model in (Expense, Subscription):
+                for index in model._meta.indexes:
+                    schema_editor.remove_index(model, index)
+
+    def restore_indexes(self):
+        with connection.schema_editor() as schema_editor:
+            for model in (Expense, Subscription):
+                for index in model._meta.indexes:
+                    schema_editor.add_index(model, index)
+
+    def report(self, label, queryset, repeat):
+        self.stdout.write(f'\n[{label}] {queryset.query}')
+        self.stdout.write(queryset.explain())
+
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            queryset.aggregate(total=Sum('amount'))
+            list(queryset.all())
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        self.stdout.write(
+            f'[{label}] median {timings[len(timings) // 2]:.2f} ms, '
+            f'min {timings[0]:.2f} ms, max {timings[-1]:.2f} ms over {repeat} runs\n'
+        )
@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from datetime import date, timedelta
+from decimal import Decimal
+import random
+import time
+
+from api.models import Expense
+from api.serializers import ExpenseSerializer, fast_expense_serializer
+
+
+class Command(BaseCommand):
+    help = 'Compare ExpenseSerializer throughput with the values()-based fast read path'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000])
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        rng = random.Random(0)
+        for count in options['rows']:
+            instances, rows = self.build(rng, count)
+
+            drf_seconds = self.best_of(
+                options['repeat'], lambda: ExpenseSerializer(instances, many=True).data
+            )
+            fast_seconds = self.best_of(
+                options['repeat'], lambda: fast_expense_serializer.serialize_rows(rows)
+            )
+
+            self.stdout.write(
+                f'{count:>9} rows  '
+                f'ExpenseSerializer {count / drf_seconds:>11,.0f} rows/s  '
+                f'fast path {count / fast_seconds:>11,.0f} rows/s  '
+                f'({drf_seconds / fast_seconds:.1f}x)'
+            )
+
+    def build(self, rng, count):
+        now = timezone.now()
+        columns = fast_expense_serializer.columns
+        instances = []
+        rows = []
+        for index in range(count):
+            expense = Expense(
+                id=index + 1,
+                title=f'Expense {index}',
+                date=date(2020, 1, 1) + timedelta(days=rng.randrange(2000)),
+                created_at=now - timedelta(seconds=rng.randrange(10 ** 8)),
+                author_id=1,
+                amount=Decimal(rng.randrange(100, 100_000)) / 100,
+                description=rng.choice([None, '', 'Groceries and household items']),
+                category=rng.choice(['Food', 'Transport', 'Other']),
+            )
+            instances.append(expense)
+            rows.append(tuple(getattr(expense, column) for column in columns))
+        return instances, rows
+
+    def best_of(self, repeat, func):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best
@@ -0,0 +1,165 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, override_settings
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from rest_framework_simplejwt.tokens import RefreshToken
+import asyncio
+import json
+import os
+import statistics
+import threading
+import time
+
+LOADTEST_USERNAME = '__chat_loadtest'
+STUB_REPLY = 'Stub advice: spend less than you earn.'
+
+
+def make_stub_handler(delay):
+    class StubOpenAIHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length', 0))
+            request = json.loads(self.rfile.read(length) or b'{}')
+            if request.get('stream'):
+                return self.stream()
+            time.sleep(delay)
+
+            body = json.dumps({
+                'id': 'chatcmpl-stub',
+                'object': 'chat.completion',
+                'created': int(time.time()),
+                'model': 'gpt-4o-mini',
+                'choices': [{
+                    'index': 0,
+                    'message': {'role': 'assistant', 'content': STUB_REPLY},
+                    'finish_reason': 'stop',
+                }],
+                'usage': {'prompt_tokens': 1, 'completion_tokens': 1, 'total_tokens': 2},
+            }).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def stream(self):
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            self.close_connection = True
+
+            tokens = STUB_REPLY.split(' ')
+            for index, token in enumerate(tokens):
+                time.sleep(delay / len(tokens))
+                chunk = {
+                    'id': 'chatcmpl-stub',
+                    'object': 'chat.completion.chunk',
+                    'created': int(time.time()),
+                    'model': 'gpt-4o-mini',
+                    'choices': [{
+                        'index': 0,
+                        'delta': {'content': token if index == 0 else ' ' + token},
+                        'finish_reason': None,
+                    }],
+                }
+                self.wfile.write(f'data: {json.dumps(chunk)}\n\n'.encode('utf-8'))
+                self.wfile.flush()
+            self.wfile.write(b'data: [DONE]\n\n')
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubOpenAIHandler
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class Command(BaseCommand):
+    help = (
+        'Load-test the async chat endpoint against a local stub OpenAI-compatible server '
+        'while measuring dashboard latency'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chats', type=int, default=50, help='Concurrent chat requests')
+        parser.add_argument('--upstream-delay', type=float, default=2.0, help='Stub completion latency in seconds')
+        parser.add_argument('--dashboard-requests', type=int, default=20)
+        parser.add_argument('--stream', action='store_true', help='Use the SSE streaming chat mode')
+
+    def handle(self, *args, **options):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), make_stub_handler(options['upstream_delay']))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f'http://127.0.0.1:{server.server_address[1]}/v1'
+        os.environ.setdefault('OPEN_AI_API_KEY', 'stub-key')
+
+        User.objects.filter(username=LOADTEST_USERNAME).delete()
+        user = User.objects.create_user(username=LOADTEST_USERNAME)
+        token = str(RefreshToken.for_user(user).access_token)
+
+        try:
+            with override_settings(ALLOWED_HOSTS=['testserver'], OPENAI_BASE_URL=base_url):
+                report = asyncio.run(self.run(token, options))
+        finally:
+            server.shutdown()
+            User.objects.filter(username=LOADTEST_USERNAME).delete()
+
+        self.stdout.write(json.dumps(report, indent=2))
+
+    async def run(self, token, options):
+        client = AsyncClient()
+        client.cookies['access_token'] = token
+        payload = json.dumps({
+            'message': 'How can I save money?',
+            'weekly_limit': options['chats'] + 1,
+            'stream': options['stream'],
+        })
+
+        async def chat():
+            started = time.perf_counter()
+            response = await client.post('/api/chat/message/', payload, content_type='application/json')
+            first_byte = None
+            if response.streaming:
+                async for _ in response.streaming_content:
+                    if first_byte is None:
+                        first_byte = time.perf_counter() - started
+            return response.status_code, time.perf_counter() - started, first_byte
+
+        async def dashboard():
+            latencies = []
+            for _ in range(options['dashboard_requests']):
+                started = time.perf_counter()
+                await client.get('/api/dashboard/summary/')
+                latencies.append(time.perf_counter() - started)
+                await asyncio.sleep(0.05)
+            return latencies
+
+        started = time.perf_counter()
+        chat_results, dashboard_latencies = await asyncio.gather(
+            asyncio.gather(*(chat() for _ in range(options['chats']))),
+            dashboard()
+        )
+        elapsed = time.perf_counter() - started
+
+        chat_latencies = [latency for _, latency, _ in chat_results]
+        report = {
+            'chats': options['chats'],
+            'stream': options['stream'],
+            'upstream_delay_s': options['upstream_delay'],
+            'chat_status_codes': sorted({code for code, _, _ in chat_results}),
+            'chat_p50_s': round(statistics.median(chat_latencies), 3),
+            'chat_p95_s': round(percentile(chat_latencies, 0.95), 3),
+            'chat_throughput_rps': round(len(chat_results) / elapsed, 2),
+            'dashboard_p50_ms': round(statistics.median(dashboard_latencies) * 1000, 1),
+            'dashboard_max_ms': round(max(dashboard_latencies) * 1000, 1),
+            'wall_time_s': round(elapsed, 3),
+        }
+        first_bytes = [first_byte for _, _, first_byte in chat_results if first_byte is not None]
+        if first_bytes:
+            report['chat_first_token_p50_s'] = round(statistics.median(first_bytes), 3)
+            report['chat_first_token_p95_s'] = round(percentile(first_bytes, 0.95), 3)
+        return report
@@ -0,0 +1,84 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from api.cache import invalidate_user_data
+from api.dates import parse_date
+from api.models import Subscription
+from api.recurrence import next_renewal_on_or_after
+
+
+class Command(BaseCommand):
+    help = (
+        'Advance every overdue active subscription to its next renewal date on or after today. '
+        'Safe to rerun: renewed subscriptions drop out of the overdue set, so an interrupted '
+        'run resumes where it stopped.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--as-of', help='Treat this date (YYYY-MM-DD) as today')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Distinct (renewal date, frequency) groups advanced per transaction'
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Report what would change without writing')
+
+    def handle(self, *args, **options):
+        if options['as_of']:
+            try:
+                as_of = parse_date(options['as_of'])
+            except ValueError:
+                raise CommandError('--as-of must be a YYYY-MM-DD date')
+        else:
+            as_of = timezone.now().date()
+
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be positive')
+
+        # Served by the partial sub_active_renewal_idx index.
+        overdue = Subscription.objects.filter(is_active=True, renewal_date__lt=as_of)
+
+        # The next renewal depends only on (renewal_date, frequency), so every
+        # subscription sharing both is advanced by one set-based UPDATE.
+        groups = overdue.values_list('renewal_date', 'frequency').annotate(
+            subscriptions=Count('id')
+        ).order_by('renewal_date', 'frequency')
+
+        if options['dry_run']:
+            renewed = periods = 0
+            for renewal_date, frequency, count in groups.iterator():
+                renewed += count
+                periods += count * next_renewal_on_or_after(renewal_date, frequency, as_of)[1]
+            self.stdout.write(f'{renewed} subscriptions would be renewed ({periods} missed periods) as of {as_of}')
+            return
+
+        renewed = periods = 0
+        while True:
+            # Renewed rows leave the overdue range, so each page starts from the
+            # front and an interrupted run picks up where it stopped.
+            page = list(groups[:batch_size])
+            if not page:
+                break
+
+            now = timezone.now()
+            with transaction.atomic():
+                for renewal_date, frequency, _ in page:
+                    next_date, skipped = next_renewal_on_or_after(renewal_date, frequency, as_of)
+                    group = overdue.filter(renewal_date=renewal_date, frequency=frequency)
+                    authors = set(group.values_list('author_id', flat=True).distinct())
+                    count = group.update(renewal_date=next_date, updated_at=now)
+                    for author_id in authors:
+                        invalidate_user_data(author_id)
+                    renewed += count
+                    periods += count * skipped
+
+            if options['verbosity'] > 1:
+                self.stdout.write(f'Renewed {renewed} subscriptions')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Renewed {renewed} subscriptions ({periods} missed periods) as of {as_of}'
+        ))
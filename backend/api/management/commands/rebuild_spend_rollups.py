@@ -0,0 +1,71 @@
+from django.core.management.base import BaseCommand, CommandError
+from decimal import Decimal
+
+from api.models import Expense, MonthlySpend
+
+CENT = Decimal('0.01')
+
+
+class Command(BaseCommand):
+    help = 'Rebuild or verify the per-user monthly spend rollups from raw expenses'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help='Only compare rollups with raw expenses and report mismatches'
+        )
+        parser.add_argument(
+            '--user',
+            type=int,
+            action='append',
+            dest='user_ids',
+            help='Limit to a user id (can be repeated)'
+        )
+
+    def handle(self, *args, **options):
+        user_ids = options['user_ids']
+
+        if not options['verify']:
+            MonthlySpend.rebuild(user_ids=user_ids)
+            self.stdout.write(self.style.SUCCESS('Monthly spend rollups rebuilt'))
+            return
+
+        mismatches = self.verify(user_ids)
+        for key, expected, actual in mismatches:
+            author_id, month, category = key
+            self.stdout.write(self.style.ERROR(
+                f'user {author_id} {month:%Y-%m} {category}: expected {expected}, found {actual}'
+            ))
+
+        if mismatches:
+            raise CommandError(f'{len(mismatches)} rollup rows do not match raw expenses')
+        self.stdout.write(self.style.SUCCESS('Monthly spend rollups match raw expenses'))
+
+    def verify(self, user_ids):
+        expenses = Expense.objects.all()
+        rollups = MonthlySpend.objects.all()
+        if user_ids:
+            expenses = expenses.filter(author_id__in=user_ids)
+            rollups = rollups.filter(author_id__in=user_ids)
+
+        expected = {
+            (row['author_id'], row['rollup_month'], row['category']): (row['rollup_total'], row['rollup_count'])
+            for row in MonthlySpend.from_expenses(expenses).iterator()
+        }
+        actual = {
+            (row.author_id, row.month, row.category): (row.total, row.count)
+            for row in rollups.iterator()
+            if row.count or row.total
+        }
+
+        mismatches = []
+        for key in sorted(expected.keys() | actual.keys()):
+            expected_value = expected.get(key, (Decimal('0'), 0))
+            actual_value = actual.get(key, (Decimal('0'), 0))
+            # SQLite sums decimals as floats; compare at the column's precision.
+            expected_total = Decimal(expected_value[0]).quantize(CENT)
+            actual_total = Decimal(actual_value[0]).quantize(CENT)
+            if expected_total != actual_total or expected_value[1] != actual_value[1]:
+                mismatches.append((key, expected_value, actual_value))
+        return mismatches
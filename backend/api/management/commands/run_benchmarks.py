@@ -0,0 +1,334 @@
+from collections import Counter, deque
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client, override_settings
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+from datetime import timedelta
+import itertools
+import json
+import random
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+
+from api.management.commands.seed_data import SEED_USERNAME_PREFIX
+from api.models import Expense, Subscription, Budget
+
+FIXTURE_EXPENSES = 20
+
+
+def new_expense(rng, values):
+    return {
+        'title': rng.choice(['Coffee', 'Groceries', 'Taxi', 'Lunch']),
+        'amount': f'{rng.uniform(1, 200):.2f}',
+        'category': rng.choice(['Food', 'Transportation', 'Shopping']),
+        'date': values['today'],
+    }
+
+
+def new_subscription(rng, values):
+    return {
+        'title': 'Benchmark subscription',
+        'amount': f'{rng.uniform(1, 50):.2f}',
+        'frequency': rng.choice(['monthly', 'yearly']),
+        'renewal_date': values['today'],
+        'category': 'Other',
+    }
+
+
+def expense_batch(rng, values):
+    return {'operations': [
+        {'op': 'update', 'id': expense_id, 'data': {'amount': f'{rng.uniform(1, 200):.2f}'}}
+        for expense_id in rng.sample(values['expense_ids'], min(10, len(values['expense_ids'])))
+    ]}
+
+
+# (name, path). Paths are formatted with the values built in request_values.
+READ_SCENARIOS = [
+    ('dashboard-summary', '/api/dashboard/summary/'),
+    ('calendar', '/api/calendar/'),
+    ('calendar-heatmap', '/api/calendar/heatmap/'),
+    ('calendar-day', '/api/calendar/day/?date={today}'),
+    ('expenses-list', '/api/expenses/'),
+    ('expenses-page', '/api/expenses/?page_size=50'),
+    ('expenses-filtered', '/api/expenses/?category=Food&start={quarter_start}&sort=-amount'),
+    ('expenses-detail', '/api/expenses/{expense_id}/'),
+    ('expenses-monthly', '/api/expenses/monthly/'),
+    ('expenses-yearly', '/api/expenses/yearly/'),
+    ('expenses-all-time', '/api/expenses/all-time/'),
+    ('expenses-analytics', '/api/expenses/analytics/'),
+    ('expenses-search', '/api/expenses/search/?q=groc'),
+    ('expenses-export', '/api/expenses/export/?start={quarter_start}'),
+    ('subscriptions-list', '/api/subscriptions/'),
+    ('subscriptions-active', '/api/subscriptions/active/'),
+    ('subscriptions-monthly', '/api/subscriptions/monthly/'),
+    ('subscriptions-yearly', '/api/subscriptions/yearly/'),
+    ('subscriptions-total', '/api/subscriptions/total/'),
+    ('subscriptions-forecast', '/api/subscriptions/forecast/'),
+    ('subscriptions-detail', '/api/subscriptions/{subscription_id}/'),
+    ('subscriptions-export', '/api/subscriptions/export/'),
+    ('budgets-list', '/api/budgets/'),
+    ('budgets-current', '/api/budgets/current/'),
+    ('chat-usage', '/api/chat/usage/'),
+    ('chat-context', '/api/chat/context/?timeframe=monthly'),
+]
+
+# (name, method, path, body factory, pool). POSTs add the created id to the
+# pool and DELETEs consume it, so create/delete pairs leave the data as seeded.
+WRITE_SCENARIOS = [
+    ('expenses-create', 'POST', '/api/expenses/', new_expense, 'expense'),
+    ('expenses-update', 'PATCH', '/api/expenses/{expense_id}/', lambda rng, values: {'amount': f'{rng.uniform(1, 200):.2f}'}, None),
+    ('expenses-batch', 'POST', '/api/expenses/batch/', expense_batch, None),
+    ('expenses-delete', 'DELETE', '/api/expenses/{created_id}/', None, 'expense'),
+    ('subscriptions-create', 'POST', '/api/subscriptions/', new_subscription, 'subscription'),
+    ('subscriptions-renew', 'POST', '/api/subscriptions/{subscription_id}/renew/', None, None),
+    ('subscriptions-delete', 'DELETE', '/api/subscriptions/{created_id}/', None, 'subscription'),
+    ('budgets-update', 'PATCH', '/api/budgets/{budget_id}/', lambda rng, values: {'amount': f'{rng.randrange(500, 3000)}.00'}, None),
+    ('chat-usage-record', 'POST', '/api/chat/usage/', lambda rng, values: {'weekly_limit': 10 ** 9}, None),
+]
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class Command(BaseCommand):
+    help = (
+        'Drive the read and write API endpoints with seeded users (see seed_data) at a given '
+        'concurrency and print p50/p95/p99 latency, throughput and queries per request as JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=100, help='Measured requests per scenario')
+        parser.add_argument('--warmup', type=int, default=5, help='Unmeasured requests per scenario')
+        parser.add_argument('--concurrency', type=int, default=4, help='Worker threads')
+        parser.add_argument('--users', type=int, default=20, help='Seeded users to spread requests over')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--base-url',
+            help='Benchmark a running server (e.g. http://127.0.0.1:8000) instead of the in-process test client'
+        )
+        parser.add_argument('--only', nargs='+', metavar='SCENARIO', help='Run only these scenarios')
+        parser.add_argument('--reads-only', action='store_true', help='Skip the write scenarios')
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1 or options['concurrency'] < 1 or options['users'] < 1:
+            raise CommandError('--requests, --concurrency and --users must be positive')
+
+        scenarios = [(name, 'GET', path, None, None) for name, path in READ_SCENARIOS]
+        if not options['reads_only']:
+            scenarios += WRITE_SCENARIOS
+        if options['only']:
+            known = {scenario[0] for scenario in scenarios}
+            unknown = set(options['only']) - known
+            if unknown:
+                raise CommandError('Unknown scenarios: ' + ', '.join(sorted(unknown)))
+            scenarios = [scenario for scenario in scenarios if scenario[0] in options['only']]
+
+        fixtures = self.load_fixtures(options['users'])
+        if options['concurrency'] > len(fixtures):
+            raise CommandError(f'--concurrency cannot exceed the {len(fixtures)} benchmark users')
+        self.pools = {'expense': deque(), 'subscription': deque()}
+        self.base_url = options['base_url']
+        self.local = threading.local()
+
+        report = {
+            'config': {
+                'target': self.base_url or 'test-client',
+                'database': connection.vendor,
+                'concurrency': options['concurrency'],
+                'requests': options['requests'],
+                'users': len(fixtures),
+                'seed': options['seed'],
+            },
+            'scenarios': {},
+        }
+        try:
+            with override_settings(ALLOWED_HOSTS=['testserver']):
+                for scenario in scenarios:
+                    report['scenarios'][scenario[0]] = self.run_scenario(scenario, fixtures, options)
+        finally:
+            self.clean_up()
+
+        output = json.dumps(report, indent=2, sort_keys=True)
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                handle.write(output + '\n')
+            self.stderr.write(f'Wrote {options["output"]}')
+        else:
+            self.stdout.write(output)
+
+    def load_fixtures(self, count):
+        users = list(
+            User.objects.filter(
+                username__startswith=SEED_USERNAME_PREFIX,
+                subscription__isnull=False,
+                budget__isnull=False
+            ).distinct().order_by('username')[:count]
+        )
+        if not users:
+            raise CommandError('No seeded users with subscriptions and budgets; run seed_data first')
+
+        fixtures = []
+        for user in users:
+            fixtures.append({
+                'user_id': user.id,
+                'token': str(RefreshToken.for_user(user).access_token),
+                'expense_ids': list(
+                    Expense.objects.filter(author=user).order_by('-date', '-id').values_list('id', flat=True)[:FIXTURE_EXPENSES]
+                ),
+                'subscription_ids': list(Subscription.objects.filter(author=user).values_list('id', flat=True)),
+                'budget_id': Budget.objects.filter(author=user).values_list('id', flat=True).first(),
+            })
+        return fixtures
+
+    def request_values(self, rng, fixture):
+        today = timezone.now().date()
+        return {
+            'today': today.isoformat(),
+            'quarter_start': (today - timedelta(days=90)).isoformat(),
+            'expense_ids': fixture['expense_ids'],
+            'expense_id': rng.choice(fixture['expense_ids']),
+            'subscription_id': rng.choice(fixture['subscription_ids']),
+            'budget_id': fixture['budget_id'],
+        }
+
+    def prepare(self, scenario, index, fixtures, seed):
+        name, method, path, body, pool = scenario
+        rng = random.Random(f'{seed}:{name}:{index}')
+        if method == 'DELETE':
+            try:
+                fixture, created_id = self.pools[pool].popleft()
+            except IndexError:
+                return None
+            values = {'created_id': created_id}
+        else:
+            fixture = rng.choice(fixtures)
+            values = self.request_values(rng, fixture)
+        payload = body(rng, values) if body else None
+        return fixture, method, path.format(**values), payload, values
+
+    def run_scenario(self, scenario, fixtures, options):
+        name, method, _, _, pool = scenario
+        total = options['warmup'] + options['requests']
+        indexes = itertools.count()
+        lock = threading.Lock()
+        latencies = []
+        statuses = Counter()
+        queries = []
+        sent = 0
+
+        # Each thread plays its own users, so like real clients a user's requests
+        # run one at a time and concurrent updates never race on the same rows.
+        def worker(own_fixtures):
+            nonlocal sent
+            try:
+                while True:
+                    with lock:
+                        index = next(indexes)
+                    if index >= total:
+                        return
+                    prepared = self.prepare(scenario, index, own_fixtures, options['seed'])
+                    if prepared is None:
+                        continue
+                    fixture, method_name, path, payload, values = prepared
+
+                    started = time.perf_counter()
+                    status_code, body, query_count = self.send(fixture, method_name, path, payload)
+                    elapsed = time.perf_counter() - started
+
+                    if method_name == 'POST' and pool and status_code == 201:
+                        self.pools[pool].append((fixture, json.loads(body)['id']))
+                    elif method_name == 'DELETE' and status_code != 204:
+                        # Left for clean_up.
+                        self.pools[pool].append((fixture, values['created_id']))
+                    with lock:
+                        sent += 1
+                        if index < options['warmup']:
+                            continue
+                        latencies.append(elapsed)
+                        statuses[status_code] += 1
+                        if query_count is not None:
+                            queries.append(query_count)
+            finally:
+                connections.close_all()
+
+        concurrency = options['concurrency']
+        threads = [
+            threading.Thread(target=worker, args=(fixtures[offset::concurrency],))
+            for offset in range(concurrency)
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - started
+
+        result = {
+            'method': method,
+            'requests': len(latencies),
+            'status_codes': {str(code): count for code, count in sorted(statuses.items())},
+            'errors': sum(count for code, count in statuses.items() if code >= 400),
+        }
+        if latencies:
+            result.update({
+                'p50_ms': round(statistics.median(latencies) * 1000, 2),
+                'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+                'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+                'mean_ms': round(statistics.fmean(latencies) * 1000, 2),
+                # Warmup requests share the wall clock, so count them too.
+                'throughput_rps': round(sent / wall, 1),
+            })
+        result['queries_per_request'] = round(statistics.fmean(queries), 2) if queries else None
+        if options['verbosity'] > 1:
+            self.stderr.write(f'{name}: {result}')
+        return result
+
+    def send(self, fixture, method, path, payload):
+        if self.base_url:
+            return self.send_http(fixture, method, path, payload)
+
+        client = getattr(self.local, 'client', None)
+        if client is None:
+            client = self.local.client = Client(raise_request_exception=False)
+        count = 0
+
+        def count_queries(execute, sql, params, many, context):
+            nonlocal count
+            count += 1
+            return execute(sql, params, many, context)
+
+        kwargs = {'HTTP_COOKIE': f'access_token={fixture["token"]}'}
+        if payload is not None:
+            kwargs.update(data=json.dumps(payload), content_type='application/json')
+        with connection.execute_wrapper(count_queries):
+            response = getattr(client, method.lower())(path, **kwargs)
+            body = b''.join(response.streaming_content) if response.streaming else response.content
+        return response.status_code, body, count
+
+    def send_http(self, fixture, method, path, payload):
+        data = json.dumps(payload).encode('utf-8') if payload is not None else None
+        request = urllib.request.Request(self.base_url.rstrip('/') + path, data=data, method=method)
+        request.add_header('Cookie', f'access_token={fixture["token"]}')
+        if data is not None:
+            request.add_header('Content-Type', 'application/json')
+        try:
+            with urllib.request.urlopen(request) as response:
+                return response.status, response.read(), None
+        except urllib.error.HTTPError as error:
+            return error.code, error.read(), None
+
+    def clean_up(self):
+        # Rows created by interrupted or unpaired create scenarios. Deleting
+        # through the models keeps spend rollups and caches right.
+        for model, pool in ((Expense, 'expense'), (Subscription, 'subscription')):
+            ids = [created_id for _, created_id in self.pools[pool]]
+            for instance in model.objects.filter(id__in=ids):
+                instance.delete()
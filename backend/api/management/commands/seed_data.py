@@ -0,0 +1,152 @@
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from datetime import timedelta
+from decimal import Decimal
+import random
+import statistics
+
+from api.cache import invalidate_user_data
+from api.dates import parse_date
+from api.models import Expense, MonthlySpend, Subscription, Budget
+
+SEED_USERNAME_PREFIX = 'seed_user_'
+SEED_PASSWORD = 'spendio-seed'
+CENT = Decimal('0.01')
+
+# category -> (weight, typical amount, titles)
+EXPENSE_CATALOG = {
+    'Food': (30, 18, ['Groceries', 'Coffee', 'Lunch', 'Dinner out', 'Bakery', 'Takeout']),
+    'Transportation': (12, 15, ['Bus pass', 'Taxi', 'Train ticket', 'Parking', 'Fuel']),
+    'Entertainment': (10, 30, ['Cinema', 'Concert tickets', 'Video game', 'Museum', 'Bowling']),
+    'Bills': (8, 110, ['Electricity', 'Water bill', 'Internet', 'Phone bill', 'Rent']),
+    'Shopping': (12, 45, ['Clothes', 'Shoes', 'Electronics', 'Books', 'Gift']),
+    'Household': (8, 35, ['Cleaning supplies', 'Furniture', 'Kitchenware', 'Repairs']),
+    'Car': (4, 80, ['Car wash', 'Oil change', 'Tyres', 'Car insurance']),
+    'Travel': (3, 240, ['Flight', 'Hotel', 'Car rental', 'Guided tour']),
+    'Health': (6, 40, ['Pharmacy', 'Doctor visit', 'Dentist', 'Gym class']),
+    'Other': (7, 20, ['Miscellaneous', 'Donation', 'Bank fees']),
+}
+DESCRIPTIONS = ['With friends', 'Work trip', 'Birthday present', 'Weekly shop', 'Paid by card', 'Split the bill']
+
+# (title, category, amount, frequency)
+SUBSCRIPTION_CATALOG = [
+    ('Netflix', 'Entertainment', '15.49', 'monthly'),
+    ('Spotify', 'Entertainment', '10.99', 'monthly'),
+    ('iCloud storage', 'Other', '2.99', 'monthly'),
+    ('Gym membership', 'Health', '39.99', 'monthly'),
+    ('Mobile plan', 'Bills', '25.00', 'monthly'),
+    ('News subscription', 'Entertainment', '9.99', 'monthly'),
+    ('Amazon Prime', 'Shopping', '139.00', 'yearly'),
+    ('Domain renewal', 'Bills', '12.00', 'yearly'),
+    ('Antivirus', 'Other', '49.99', 'yearly'),
+    ('Car insurance', 'Car', '780.00', 'yearly'),
+]
+BUDGET_AMOUNTS = [500, 800, 1000, 1500, 2000, 3000]
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed deterministic synthetic data: users with power-law expense counts, monthly and '
+        'yearly subscriptions, and budgets. The same --seed and --as-of always produce the same data.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--max-expenses', type=int, default=5000, help='Expenses for the heaviest user')
+        parser.add_argument('--alpha', type=float, default=1.1, help='Power-law exponent of expenses per user rank')
+        parser.add_argument('--months', type=int, default=24, help='Months of expense history')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--as-of', help='Anchor dates on this day (YYYY-MM-DD) instead of today')
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--reset', action='store_true', help='Delete previously seeded users first')
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 or options['max_expenses'] < 1 or options['months'] < 1:
+            raise CommandError('--users, --max-expenses and --months must be positive')
+        if options['as_of']:
+            try:
+                as_of = parse_date(options['as_of'])
+            except ValueError:
+                raise CommandError('--as-of must be a YYYY-MM-DD date')
+        else:
+            as_of = timezone.now().date()
+
+        seeded = User.objects.filter(username__startswith=SEED_USERNAME_PREFIX)
+        if seeded.exists():
+            if not options['reset']:
+                raise CommandError('Seeded users already exist; pass --reset to replace them')
+            for user_id in seeded.values_list('id', flat=True):
+                invalidate_user_data(user_id)
+            seeded.delete()
+
+        # Hashing is deliberately slow, so every seeded user shares one hash.
+        password = make_password(SEED_PASSWORD)
+        counts = []
+        with transaction.atomic():
+            users = User.objects.bulk_create([
+                User(username=f'{SEED_USERNAME_PREFIX}{index:05d}', password=password)
+                for index in range(options['users'])
+            ])
+
+            expenses = []
+            subscriptions = []
+            budgets = []
+            for rank, user in enumerate(users):
+                # Seeding per user keeps a user's data independent of --users.
+                rng = random.Random(f'{options["seed"]}:{rank}')
+                count = max(1, round(options['max_expenses'] / (rank + 1) ** options['alpha']))
+                counts.append(count)
+
+                expenses.extend(self.build_expenses(rng, user, count, as_of, options['months']))
+                subscriptions.extend(self.build_subscriptions(rng, user, as_of))
+                budgets.append(Budget(author=user, amount=Decimal(rng.choice(BUDGET_AMOUNTS))))
+
+                if len(expenses) >= options['batch_size']:
+                    Expense.objects.bulk_create(expenses, batch_size=options['batch_size'])
+                    expenses = []
+
+            Expense.objects.bulk_create(expenses, batch_size=options['batch_size'])
+            Subscription.objects.bulk_create(subscriptions, batch_size=options['batch_size'])
+            Budget.objects.bulk_create(budgets, batch_size=options['batch_size'])
+
+            # bulk_create skips Expense.save, so rebuild the seeded users' rollups in one pass.
+            MonthlySpend.rebuild(user_ids=[user.id for user in users])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded {len(users)} users, {sum(counts)} expenses '
+            f'(max {max(counts)}, median {statistics.median(counts):g} per user) and '
+            f'{Subscription.objects.filter(author__in=users).count()} subscriptions as of {as_of}. '
+            f'Password: {SEED_PASSWORD}'
+        ))
+
+    def build_expenses(self, rng, user, count, as_of, months):
+        categories = list(EXPENSE_CATALOG)
+        weights = [EXPENSE_CATALOG[category][0] for category in categories]
+        days = months * 30
+        for category in rng.choices(categories, weights, k=count):
+            _, typical, titles = EXPENSE_CATALOG[category]
+            amount = Decimal(typical * rng.lognormvariate(0, 0.6)).quantize(CENT)
+            yield Expense(
+                author=user,
+                title=rng.choice(titles),
+                date=as_of - timedelta(days=rng.randrange(days)),
+                amount=max(amount, CENT),
+                description=rng.choice(DESCRIPTIONS) if rng.random() < 0.3 else None,
+                category=category,
+            )
+
+    def build_subscriptions(self, rng, user, as_of):
+        for title, category, amount, frequency in rng.sample(SUBSCRIPTION_CATALOG, rng.randrange(7)):
+            period = 31 if frequency == 'monthly' else 366
+            yield Subscription(
+                author=user,
+                title=title,
+                amount=Decimal(amount),
+                frequency=frequency,
+                renewal_date=as_of + timedelta(days=rng.randrange(period)),
+                category=category,
+                is_active=rng.random() < 0.85,
+            )
@@ -0,0 +1,210 @@
+from pathlib import Path
+import atexit
+import hmac
+import json
+import os
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from rest_framework.permissions import BasePermission
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+UPSTREAM_BUCKETS = (0.25, 0.5, 1, 2, 4, 8, 15, 30, 60)
+
+# name -> (type, help, buckets)
+METRICS = {
+    'spendio_http_requests_total': (
+        'counter', 'Requests handled, by route, method and status.', None
+    ),
+    'spendio_http_request_errors_total': (
+        'counter', 'Requests answered with a 5xx status, by route and method.', None
+    ),
+    'spendio_http_request_duration_seconds': (
+        'histogram', 'Time until the response was returned, by route and method.', LATENCY_BUCKETS
+    ),
+    'spendio_db_queries_per_request': (
+        'histogram', 'SQL statements run by sampled requests, by route.', QUERY_COUNT_BUCKETS
+    ),
+    'spendio_db_query_duration_seconds': (
+        'histogram', 'SQL time spent by sampled requests, by route.', LATENCY_BUCKETS
+    ),
+    'spendio_chat_upstream_duration_seconds': (
+        'histogram', 'Upstream chat completion time, by mode and outcome.', UPSTREAM_BUCKETS
+    ),
+    'spendio_chat_quota_rejections_total': (
+        'counter', 'Chat messages refused by the weekly limit, by view.', None
+    ),
+    'spendio_cache_requests_total': (
+        'counter', 'Cache lookups, by cache, scope and result (hit or miss).', None
+    ),
+}
+
+
+class MetricsRegistry:
+    """
+    Counters and histograms for this process. With METRICS_DIR set, every worker
+    process writes its values to its own file there at most once per
+    METRICS_FLUSH_INTERVAL seconds, and collect() adds up all the files, so a
+    scrape answered by any worker reports the totals of all of them.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        # Workers forked from a preloaded master must not share its file.
+        self.pid = os.getpid()
+        self.path = None
+        if settings.METRICS_DIR:
+            self.path = Path(settings.METRICS_DIR) / f'{self.pid}-{uuid.uuid4().hex}.json'
+        self.values = {}
+        self.flushed = time.monotonic()
+
+    def inc(self, name, amount=1, **labels):
+        if not settings.METRICS_ENABLED:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            if self.pid != os.getpid():
+                self.reset()
+            self.values[key] = self.values.get(key, 0) + amount
+        self.maybe_flush()
+
+    def observe(self, name, value, **labels):
+        if not settings.METRICS_ENABLED:
+            return
+        buckets = METRICS[name][2]
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            if self.pid != os.getpid():
+                self.reset()
+            # Per-bucket counts, then the +Inf count and the sum.
+            series = self.values.get(key)
+            if series is None:
+                series = self.values[key] = [0] * (len(buckets) + 1) + [0.0]
+            series[next((index for index, bound in enumerate(buckets) if value <= bound), len(buckets))] += 1
+            series[-1] += value
+        self.maybe_flush()
+
+    def snapshot(self):
+        with self.lock:
+            return [
+                [name, labels, list(value) if isinstance(value, list) else value]
+                for (name, labels), value in self.values.items()
+            ]
+
+    def maybe_flush(self):
+        if self.path and time.monotonic() - self.flushed >= settings.METRICS_FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        if not self.path or not self.flush_lock.acquire(blocking=False):
+            return
+        try:
+            self.flushed = time.monotonic()
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temporary = self.path.with_suffix('.tmp')
+            temporary.write_text(json.dumps(self.snapshot()))
+            # Readers only ever see a complete file.
+            os.replace(temporary, self.path)
+        finally:
+            self.flush_lock.release()
+
+    def collect(self):
+        """Return {(name, labels): value} summed over every process."""
+        if not self.path:
+            return self.merge([self.snapshot()])
+
+        self.flush()
+        snapshots = []
+        for path in self.path.parent.glob('*.json'):
+            try:
+                snapshots.append(json.loads(path.read_text()))
+            except (OSError, ValueError):
+                continue
+        return self.merge(snapshots)
+
+    def merge(self, snapshots):
+        totals = {}
+        for snapshot in snapshots:
+            for name, labels, value in snapshot:
+                if name not in METRICS:
+                    continue
+                key = (name, tuple(tuple(label) for label in labels))
+                if isinstance(value, list):
+                    current = totals.setdefault(key, [0] * len(value))
+                    totals[key] = [a + b for a, b in zip(current, value)]
+                else:
+                    totals[key] = totals.get(key, 0) + value
+        return totals
+
+
+registry = MetricsRegistry()
+atexit.register(registry.flush)
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(labels, extra=()):
+    pairs = [*labels, *extra]
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{key}="{escape_label(value)}"' for key, value in pairs) + '}'
+
+
+def render_metrics(totals):
+    """Render collected values in the Prometheus text exposition format."""
+    lines = []
+    for name, (kind, help_text, buckets) in METRICS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        series = sorted((labels, value) for (metric, labels), value in totals.items() if metric == name)
+        for labels, value in series:
+            if kind == 'counter':
+                lines.append(f'{name}{format_labels(labels)} {value}')
+                continue
+            cumulative = 0
+            for bound, count in zip([*buckets, '+Inf'], value[:-1]):
+                cumulative += count
+                lines.append(f'{name}_bucket{format_labels(labels, [("le", bound)])} {cumulative}')
+            lines.append(f'{name}_sum{format_labels(labels)} {value[-1]}')
+            lines.append(f'{name}_count{format_labels(labels)} {cumulative}')
+    return '\n'.join(lines) + '\n'
+
+
+def route_label(request):
+    # The URL pattern rather than the path keeps ids out of the label values.
+    match = getattr(request, 'resolver_match', None)
+    return match.route if match and match.route else 'unmatched'
+
+
+def observe_request(request, response, seconds, timing=None):
+    route = route_label(request)
+    registry.inc('spendio_http_requests_total', route=route, method=request.method, status=response.status_code)
+    if response.status_code >= 500:
+        registry.inc('spendio_http_request_errors_total', route=route, method=request.method)
+    registry.observe('spendio_http_request_duration_seconds', seconds, route=route, method=request.method)
+    if timing is not None:
+        registry.observe('spendio_db_queries_per_request', timing.query_count, route=route)
+        registry.observe('spendio_db_query_duration_seconds', timing.query_time, route=route)
+
+
+def count_cache_lookup(cache, scope, hit):
+    registry.inc('spendio_cache_requests_total', cache=cache, scope=scope, result='hit' if hit else 'miss')
+
+
+class HasMetricsToken(BasePermission):
+    """Allow scrapers sending ``Authorization: Bearer <METRICS_TOKEN>``."""
+
+    def has_permission(self, request, view):
+        if not settings.METRICS_TOKEN:
+            return False
+        header = request.META.get('HTTP_AUTHORIZATION', '')
+        return hmac.compare_digest(header.encode(), f'Bearer {settings.METRICS_TOKEN}'.encode())
@@ -0,0 +1,110 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject, empty
+import json
+import logging
+import random
+import time
+
+from .metrics import observe_request
+from .timing import RequestTiming, current_timing
+
+logger = logging.getLogger(__name__)
+
+SERVER_TIMING_PHASES = ('auth', 'serialize')
+
+
+def resolved_user_id(request):
+    # Evaluating the session's lazy user here would cost a query, and raises
+    # in async views, so only report users the view already resolved.
+    user = getattr(request, 'user', None)
+    if isinstance(user, SimpleLazyObject) and user._wrapped is empty:
+        return None
+    return getattr(user, 'id', None)
+
+
+class RequestTimingMiddleware:
+    """
+    Time a sample of requests (REQUEST_TIMING_SAMPLE_RATE) and report the total,
+    db, auth, serialize and remaining view time in a Server-Timing header.
+    Requests slower than SLOW_REQUEST_THRESHOLD_MS are logged as JSON, with the
+    most repeated SQL statements when the request was sampled. Every request is
+    also recorded in the metrics registry when METRICS_ENABLED is set.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not settings.REQUEST_TIMING_ENABLED:
+            return self.get_response(request)
+
+        started, timing = self.start()
+        token = current_timing.set(timing)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_timing.reset(token)
+        return self.finish(request, response, started, timing)
+
+    async def __acall__(self, request):
+        if not settings.REQUEST_TIMING_ENABLED:
+            return await self.get_response(request)
+
+        started, timing = self.start()
+        token = current_timing.set(timing)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_timing.reset(token)
+        return self.finish(request, response, started, timing)
+
+    def start(self):
+        # Unsampled requests are still timed as a whole for the slow log.
+        timing = RequestTiming() if random.random() < settings.REQUEST_TIMING_SAMPLE_RATE else None
+        return timing.started if timing else time.perf_counter(), timing
+
+    def finish(self, request, response, started, timing):
+        total = time.perf_counter() - started
+        sampled = timing is not None
+
+        if sampled:
+            phases = {name: timing.durations.get(name, 0.0) for name in SERVER_TIMING_PHASES}
+            view = max(0.0, total - timing.query_time - sum(phases.values()))
+            metrics = [
+                f'total;dur={total * 1000:.2f}',
+                f'db;dur={timing.query_time * 1000:.2f};desc="{timing.query_count} queries"',
+                *(f'{name};dur={seconds * 1000:.2f}' for name, seconds in phases.items()),
+                f'view;dur={view * 1000:.2f}',
+            ]
+            response['Server-Timing'] = ', '.join(metrics)
+
+        if settings.METRICS_ENABLED:
+            observe_request(request, response, total, timing)
+
+        if total * 1000 >= settings.SLOW_REQUEST_THRESHOLD_MS:
+            record = {
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'user_id': resolved_user_id(request),
+                'duration_ms': round(total * 1000, 2),
+                'sampled': sampled,
+            }
+            if sampled:
+                record.update({
+                    'queries': timing.query_count,
+                    'db_ms': round(timing.query_time * 1000, 2),
+                    **{f'{name}_ms': round(seconds * 1000, 2) for name, seconds in phases.items()},
+                    'view_ms': round(view * 1000, 2),
+                    'top_sql': timing.top_statements(settings.SLOW_REQUEST_TOP_SQL),
+                })
+            logger.warning(json.dumps(record))
+        return response
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_remove_budget_end_date_remove_budget_period_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['author', 'date'], name='expense_author_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subscription',
+            index=models.Index(fields=['author', 'is_active', 'renewal_date'], name='sub_author_active_renewal_idx'),
+        ),
+    ]
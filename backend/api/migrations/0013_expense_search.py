@@ -0,0 +1,73 @@
+from django.db import migrations
+
+# SQLite: an FTS5 index over the expense table kept in sync by triggers. The
+# author id is indexed as its own column so a search only walks that user's
+# postings.
+SQLITE_INSTALL = [
+    "CREATE VIRTUAL TABLE api_expense_fts USING fts5("
+    "title, description, author_id, "
+    "content='api_expense', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER api_expense_fts_insert AFTER INSERT ON api_expense BEGIN "
+    "INSERT INTO api_expense_fts(rowid, title, description, author_id) "
+    "VALUES (new.id, new.title, new.description, new.author_id); END",
+    "CREATE TRIGGER api_expense_fts_delete AFTER DELETE ON api_expense BEGIN "
+    "INSERT INTO api_expense_fts(api_expense_fts, rowid, title, description, author_id) "
+    "VALUES ('delete', old.id, old.title, old.description, old.author_id); END",
+    "CREATE TRIGGER api_expense_fts_update AFTER UPDATE OF title, description, author_id ON api_expense BEGIN "
+    "INSERT INTO api_expense_fts(api_expense_fts, rowid, title, description, author_id) "
+    "VALUES ('delete', old.id, old.title, old.description, old.author_id); "
+    "INSERT INTO api_expense_fts(rowid, title, description, author_id) "
+    "VALUES (new.id, new.title, new.description, new.author_id); END",
+    "INSERT INTO api_expense_fts(api_expense_fts) VALUES ('rebuild')",
+]
+SQLITE_UNINSTALL = [
+    "DROP TRIGGER IF EXISTS api_expense_fts_insert",
+    "DROP TRIGGER IF EXISTS api_expense_fts_delete",
+    "DROP TRIGGER IF EXISTS api_expense_fts_update",
+    "DROP TABLE IF EXISTS api_expense_fts",
+]
+
+# PostgreSQL: a generated tsvector column with a GIN index. Titles weigh more
+# than descriptions when ranking.
+POSTGRES_INSTALL = [
+    "ALTER TABLE api_expense ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'B')) STORED",
+    "CREATE INDEX api_expense_search_idx ON api_expense USING GIN (search_vector)",
+]
+POSTGRES_UNINSTALL = [
+    "DROP INDEX IF EXISTS api_expense_search_idx",
+    "ALTER TABLE api_expense DROP COLUMN IF EXISTS search_vector",
+]
+
+
+class VendorRunSQL(migrations.RunSQL):
+    """RunSQL that only runs on databases of the given vendor."""
+
+    def __init__(self, vendor, *args, **kwargs):
+        self.vendor = vendor
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, args, kwargs = super().deconstruct()
+        return name, [self.vendor, *args], kwargs
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == self.vendor:
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == self.vendor:
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_subscription_active_renewal_index'),
+    ]
+
+    operations = [
+        VendorRunSQL('sqlite', SQLITE_INSTALL, reverse_sql=SQLITE_UNINSTALL),
+        VendorRunSQL('postgresql', POSTGRES_INSTALL, reverse_sql=POSTGRES_UNINSTALL),
+    ]
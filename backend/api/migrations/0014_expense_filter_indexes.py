@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:36
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_expense_search'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['author', 'category', 'date'], name='expense_author_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['author', 'amount'], name='expense_author_amount_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(models.F('author'), django.db.models.functions.text.Lower('title'), name='expense_author_title_idx'),
+        ),
+    ]
@@ -1,21 +1,224 @@
-from django.db import models
+from django.db import models, connection, transaction, IntegrityError
+from django.db.models import F, Q, Sum, Count
+from django.db.models.functions import Lower, TruncMonth
 from django.contrib.auth.models import User
 from dateutil.relativedelta import relativedelta
 from datetime import datetime, timedelta
+from decimal import Decimal
 from django.utils import timezone
+from asgiref.sync import sync_to_async
 import calendar
 
+from .cache import invalidate_user_data
+
+ROLLUP_FIELDS = {'author', 'author_id', 'date', 'amount', 'category'}
+
+class ExpenseQuerySet(models.QuerySet):
+    """
+    Keeps MonthlySpend in step for update(), bulk_update() and delete() by
+    applying the grouped totals of the affected rows before and after the write.
+    bulk_create skips this, so its callers record the new rows with
+    MonthlySpend.record (or run MonthlySpend.rebuild afterwards). Deleting a user
+    cascades to their rollups as well as their expenses.
+    """
+    
+    def delete(self):
+        with transaction.atomic():
+            rows = list(MonthlySpend.from_expenses(self))
+            result = super().delete()
+            MonthlySpend.apply_rows(rows, sign=-1)
+        return result
+    
+    def update(self, **kwargs):
+        # updated_at is auto_now only on save(); the ETag validators need it
+        # bumped by every write.
+        kwargs.setdefault('updated_at', timezone.now())
+        with transaction.atomic():
+            if ROLLUP_FIELDS.isdisjoint(kwargs):
+                author_ids = set(self.values_list('author_id', flat=True).distinct())
+                updated = super().update(**kwargs)
+                for author_id in author_ids:
+                    invalidate_user_data(author_id)
+                return updated
+            
+            ids = list(self.values_list('pk', flat=True))
+            rows = list(MonthlySpend.from_expenses(self.model.objects.filter(pk__in=ids)))
+            updated = super().update(**kwargs)
+            MonthlySpend.apply_rows(rows, sign=-1)
+            MonthlySpend.apply_rows(MonthlySpend.from_expenses(self.model.objects.filter(pk__in=ids)))
+        return updated
+
 class Expense(models.Model):
     title = models.CharField(max_length=100)
     date = models.DateField()
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name="expense")
     amount = models.DecimalField(max_digits=20, decimal_places=2)
     description = models.TextField(blank=True, null=True)
     category = models.CharField(max_length=100, default="Other")
 
+    objects = ExpenseQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['author', 'date'], name='expense_author_date_idx'),
+            models.Index(fields=['author', 'category', 'date'], name='expense_author_category_idx'),
+            models.Index(fields=['author', 'amount'], name='expense_author_amount_idx'),
+            models.Index(F('author'), Lower('title'), name='expense_author_title_idx'),
+        ]
+
     def __str__(self):
         return self.title
+    
+    def get_rollup_state(self):
+        if self.author_id is None or self.date is None or self.amount is None:
+            return None
+        expense_date = self.date
+        if isinstance(expense_date, str):
+            expense_date = datetime.strptime(expense_date, '%Y-%m-%d').date()
+        return (self.author_id, expense_date.replace(day=1), self.category, Decimal(str(self.amount)))
+    
+    def get_stored_rollup_state(self):
+        """The rollup state of this expense as currently saved, or None."""
+        stored = Expense.objects.select_for_update().filter(pk=self.pk).first() if self.pk else None
+        return stored.get_rollup_state() if stored else None
+    
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            # Read inside the transaction so a stale instance cannot skew the rollups.
+            previous = self.get_stored_rollup_state()
+            super().save(*args, **kwargs)
+            current = self.get_rollup_state()
+            if previous != current:
+                if previous:
+                    MonthlySpend.apply(*previous[:3], amount=-previous[3], count=-1)
+                if current:
+                    MonthlySpend.apply(*current[:3], amount=current[3], count=1)
+            invalidate_user_data(self.author_id)
+    
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            state = self.get_stored_rollup_state()
+            result = super().delete(*args, **kwargs)
+            if state:
+                MonthlySpend.apply(*state[:3], amount=-state[3], count=-1)
+            invalidate_user_data(self.author_id)
+        return result
+
+class MonthlySpend(models.Model):
+    author = models.ForeignKey(User, on_delete=models.CASCADE, related_name="monthly_spend")
+    month = models.DateField()
+    category = models.CharField(max_length=100)
+    total = models.DecimalField(max_digits=20, decimal_places=2, default=0)
+    count = models.IntegerField(default=0)
+    
+    class Meta:
+        unique_together = ['author', 'month', 'category']
+    
+    def __str__(self):
+        return f"{self.author_id} - {self.month:%Y-%m} - {self.category}: ${self.total}"
+    
+    @classmethod
+    def apply(cls, author_id, month, category, amount, count):
+        updated = cls.objects.filter(
+            author_id=author_id,
+            month=month,
+            category=category
+        ).update(total=F('total') + amount, count=F('count') + count)
+        
+        if updated:
+            return
+        
+        try:
+            with transaction.atomic():
+                cls.objects.create(
+                    author_id=author_id,
+                    month=month,
+                    category=category,
+                    total=amount,
+                    count=count
+                )
+        except IntegrityError:
+            cls.objects.filter(
+                author_id=author_id,
+                month=month,
+                category=category
+            ).update(total=F('total') + amount, count=F('count') + count)
+    
+    @classmethod
+    def record(cls, expenses, sign=1):
+        deltas = {}
+        for expense in expenses:
+            state = expense.get_rollup_state()
+            if not state:
+                continue
+            key = state[:3]
+            total, count = deltas.get(key, (Decimal('0'), 0))
+            deltas[key] = (total + sign * state[3], count + sign)
+        
+        with transaction.atomic():
+            for (author_id, month, category), (total, count) in sorted(deltas.items()):
+                cls.apply(author_id, month, category, amount=total, count=count)
+    
+    @classmethod
+    def apply_rows(cls, rows, sign=1):
+        """Apply grouped ``from_expenses`` rows, subtracting them when sign is -1."""
+        rows = list(rows)
+        for row in sorted(rows, key=lambda row: (row['author_id'], row['rollup_month'], row['category'])):
+            cls.apply(
+                row['author_id'],
+                row['rollup_month'],
+                row['category'],
+                amount=sign * row['rollup_total'],
+                count=sign * row['rollup_count']
+            )
+        for author_id in {row['author_id'] for row in rows}:
+            invalidate_user_data(author_id)
+    
+    @classmethod
+    def total_for(cls, user, start=None, end=None):
+        rollups = cls.objects.filter(author=user)
+        if start is not None:
+            rollups = rollups.filter(month__gte=start)
+        if end is not None:
+            rollups = rollups.filter(month__lt=end)
+        return rollups.aggregate(total=Sum('total'))['total'] or 0
+    
+    @classmethod
+    def from_expenses(cls, expenses):
+        return expenses.annotate(
+            rollup_month=TruncMonth('date')
+        ).values(
+            'author_id', 'rollup_month', 'category'
+        ).annotate(
+            rollup_total=Sum('amount'),
+            rollup_count=Count('id')
+        ).order_by()
+    
+    @classmethod
+    def rebuild(cls, user_ids=None):
+        expenses = Expense.objects.all()
+        rollups = cls.objects.all()
+        if user_ids is not None:
+            expenses = expenses.filter(author_id__in=user_ids)
+            rollups = rollups.filter(author_id__in=user_ids)
+        
+        with transaction.atomic():
+            rollups.delete()
+            cls.objects.bulk_create(
+                (
+                    cls(
+                        author_id=row['author_id'],
+                        month=row['rollup_month'],
+                        category=row['category'],
+                        total=row['rollup_total'],
+                        count=row['rollup_count']
+                    )
+                    for row in cls.from_expenses(expenses).iterator()
+                ),
+                batch_size=1000
+            )
 
 class Subscription(models.Model):
     FREQUENCY_CHOICES = [
@@ -31,6 +234,13 @@ class Subscription(models.Model):
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name="subscription")
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['author', 'is_active', 'renewal_date'], name='sub_author_active_renewal_idx'),
+            models.Index(fields=['renewal_date'], condition=Q(is_active=True), name='sub_active_renewal_idx'),
+        ]
     
     def __str__(self):
         return self.title
@@ -42,6 +252,12 @@ class Subscription(models.Model):
             self.renewal_date = self.renewal_date.date()
         
         super().save(*args, **kwargs)
+        invalidate_user_data(self.author_id)
+    
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        invalidate_user_data(self.author_id)
+        return result
     
     def get_next_renewal_date(self):
         if self.frequency == 'monthly':
@@ -65,6 +281,24 @@ class Subscription(models.Model):
     def advance_renewal_date(self):
         self.renewal_date = self.get_next_renewal_date()
         self.save()
+    
+    @classmethod
+    def cost_totals(cls, subscriptions):
+        totals = subscriptions.order_by().aggregate(
+            total=Sum('amount'),
+            monthly_amount=Sum('amount', filter=Q(frequency='monthly')),
+            yearly_amount=Sum('amount', filter=~Q(frequency='monthly')),
+            count=Count('id')
+        )
+        monthly_amount = totals['monthly_amount'] or Decimal('0')
+        yearly_amount = totals['yearly_amount'] or Decimal('0')
+        
+        return {
+            'total': totals['total'] or Decimal('0'),
+            'count': totals['count'],
+            'monthly': monthly_amount + yearly_amount / 12,
+            'yearly': monthly_amount * 12 + yearly_amount
+        }
 
 class Budget(models.Model):
     amount = models.DecimalField(max_digits=20, decimal_places=2)
@@ -76,6 +310,15 @@ class Budget(models.Model):
     def __str__(self):
         return f"{self.author.username} - ${self.amount} (monthly)"
     
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        invalidate_user_data(self.author_id)
+    
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        invalidate_user_data(self.author_id)
+        return result
+    
     def get_yearly_budget(self):
         return float(self.amount) * 12 if self.amount else 0
     
@@ -86,6 +329,16 @@ class Budget(models.Model):
         ).first()
 
 
+MAX_WEEKLY_LIMIT = 2 ** 31 - 1
+
+def parse_weekly_limit(value):
+    """Return a client-supplied weekly_limit as an int, raising ValueError unless it is a non-negative integer."""
+    if isinstance(value, str) and value.strip().isdigit():
+        value = int(value)
+    if type(value) is not int or not 0 <= value <= MAX_WEEKLY_LIMIT:
+        raise ValueError(f'weekly_limit must be an integer between 0 and {MAX_WEEKLY_LIMIT}')
+    return value
+
 class ChatUsage(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="chat_usage")
     week_start = models.DateField() 
@@ -99,28 +352,99 @@ class ChatUsage(models.Model):
     def __str__(self):
         return f"{self.user.username} - Week {self.week_start} - {self.message_count} messages"
     
+    @staticmethod
+    def current_week_start():
+        today = timezone.now().date()
+        return today - timedelta(days=today.weekday())
+    
     @classmethod
     def get_current_week_usage(cls, user):
-        today = timezone.now().date()
-        days_since_monday = today.weekday()
-        monday = today - timedelta(days=days_since_monday)
-        
         usage, created = cls.objects.get_or_create(
             user=user,
-            week_start=monday,
+            week_start=cls.current_week_start(),
             defaults={'message_count': 0}
         )
         return usage
     
+    @classmethod
+    def get_current_count(cls, user):
+        return cls.objects.filter(
+            user=user,
+            week_start=cls.current_week_start()
+        ).values_list('message_count', flat=True).first() or 0
+    
     @classmethod
     def can_send_message(cls, user, weekly_limit=5):
-        usage = cls.get_current_week_usage(user)
-        return usage.message_count < weekly_limit
+        return cls.get_current_count(user) < weekly_limit
+    
+    @classmethod
+    def reserve_message(cls, user, weekly_limit=5):
+        """
+        Count a message against this week's quota if it is under weekly_limit,
+        in one conditional upsert so concurrent requests cannot overshoot.
+        Returns ``(allowed, message_count)``. Callers validate weekly_limit
+        with parse_weekly_limit.
+        """
+        weekly_limit = int(weekly_limit)
+        table = connection.ops.quote_name(cls._meta.db_table)
+        now = connection.ops.adapt_datetimefield_value(timezone.now())
+        week_start = connection.ops.adapt_datefield_value(cls.current_week_start())
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {table} (user_id, week_start, message_count, created_at, updated_at)
+                SELECT %s, %s, 1, %s, %s WHERE %s > 0
+                ON CONFLICT (user_id, week_start) DO UPDATE
+                SET message_count = {table}.message_count + 1, updated_at = excluded.updated_at
+                WHERE {table}.message_count < %s
+                RETURNING message_count
+                """,
+                [user.id, week_start, now, now, weekly_limit, weekly_limit]
+            )
+            row = cursor.fetchone()
+        if row is None:
+            return False, cls.get_current_count(user)
+        return True, row[0]
+    
+    @classmethod
+    def release_message(cls, user):
+        """Give back a message reserved for a request that failed."""
+        cls.objects.filter(
+            user=user,
+            week_start=cls.current_week_start(),
+            message_count__gt=0
+        ).update(message_count=F('message_count') - 1, updated_at=timezone.now())
     
     @classmethod
     def increment_usage(cls, user):
-        usage = cls.get_current_week_usage(user)
-        usage.message_count += 1
-        usage.save()
-        return usage.message_count
-    
\ No newline at end of file
+        """Count a message against this week's quota regardless of any limit."""
+        table = connection.ops.quote_name(cls._meta.db_table)
+        now = connection.ops.adapt_datetimefield_value(timezone.now())
+        week_start = connection.ops.adapt_datefield_value(cls.current_week_start())
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {table} (user_id, week_start, message_count, created_at, updated_at)
+                VALUES (%s, %s, 1, %s, %s)
+                ON CONFLICT (user_id, week_start) DO UPDATE
+                SET message_count = {table}.message_count + 1, updated_at = excluded.updated_at
+                RETURNING message_count
+                """,
+                [user.id, week_start, now, now]
+            )
+            return cursor.fetchone()[0]
+    
+    @classmethod
+    async def areserve_message(cls, user, weekly_limit=5):
+        return await sync_to_async(cls.reserve_message)(user, weekly_limit)
+    
+    @classmethod
+    async def arelease_message(cls, user):
+        return await sync_to_async(cls.release_message)(user)
+    
+    @classmethod
+    async def aget_current_count(cls, user):
+        return await cls.objects.filter(
+            user=user,
+            week_start=cls.current_week_start()
+        ).values_list('message_count', flat=True).afirst() or 0
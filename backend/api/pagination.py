@@ -0,0 +1,110 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Opt-in keyset pagination over a (field, id) ordering.
+
+    Only active when the request passes ``cursor`` or ``page_size``. Pages are an
+    indexed range scan with no OFFSET or COUNT(*).
+    """
+    ordering = ('-date', '-id')
+    page_size = 50
+    max_page_size = 500
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def is_requested(self, request):
+        params = request.query_params
+        return self.cursor_query_param in params or self.page_size_query_param in params
+
+    def get_ordering(self, view):
+        return getattr(view, 'keyset_ordering', self.ordering)
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.is_requested(request):
+            return None
+
+        self.request = request
+        self.page_size_value = self.get_page_size(request)
+        self.ordering_fields = self.get_ordering(view)
+        self.sort_field = queryset.model._meta.get_field(self.ordering_fields[0].lstrip('-'))
+
+        encoded = request.query_params.get(self.cursor_query_param)
+        self.is_first_page = not encoded
+        if encoded:
+            value, pk = self.decode_cursor(encoded)
+            queryset = queryset.filter(self.after_position(value, pk))
+
+        rows = list(queryset.order_by(*self.ordering_fields)[:self.page_size_value + 1])
+        self.has_next = len(rows) > self.page_size_value
+        rows = rows[:self.page_size_value]
+        self.last_position = (
+            (getattr(rows[-1], self.sort_field.attname), rows[-1].pk) if rows else None
+        )
+        return rows
+
+    def after_position(self, value, pk):
+        field = self.ordering_fields[0]
+        name = field.lstrip('-')
+        comparison = 'lt' if field.startswith('-') else 'gt'
+        id_comparison = 'lt' if self.ordering_fields[1].startswith('-') else 'gt'
+        return (
+            Q(**{f'{name}__{comparison}': value})
+            | Q(**{name: value, f'id__{id_comparison}': pk})
+        )
+
+    def encode_cursor(self, value, pk):
+        if hasattr(value, 'isoformat'):
+            value = value.isoformat()
+        elif value is not None:
+            value = str(value)
+        payload = json.dumps([value, pk])
+        return urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+    def decode_cursor(self, encoded):
+        try:
+            value, pk = json.loads(urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+            return self.sort_field.to_python(value), int(pk)
+        except (TypeError, ValueError, UnicodeError, binascii.Error, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.page_size_query_param, self.page_size_value)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(*self.last_position))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
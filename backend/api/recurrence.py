@@ -0,0 +1,92 @@
+from datetime import date
+from functools import lru_cache
+import calendar
+
+
+def add_months(start, months):
+    """
+    Advance ``start`` by ``months`` renewals the way Subscription.get_next_renewal_date
+    does one at a time. A short month clamps the day, and the clamped day carries
+    into later months (Jan 31 -> Feb 28 -> Mar 28), so the day after n steps is the
+    smallest of the start day and every month length passed through.
+    """
+    day = start.day
+    index = start.year * 12 + start.month - 1
+    for step in range(1, months + 1):
+        year, month = divmod(index + step, 12)
+        day = min(day, calendar.monthrange(year, month + 1)[1])
+        if day <= 28:
+            break
+
+    year, month = divmod(index + months, 12)
+    return date(year, month + 1, day)
+
+
+def add_years(start, years):
+    """Advance ``start`` by ``years`` yearly renewals; Feb 29 settles on Feb 28."""
+    if years and start.month == 2 and start.day == 29:
+        return date(start.year + years, 2, 28)
+    return start.replace(year=start.year + years)
+
+
+@lru_cache(maxsize=4096)
+def next_renewal_on_or_after(renewal_date, frequency, as_of):
+    """
+    Return ``(renewal_date, periods)``: the first renewal date on or after
+    ``as_of`` and the number of periods skipped to reach it.
+    """
+    if renewal_date >= as_of:
+        return renewal_date, 0
+
+    if frequency == 'monthly':
+        periods = (as_of.year - renewal_date.year) * 12 + as_of.month - renewal_date.month
+        advance = add_months
+    else:
+        periods = as_of.year - renewal_date.year
+        advance = add_years
+
+    periods = max(periods, 1)
+    next_date = advance(renewal_date, periods)
+    if next_date < as_of:
+        periods += 1
+        next_date = advance(renewal_date, periods)
+    return next_date, periods
+
+
+@lru_cache(maxsize=16384)
+def project_occurrences(renewal_date, frequency, start, end):
+    """
+    Return the renewal dates falling in the half-open range [start, end) for a
+    subscription whose next renewal is ``renewal_date``. Nothing is projected
+    before ``renewal_date``. Calendar months and years are the common ranges,
+    so subscriptions sharing a renewal date and frequency reuse one result.
+    """
+    if renewal_date >= end:
+        return ()
+
+    current = next_renewal_on_or_after(renewal_date, frequency, start)[0]
+    occurrences = []
+    if frequency == 'monthly':
+        day = current.day
+        year, month = current.year, current.month
+        while current < end:
+            occurrences.append(current)
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+            day = min(day, calendar.monthrange(year, month)[1])
+            current = date(year, month, day)
+    else:
+        while current < end:
+            occurrences.append(current)
+            current = add_years(current, 1)
+    return tuple(occurrences)
+
+
+def expand_subscriptions(subscriptions, start, end):
+    """Return ``(subscription, date)`` pairs for every renewal in [start, end), in date order."""
+    expanded = [
+        (subscription, occurrence)
+        for subscription in subscriptions
+        for occurrence in project_occurrences(subscription.renewal_date, subscription.frequency, start, end)
+    ]
+    expanded.sort(key=lambda pair: (pair[1], pair[0].id))
+    return expanded
@@ -0,0 +1,83 @@
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import Expense
+
+MAX_SEARCH_TERMS = 8
+WORD_RE = re.compile(r'\w+')
+
+# The search index is created by migration 0013: on SQLite an FTS5 table kept in
+# sync by triggers on api_expense, on PostgreSQL a generated search_vector
+# column. A later migration that makes SQLite rebuild api_expense (most field
+# alterations) drops those triggers and must create them again;
+# api.tests.test_search fails until it does.
+SQLITE_FTS_TABLE = 'api_expense_fts'
+
+
+def search_terms(query):
+    return WORD_RE.findall(query.lower())[:MAX_SEARCH_TERMS]
+
+
+def search_expense_ids(user, query, start=None, end=None, categories=None, limit=50, offset=0):
+    """
+    Return ids of the user's expenses whose title or description contain every
+    word of ``query`` (as a prefix), best match first, then most recently added.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return []
+
+    filters = []
+    params = []
+    if start is not None:
+        filters.append('AND e.date >= %s')
+        params.append(connection.ops.adapt_datefield_value(start))
+    if end is not None:
+        filters.append('AND e.date < %s')
+        params.append(connection.ops.adapt_datefield_value(end))
+    if categories:
+        filters.append(f"AND e.category IN ({', '.join(['%s'] * len(categories))})")
+        params.extend(categories)
+    filters = ' '.join(filters)
+
+    if connection.vendor == 'sqlite':
+        # Terms are \w+ tokens, so quoting them cannot break the MATCH syntax.
+        # The author column filter is exact, so the expense table is only
+        # joined when date or category filters need it.
+        match = 'author_id : "{}" AND {{title description}} : ({})'.format(
+            user.id, ' AND '.join(f'"{term}"*' for term in terms)
+        )
+        join = f'JOIN api_expense e ON e.id = {SQLITE_FTS_TABLE}.rowid' if filters else ''
+        sql = f"""
+            SELECT {SQLITE_FTS_TABLE}.rowid FROM {SQLITE_FTS_TABLE} {join}
+            WHERE {SQLITE_FTS_TABLE} MATCH %s {filters}
+            ORDER BY bm25({SQLITE_FTS_TABLE}, 10.0, 5.0, 0.0), {SQLITE_FTS_TABLE}.rowid DESC
+            LIMIT %s OFFSET %s
+        """
+        params = [match, *params, limit, offset]
+    elif connection.vendor == 'postgresql':
+        tsquery = ' & '.join(f'{term}:*' for term in terms)
+        sql = f"""
+            SELECT e.id FROM api_expense e
+            WHERE e.search_vector @@ to_tsquery('simple', %s) AND e.author_id = %s {filters}
+            ORDER BY ts_rank_cd(e.search_vector, to_tsquery('simple', %s)) DESC, e.id DESC
+            LIMIT %s OFFSET %s
+        """
+        params = [tsquery, user.id, *params, tsquery, limit, offset]
+    else:
+        expenses = Expense.objects.filter(author=user)
+        for term in terms:
+            expenses = expenses.filter(Q(title__icontains=term) | Q(description__icontains=term))
+        if start is not None:
+            expenses = expenses.filter(date__gte=start)
+        if end is not None:
+            expenses = expenses.filter(date__lt=end)
+        if categories:
+            expenses = expenses.filter(category__in=categories)
+        return list(expenses.order_by('-id').values_list('id', flat=True)[offset:offset + limit])
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
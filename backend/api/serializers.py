@@ -1,6 +1,21 @@
 from django.contrib.auth.models import User
+from django.core.exceptions import ImproperlyConfigured
 from rest_framework import serializers
+from rest_framework.settings import ISO_8601
 from .models import Expense, Subscription, Budget, ChatUsage
+from .timing import timed
+import decimal
+
+class TimedDataMixin:
+    """Count building ``.data`` as serialize time in the request timing."""
+    
+    @property
+    def data(self):
+        with timed('serialize'):
+            return super().data
+
+class TimedListSerializer(TimedDataMixin, serializers.ListSerializer):
+    pass
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
@@ -21,11 +36,12 @@ class UserSerializer(serializers.ModelSerializer):
         user = User.objects.create_user(**validated_data)
         return user
 
-class ExpenseSerializer(serializers.ModelSerializer):
+class ExpenseSerializer(TimedDataMixin, serializers.ModelSerializer):
     date = serializers.DateField(format='%Y-%m-%d', input_formats=['%Y-%m-%d'])
     
     class Meta:
         model = Expense
+        list_serializer_class = TimedListSerializer
         fields = ["id", "title", "date", "amount", "description", "category", "created_at", "author"]
         extra_kwargs = {
             "author": {"read_only": True},
@@ -37,12 +53,13 @@ class ExpenseSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Amount must be greater than zero.")
         return value
 
-class SubscriptionSerializer(serializers.ModelSerializer):
+class SubscriptionSerializer(TimedDataMixin, serializers.ModelSerializer):
     renewal_date = serializers.DateField(format='%Y-%m-%d', input_formats=['%Y-%m-%d'])
     created_at = serializers.DateTimeField(format='%Y-%m-%d %H:%M:%S', read_only=True)
     
     class Meta:
         model = Subscription
+        list_serializer_class = TimedListSerializer
         fields = ["id", "title", "amount", "frequency", "renewal_date", "category", "is_active", "created_at", "author"]
         extra_kwargs = {
             "author": {"read_only": True},
@@ -54,11 +71,12 @@ class SubscriptionSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Amount must be greater than zero.")
         return value
 
-class BudgetSerializer(serializers.ModelSerializer):
+class BudgetSerializer(TimedDataMixin, serializers.ModelSerializer):
     yearly_amount = serializers.SerializerMethodField()
     
     class Meta:
         model = Budget
+        list_serializer_class = TimedListSerializer
         fields = ["id", "amount", "yearly_amount", "is_active", "created_at", "updated_at", "author"]
         extra_kwargs = {
             "author": {"read_only": True},
@@ -84,3 +102,135 @@ class ChatUsageSerializer(serializers.ModelSerializer):
             "created_at": {"read_only": True},
             "updated_at": {"read_only": True}
         }
+
+
+class FastRowSerializer:
+    """
+    Read-only fast path that renders ``values_list()`` rows exactly like
+    ``serializer_class`` would render model instances, using converters
+    compiled once from the serializer's fields.
+    """
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+        self._fields = None
+    
+    def get_fields(self):
+        if self._fields is None:
+            fields = []
+            for name, field in self.serializer_class().fields.items():
+                if field.write_only:
+                    continue
+                if '.' in field.source or field.source == '*':
+                    raise ImproperlyConfigured(f'{name} is not a plain model column')
+                if isinstance(field, serializers.PrimaryKeyRelatedField):
+                    fields.append((name, f'{field.source}_id', field))
+                elif isinstance(field, (serializers.RelatedField, serializers.SerializerMethodField, serializers.BaseSerializer)):
+                    raise ImproperlyConfigured(f'{name} cannot be rendered from a values() row')
+                else:
+                    fields.append((name, field.source, field))
+            self._fields = fields
+        return self._fields
+    
+    @property
+    def columns(self):
+        return [column for _, column, _ in self.get_fields()]
+    
+    def build_converter(self, field):
+        if isinstance(field, serializers.PrimaryKeyRelatedField):
+            return (lambda value: value) if field.pk_field is None else field.pk_field.to_representation
+        
+        if isinstance(field, serializers.DateTimeField):
+            output_format = getattr(field, 'format', serializers.api_settings.DATETIME_FORMAT)
+            field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+            if output_format is None or field_timezone is None:
+                return field.to_representation
+            
+            if output_format.lower() == ISO_8601:
+                def convert_datetime(value):
+                    if isinstance(value, str) or value.tzinfo is None:
+                        return field.to_representation(value)
+                    value = value.astimezone(field_timezone).isoformat()
+                    return value[:-6] + 'Z' if value.endswith('+00:00') else value
+            else:
+                def convert_datetime(value):
+                    if isinstance(value, str) or value.tzinfo is None:
+                        return field.to_representation(value)
+                    return value.astimezone(field_timezone).strftime(output_format)
+            return convert_datetime
+        
+        if isinstance(field, serializers.DateField):
+            output_format = getattr(field, 'format', serializers.api_settings.DATE_FORMAT)
+            if output_format is None:
+                return field.to_representation
+            if output_format.lower() == ISO_8601 or output_format == '%Y-%m-%d':
+                return lambda value: value.isoformat() if value.year >= 1000 else field.to_representation(value)
+            return field.to_representation
+        
+        if isinstance(field, serializers.DecimalField):
+            coerce_to_string = getattr(field, 'coerce_to_string', serializers.api_settings.COERCE_DECIMAL_TO_STRING)
+            if field.decimal_places is None or field.normalize_output or field.localize or not coerce_to_string:
+                return field.to_representation
+            
+            exponent = decimal.Decimal('.1') ** field.decimal_places
+            context = decimal.getcontext().copy()
+            if field.max_digits is not None:
+                context.prec = field.max_digits
+            rounding = field.rounding
+            
+            def convert_decimal(value):
+                if not isinstance(value, decimal.Decimal):
+                    value = decimal.Decimal(str(value).strip())
+                return f'{value.quantize(exponent, rounding=rounding, context=context):f}'
+            return convert_decimal
+        
+        if type(field) is serializers.CharField:
+            return lambda value: value if type(value) is str else str(value)
+        
+        if type(field) is serializers.IntegerField:
+            return lambda value: value if type(value) is int else int(value)
+        
+        return field.to_representation
+    
+    def serialize_rows(self, rows):
+        fields = self.get_fields()
+        names = [name for name, _, _ in fields]
+        converters = [self.build_converter(field) for _, _, field in fields]
+        
+        with timed('serialize'):
+            return [
+                {
+                    name: None if value is None else convert(value)
+                    for name, convert, value in zip(names, converters, row)
+                }
+                for row in rows
+            ]
+    
+    def serialize(self, queryset):
+        return self.serialize_rows(queryset.values_list(*self.columns))
+
+
+fast_expense_serializer = FastRowSerializer(ExpenseSerializer)
+fast_subscription_serializer = FastRowSerializer(SubscriptionSerializer)
+
+
+def serialize_occurrences(occurrences):
+    """
+    Serialize ``(subscription, date)`` pairs from api.recurrence.expand_subscriptions
+    as subscriptions whose renewal_date is the occurrence date.
+    """
+    columns = fast_subscription_serializer.columns
+    serialized = {
+        row['id']: row
+        for row in fast_subscription_serializer.serialize_rows(
+            tuple(getattr(subscription, column) for column in columns)
+            for subscription, _ in occurrences
+        )
+    }
+    return [
+        dict(
+            serialized[subscription.id],
+            renewal_date=renewal_date.isoformat(),
+            is_projected=renewal_date != subscription.renewal_date
+        )
+        for subscription, renewal_date in occurrences
+    ]
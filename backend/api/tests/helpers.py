@@ -0,0 +1,11 @@
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+def create_client(username='alice'):
+    """Return a user and an APIClient carrying their access token cookie."""
+    user = User.objects.create_user(username=username, password='correct-horse-battery')
+    client = APIClient()
+    client.cookies['access_token'] = str(RefreshToken.for_user(user).access_token)
+    return user, client
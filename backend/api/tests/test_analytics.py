@@ -0,0 +1,123 @@
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+import random
+
+from django.test import TestCase
+
+from api.models import Expense
+from .helpers import create_client
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def week_start(day):
+    return day - timedelta(days=day.weekday())
+
+
+def previous_month(day):
+    return date(day.year - 1, 12, 1) if day.month == 1 else date(day.year, day.month - 1, 1)
+
+
+class ExpenseAnalyticsViewTests(TestCase):
+    def setUp(self):
+        self.user, self.client = create_client()
+        other, _ = create_client('bob')
+        rng = random.Random(2024)
+        # Whole months and weeks without spend, so LAG's previous row is often
+        # not the previous period.
+        skipped_months = {(2023, 2), (2023, 3), (2023, 7), (2024, 1), (2024, 5), (2024, 6)}
+        self.expenses = []
+        day = date(2022, 11, 1)
+        while day < date(2024, 12, 1):
+            if (day.year, day.month) not in skipped_months and rng.random() < 0.3:
+                self.expenses.append(Expense(
+                    author=self.user, title='Item', date=day, category=rng.choice(['Food', 'Rent', 'Travel']),
+                    amount=Decimal(rng.randrange(100, 10000)) / 100
+                ))
+            day += timedelta(days=1)
+        Expense.objects.bulk_create(self.expenses)
+        Expense.objects.create(author=other, title='Other', date=date(2024, 3, 3), amount=Decimal('999.00'))
+
+    def analytics(self, **params):
+        response = self.client.get('/api/expenses/analytics/', params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data
+
+    def expected_series(self, start, end, period_of, step_back, label, year_over_year):
+        totals, counts = defaultdict(Decimal), defaultdict(int)
+        for expense in self.expenses:
+            totals[period_of(expense.date)] += expense.amount
+            counts[period_of(expense.date)] += 1
+        periods = sorted(
+            period for period in totals if period_of(start) <= period <= period_of(end - timedelta(days=1))
+        )
+        series = {
+            'periods': [label(period) for period in periods],
+            'totals': [float(totals[period]) for period in periods],
+            'counts': [counts[period] for period in periods],
+            'deltas': [float(totals[period] - totals.get(step_back(period), 0)) for period in periods],
+        }
+        if year_over_year:
+            series['year_over_year_deltas'] = [
+                float(totals[period] - totals.get(period.replace(year=period.year - 1), 0)) for period in periods
+            ]
+        return series
+
+    def test_sections_match_python_sums(self):
+        start, end = date(2023, 4, 15), date(2024, 9, 10)
+        data = self.analytics(start=start.isoformat(), end=end.isoformat())
+        in_range = [expense for expense in self.expenses if start <= expense.date < end]
+
+        self.assertEqual((data['start'], data['end']), (start.isoformat(), end.isoformat()))
+        self.assertAlmostEqual(data['total'], float(sum(expense.amount for expense in in_range)))
+        self.assertEqual(data['count'], len(in_range))
+
+        category_totals = defaultdict(Decimal)
+        for expense in in_range:
+            category_totals[expense.category] += expense.amount
+        categories = sorted(category_totals, key=lambda category: (-category_totals[category], category))
+        self.assertEqual(data['category']['labels'], categories)
+        self.assertEqual(data['category']['totals'], [float(category_totals[c]) for c in categories])
+
+        self.assertEqual(data['month'], self.expected_series(
+            start, end, month_start, previous_month, lambda period: period.strftime('%Y-%m'), True
+        ))
+        self.assertEqual(data['week'], self.expected_series(
+            start, end, week_start, lambda period: period - timedelta(weeks=1), lambda period: period.isoformat(), False
+        ))
+
+        weekday_totals, weekday_counts = [Decimal('0')] * 7, [0] * 7
+        for expense in in_range:
+            weekday_totals[expense.date.weekday()] += expense.amount
+            weekday_counts[expense.date.weekday()] += 1
+        self.assertEqual(data['weekday']['labels'], ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'])
+        self.assertEqual(data['weekday']['totals'], [float(total) for total in weekday_totals])
+        self.assertEqual(data['weekday']['counts'], weekday_counts)
+
+    def test_periods_after_a_gap_compare_with_zero(self):
+        data = self.analytics(start='2023-01-01', end='2023-05-01', include='month')
+        self.assertEqual(data['month']['periods'], ['2023-01', '2023-04'])
+        # March had no spend, so April's change is its whole total.
+        self.assertEqual(data['month']['deltas'][1], data['month']['totals'][1])
+        self.assertEqual(set(data), {'start', 'end', 'total', 'count', 'month'})
+
+    def test_category_filter(self):
+        data = self.analytics(start='2023-01-01', end='2024-01-01', category='Food,Travel', include='category')
+        self.assertEqual(set(data['category']['labels']), {'Food', 'Travel'})
+        self.assertAlmostEqual(data['total'], float(sum(
+            expense.amount for expense in self.expenses
+            if expense.category in ('Food', 'Travel') and expense.date.year == 2023
+        )))
+
+    def test_invalid_parameters_are_rejected(self):
+        for params in (
+            {'start': '2024/01/01'}, {'end': 'tomorrow'}, {'start': '2024-02-01', 'end': '2024-02-01'},
+            {'start': '2024-03-01', 'end': '2024-02-01'}, {'include': 'month,hour'}, {'include': ','},
+        ):
+            with self.subTest(params=params):
+                response = self.client.get('/api/expenses/analytics/', params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('error', response.data)
@@ -0,0 +1,66 @@
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory
+
+from api.authentication import CookieJWTAuthentication, user_cache
+from .helpers import create_client
+
+
+@override_settings(AUTH_USER_CACHE_ENABLED=True)
+class UserCacheTests(TestCase):
+    def setUp(self):
+        user_cache.clear()
+        self.addCleanup(user_cache.clear)
+        self.user, self.client = create_client()
+
+    def authenticate(self):
+        request = APIRequestFactory().get('/api/expenses/')
+        request.COOKIES['access_token'] = self.client.cookies['access_token'].value
+        return CookieJWTAuthentication().authenticate(request)[0]
+
+    def auth_user_queries(self, queries):
+        return [query['sql'] for query in queries if 'auth_user' in query['sql']]
+
+    def test_cache_hit_skips_the_user_query(self):
+        with CaptureQueriesContext(connection) as first:
+            self.authenticate()
+        self.assertEqual(len(self.auth_user_queries(first.captured_queries)), 1)
+
+        with self.assertNumQueries(0):
+            user = self.authenticate()
+        self.assertEqual(user.pk, self.user.pk)
+
+    def test_each_request_gets_its_own_copy(self):
+        first = self.authenticate()
+        second = self.authenticate()
+        self.assertIsNot(first, second)
+
+        second.first_name = 'Changed'
+        self.assertEqual(self.authenticate().first_name, '')
+
+    def test_account_update_evicts_the_entry(self):
+        self.authenticate()
+        response = self.client.post('/api/user/update/', {
+            'current_password': 'correct-horse-battery', 'username': 'alicia'
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(user_cache.get(self.user.pk))
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.authenticate().username, 'alicia')
+        self.assertEqual(len(self.auth_user_queries(queries.captured_queries)), 1)
+
+    def test_deactivated_user_is_rejected_on_the_next_request(self):
+        self.assertEqual(self.client.get('/api/expenses/').status_code, 200)
+        self.assertIsNotNone(user_cache.get(self.user.pk))
+
+        self.user.is_active = False
+        self.user.save()
+
+        self.assertEqual(self.client.get('/api/expenses/').status_code, 401)
+
+    def test_deleted_user_is_evicted(self):
+        self.authenticate()
+        self.user.delete()
+        self.assertIsNone(user_cache.get(self.user.pk))
@@ -0,0 +1,24 @@
+from django.test import TestCase
+
+from api.models import Expense
+from .helpers import create_client
+
+
+class ExpenseBatchViewTests(TestCase):
+    def setUp(self):
+        self.user, self.client = create_client()
+
+    def test_malformed_bodies_are_rejected(self):
+        for body in ([{'op': 'delete', 'id': 1}], 'operations', {'operations': {'op': 'create'}}, {'operations': []}, {}):
+            with self.subTest(body=body):
+                response = self.client.post('/api/expenses/batch/', body, format='json')
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('error', response.data)
+
+    def test_valid_batch(self):
+        response = self.client.post('/api/expenses/batch/', {'operations': [
+            {'op': 'create', 'data': {'title': 'Coffee', 'amount': '3.20', 'date': '2024-05-01', 'category': 'Food'}},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['applied'])
+        self.assertEqual(Expense.objects.filter(author=self.user).count(), 1)
@@ -0,0 +1,119 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from api.cache import check_shared_response_cache, get_data_version
+from api.models import Expense, Subscription
+from .helpers import create_client
+
+LOCMEM = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+REDIS = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache'}}
+
+
+class ResponseCacheTests(TestCase):
+    def test_locmem_response_cache_is_an_error_outside_debug(self):
+        with override_settings(DEBUG=False, RESPONSE_CACHE_ENABLED=True, CACHES=LOCMEM):
+            self.assertEqual([error.id for error in check_shared_response_cache()], ['api.E002'])
+        with override_settings(DEBUG=False, RESPONSE_CACHE_ENABLED=False, CACHES=LOCMEM):
+            self.assertEqual(check_shared_response_cache(), [])
+        with override_settings(DEBUG=False, RESPONSE_CACHE_ENABLED=True, CACHES=REDIS):
+            self.assertEqual(check_shared_response_cache(), [])
+
+    @override_settings(RESPONSE_CACHE_ENABLED=False)
+    def test_disabled_cache_serves_fresh_data(self):
+        user, client = create_client()
+        self.assertEqual(client.get('/api/dashboard/summary/').data['total_expenses'], 0)
+        Expense.objects.create(author=user, title='Lunch', amount=Decimal('12.00'), date=timezone.now().date())
+        self.assertEqual(client.get('/api/dashboard/summary/').data['total_expenses'], 12.0)
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=True)
+class EnabledResponseCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user, self.client = create_client()
+        self.user.is_staff = True
+        self.user.save()
+        self.today = timezone.now().date()
+
+    def summary(self):
+        response = self.client.get('/api/dashboard/summary/')
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def stats(self, scope):
+        return self.client.get('/api/cache/stats/').data[scope]
+
+    def write(self, method, path, data):
+        """Send a write and run its on_commit version bump; return the old and new versions."""
+        version = get_data_version(self.user.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = getattr(self.client, method)(path, data, format='json')
+        self.assertLess(response.status_code, 300, response.data)
+        return version, get_data_version(self.user.id)
+
+    def test_second_get_is_a_hit(self):
+        self.assertEqual(self.stats('dashboard-summary'), {'hits': 0, 'misses': 0, 'hit_ratio': 0})
+        first = self.summary()
+        # Only the user lookup for authentication; the data comes from the cache.
+        with self.assertNumQueries(1):
+            self.assertEqual(self.summary(), first)
+        self.assertEqual(self.stats('dashboard-summary'), {'hits': 1, 'misses': 1, 'hit_ratio': 0.5})
+
+    def test_writes_refresh_the_cached_response(self):
+        self.summary()
+
+        old, new = self.write('post', '/api/expenses/', {
+            'title': 'Lunch', 'amount': '12.00', 'date': self.today.isoformat(), 'category': 'Food'
+        })
+        self.assertNotEqual(old, new)
+        self.assertEqual(self.summary()['total_expenses'], 12.0)
+
+        old, new = self.write('post', '/api/subscriptions/', {
+            'title': 'Music', 'amount': '10.00', 'frequency': 'monthly',
+            'renewal_date': self.today.isoformat(), 'category': 'Media'
+        })
+        self.assertNotEqual(old, new)
+        self.assertEqual(self.summary()['total_subscriptions'], 10.0)
+
+        old, new = self.write('post', '/api/budgets/', {'amount': '500.00'})
+        self.assertNotEqual(old, new)
+        self.assertEqual(self.summary()['remaining_budget'], 478.0)
+
+        old, new = self.write('post', '/api/expenses/batch/', {'operations': [
+            {'op': 'create', 'data': {'title': 'Taxi', 'amount': '8.00', 'date': self.today.isoformat()}},
+        ]})
+        self.assertNotEqual(old, new)
+        self.assertEqual(self.summary()['total_expenses'], 20.0)
+
+        self.assertEqual(self.stats('dashboard-summary')['hits'], 0)
+        self.assertEqual(self.stats('dashboard-summary')['misses'], 5)
+
+    def test_process_renewals_refreshes_the_cached_response(self):
+        subscription = Subscription.objects.create(
+            author=self.user, title='Music', amount=Decimal('10.00'), frequency='monthly',
+            renewal_date=self.today - timedelta(days=40)
+        )
+        for _ in range(2):
+            self.assertEqual(
+                self.client.get('/api/subscriptions/').data[0]['renewal_date'], subscription.renewal_date.isoformat()
+            )
+        self.assertEqual(self.stats('subscriptions')['hits'], 1)
+
+        version = get_data_version(self.user.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('process_renewals', stdout=StringIO())
+        self.assertNotEqual(get_data_version(self.user.id), version)
+
+        subscription.refresh_from_db()
+        self.assertGreaterEqual(subscription.renewal_date, self.today)
+        self.assertEqual(
+            self.client.get('/api/subscriptions/').data[0]['renewal_date'], subscription.renewal_date.isoformat()
+        )
+        self.assertEqual(self.stats('subscriptions'), {'hits': 1, 'misses': 2, 'hit_ratio': 1 / 3})
@@ -0,0 +1,20 @@
+from django.test import TestCase
+
+from .helpers import create_client
+
+
+class CalendarViewTests(TestCase):
+    def setUp(self):
+        self.user, self.client = create_client()
+
+    def test_valid_month(self):
+        response = self.client.get('/api/calendar/', {'month': 12, 'year': 2024})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['month'], response.data['year']), (12, 2024))
+
+    def test_invalid_month_or_year_is_rejected(self):
+        for params in ({'month': 13}, {'month': 0}, {'month': 'abc'}, {'year': 'abc'}, {'year': 0}, {'year': 9999}):
+            with self.subTest(params=params):
+                response = self.client.get('/api/calendar/', params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('error', response.data)
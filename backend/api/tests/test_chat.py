@@ -0,0 +1,78 @@
+from http.server import ThreadingHTTPServer
+from unittest import mock
+import json
+import threading
+
+from asgiref.sync import async_to_sync
+from django.test import TransactionTestCase, override_settings
+
+from api import chat
+from api.management.commands.chat_loadtest import STUB_REPLY, make_stub_handler
+from .helpers import create_client
+
+
+class ChatViewTests(TransactionTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), make_stub_handler(0))
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.user, self.client = create_client()
+        base_url = f'http://127.0.0.1:{self.server.server_address[1]}/v1'
+        settings_override = override_settings(OPENAI_BASE_URL=base_url, RESPONSE_CACHE_ENABLED=False)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        environ = mock.patch.dict('os.environ', {'OPEN_AI_API_KEY': 'stub-key'})
+        environ.start()
+        self.addCleanup(environ.stop)
+        # Build the client against this test's stub server.
+        chat._upstream.pop('client', None)
+
+    def post(self, body, **kwargs):
+        return self.client.post('/api/chat/message/', body, content_type='application/json', **kwargs)
+
+    def test_malformed_bodies_are_rejected(self):
+        for body in ('{not json', '[1, 2]', '"hello"', b'\xff'):
+            with self.subTest(body=body):
+                response = self.post(body)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('error', response.json())
+
+    def test_inactive_user_is_rejected(self):
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.post({'message': 'Hi'}).status_code, 401)
+
+    def test_requests_share_one_upstream_client(self):
+        # The test client runs every async view on a new event loop, like WSGI.
+        first = self.post({'message': 'How can I save?'})
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.json()['message'], STUB_REPLY)
+        client = chat._upstream['client']
+
+        second = self.post({'message': 'How can I budget?'})
+        self.assertEqual(second.status_code, 200)
+        self.assertIs(chat._upstream['client'], client)
+
+    def test_stream(self):
+        response = self.post({'message': 'Stream please', 'stream': True})
+        self.assertEqual(response.status_code, 200)
+        async def read(content):
+            return b''.join([chunk async for chunk in content])
+
+        events = async_to_sync(read)(response.streaming_content).decode()
+        tokens = [
+            json.loads(line.removeprefix('data: '))['content']
+            for block in events.split('\n\n') if block.startswith('event: token')
+            for line in block.splitlines() if line.startswith('data: ')
+        ]
+        self.assertEqual(''.join(tokens), STUB_REPLY)
+        self.assertIn('event: done', events)
@@ -0,0 +1,52 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+
+from api.models import ChatUsage
+from .helpers import create_client
+
+
+class ReserveMessageConcurrencyTests(TransactionTestCase):
+    def test_concurrent_reservations_stop_at_the_limit(self):
+        user, _ = create_client()
+        threads, weekly_limit = 16, 5
+        barrier = threading.Barrier(threads)
+
+        def reserve(_):
+            barrier.wait()
+            try:
+                return ChatUsage.reserve_message(user, weekly_limit)[0]
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(threads) as executor:
+            allowed = list(executor.map(reserve, range(threads)))
+
+        self.assertEqual(allowed.count(True), weekly_limit)
+        self.assertEqual(ChatUsage.get_current_count(user), weekly_limit)
+
+
+class ChatUsageTests(TestCase):
+    def setUp(self):
+        self.user, self.client = create_client()
+
+    def test_increment_usage_ignores_limits(self):
+        self.assertEqual([ChatUsage.increment_usage(self.user) for _ in range(3)], [1, 2, 3])
+        self.assertFalse(ChatUsage.reserve_message(self.user, weekly_limit=3)[0])
+        self.assertEqual(ChatUsage.increment_usage(self.user), 4)
+
+    def test_invalid_weekly_limit_is_rejected(self):
+        for weekly_limit in ('abc', -1, 1.5, None, True, '2.5', 2 ** 31):
+            with self.subTest(weekly_limit=weekly_limit):
+                for path in ('/api/chat/usage/', '/api/chat/message/'):
+                    response = self.client.post(path, {'message': 'Hi', 'weekly_limit': weekly_limit}, format='json')
+                    self.assertEqual(response.status_code, 400)
+                    self.assertIn('error', response.json())
+        self.assertEqual(ChatUsage.get_current_count(self.user), 0)
+
+    def test_reserve_until_limit(self):
+        statuses = [self.client.post('/api/chat/usage/', {'weekly_limit': '2'}, format='json').status_code
+                    for _ in range(3)]
+        self.assertEqual(statuses, [200, 200, 429])
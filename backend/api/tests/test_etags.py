@@ -0,0 +1,75 @@
+from datetime import date
+from decimal import Decimal
+
+from django.test import TestCase
+
+from api.models import Expense
+from .helpers import create_client
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        self.user, self.client = create_client()
+        self.expense = Expense.objects.create(
+            author=self.user, title='Coffee', amount=Decimal('3.20'), date=date(2024, 5, 1), category='Food'
+        )
+
+    def etag(self, client=None, path='/api/expenses/', params=None):
+        response = (client or self.client).get(path, params or {})
+        self.assertEqual(response.status_code, 200)
+        return response['ETag']
+
+    def test_matching_if_none_match_is_not_modified(self):
+        etag = self.etag()
+
+        response = self.client.get('/api/expenses/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+
+        self.assertEqual(self.client.get('/api/expenses/', HTTP_IF_NONE_MATCH=f'"other", W/{etag}').status_code, 304)
+        self.assertEqual(self.client.get('/api/expenses/', HTTP_IF_NONE_MATCH='"other"').status_code, 200)
+
+    def test_writes_change_the_etag(self):
+        etags = [self.etag()]
+
+        response = self.client.post('/api/expenses/', {
+            'title': 'Lunch', 'amount': '9.50', 'date': '2024-05-02', 'category': 'Food'
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        etags.append(self.etag())
+
+        response = self.client.patch(f'/api/expenses/{self.expense.id}/', {'title': 'Tea'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        etags.append(self.etag())
+
+        # A queryset update that does not name updated_at still bumps it.
+        Expense.objects.filter(pk=self.expense.pk).update(description='oolong')
+        etags.append(self.etag())
+
+        self.assertEqual(self.client.delete(f'/api/expenses/{self.expense.id}/').status_code, 204)
+        etags.append(self.etag())
+
+        self.assertEqual(len(set(etags)), len(etags))
+        self.assertEqual(self.client.get('/api/expenses/', HTTP_IF_NONE_MATCH=etags[0]).status_code, 200)
+
+    def test_etag_depends_on_query_string_and_user(self):
+        _, other_client = create_client('bob')
+
+        self.assertEqual(self.etag(), self.etag())
+        self.assertNotEqual(self.etag(), self.etag(params={'category': 'Food'}))
+        self.assertNotEqual(self.etag(), self.etag(other_client))
+        self.assertEqual(
+            self.client.get('/api/expenses/', HTTP_IF_NONE_MATCH=self.etag(other_client)).status_code, 200
+        )
+
+    def test_calendar_etag_follows_the_requested_month(self):
+        may = self.etag(path='/api/calendar/', params={'month': 5, 'year': 2024})
+        june = self.etag(path='/api/calendar/', params={'month': 6, 'year': 2024})
+        self.assertNotEqual(may, june)
+
+        Expense.objects.create(
+            author=self.user, title='Book', amount=Decimal('12.00'), date=date(2024, 6, 3), category='Books'
+        )
+        self.assertEqual(self.etag(path='/api/calendar/', params={'month': 5, 'year': 2024}), may)
+        self.assertNotEqual(self.etag(path='/api/calendar/', params={'month': 6, 'year': 2024}), june)
@@ -0,0 +1,119 @@
+from datetime import date
+from decimal import Decimal
+import csv
+import gzip
+import io
+import json
+
+from django.test import TestCase
+
+from api.models import Expense, Subscription
+from .helpers import create_client
+
+
+class ExportViewTests(TestCase):
+    def setUp(self):
+        self.user, self.client = create_client()
+        _, self.other_client = create_client('bob')
+        self.lunch = Expense.objects.create(
+            author=self.user, title='Lunch, "deluxe"', amount=Decimal('12.50'), date=date(2024, 1, 5),
+            description='line one\nline two', category='Food'
+        )
+        self.train = Expense.objects.create(
+            author=self.user, title='Train', amount=Decimal('4.00'), date=date(2024, 2, 1), category='Transport'
+        )
+        self.snack = Expense.objects.create(
+            author=self.user, title='Snack', amount=Decimal('2.10'), date=date(2024, 1, 20), category='Food'
+        )
+
+    def export(self, path='/api/expenses/export/', **params):
+        response = self.client.get(path, params)
+        self.assertEqual(response.status_code, 200)
+        return response, b''.join(response.streaming_content)
+
+    def test_csv_body(self):
+        response, body = self.export()
+
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="expenses.csv"')
+        text = body.decode('utf-8')
+        self.assertTrue(text.startswith('id,title,date,amount,description,category,created_at\r\n'))
+        self.assertIn('"Lunch, ""deluxe""",2024-01-05,12.50,"line one\nline two",Food,', text)
+        self.assertEqual(list(csv.reader(io.StringIO(text)))[1:], [
+            [str(expense.id), expense.title, expense.date.isoformat(), str(expense.amount),
+             expense.description or '', expense.category, expense.created_at.isoformat()]
+            for expense in (self.lunch, self.snack, self.train)
+        ])
+
+    def test_ndjson_body(self):
+        response, body = self.export(output='ndjson')
+
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="expenses.ndjson"')
+        rows = [json.loads(line) for line in body.decode('utf-8').splitlines()]
+        self.assertEqual(rows[0], {
+            'id': self.lunch.id, 'title': 'Lunch, "deluxe"', 'date': '2024-01-05', 'amount': '12.50',
+            'description': 'line one\nline two', 'category': 'Food', 'created_at': self.lunch.created_at.isoformat(),
+        })
+        self.assertEqual([row['id'] for row in rows], [self.lunch.id, self.snack.id, self.train.id])
+        self.assertIsNone(rows[2]['description'])
+
+    def test_gzip_round_trips(self):
+        for output in ('csv', 'ndjson'):
+            with self.subTest(output=output):
+                _, plain = self.export(output=output)
+                response, compressed = self.export(output=output, gzip='1')
+                self.assertEqual(response['Content-Type'], 'application/gzip')
+                self.assertEqual(
+                    response['Content-Disposition'], f'attachment; filename="expenses.{output}.gz"'
+                )
+                self.assertEqual(gzip.decompress(compressed), plain)
+
+    def test_filters(self):
+        cases = [
+            ({'start': '2024-01-10'}, [self.snack, self.train]),
+            ({'end': '2024-02-01'}, [self.lunch, self.snack]),
+            ({'start': '2024-01-01', 'end': '2024-01-20'}, [self.lunch]),
+            ({'category': 'Food'}, [self.lunch, self.snack]),
+            ({'category': 'Transport,Books'}, [self.train]),
+        ]
+        for params, expected in cases:
+            with self.subTest(params=params):
+                _, body = self.export(output='ndjson', **params)
+                ids = [json.loads(line)['id'] for line in body.decode('utf-8').splitlines()]
+                self.assertEqual(ids, [expense.id for expense in expected])
+
+    def test_other_users_export_is_empty(self):
+        response = self.other_client.get('/api/expenses/export/')
+        self.assertEqual(
+            b''.join(response.streaming_content), b'id,title,date,amount,description,category,created_at\r\n'
+        )
+
+    def test_invalid_parameters_are_rejected(self):
+        for params in ({'output': 'xlsx'}, {'start': '2024/01/01'}, {'end': 'soon'}):
+            with self.subTest(params=params):
+                response = self.client.get('/api/expenses/export/', params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('error', response.data)
+
+    def test_subscriptions_export(self):
+        music = Subscription.objects.create(
+            author=self.user, title='Music', amount=Decimal('9.99'), frequency='monthly',
+            renewal_date=date(2024, 3, 1), category='Media'
+        )
+        domain = Subscription.objects.create(
+            author=self.user, title='Domain', amount=Decimal('12.00'), frequency='yearly',
+            renewal_date=date(2024, 2, 1), is_active=False
+        )
+
+        response, body = self.export('/api/subscriptions/export/')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="subscriptions.csv"')
+        self.assertEqual(list(csv.reader(io.StringIO(body.decode('utf-8')))), [
+            ['id', 'title', 'amount', 'frequency', 'renewal_date', 'category', 'is_active', 'created_at'],
+            [str(domain.id), 'Domain', '12.00', 'yearly', '2024-02-01', 'Other', 'False', domain.created_at.isoformat()],
+            [str(music.id), 'Music', '9.99', 'monthly', '2024-03-01', 'Media', 'True', music.created_at.isoformat()],
+        ])
+
+        _, body = self.export('/api/subscriptions/export/', output='ndjson', start='2024-02-15')
+        rows = [json.loads(line) for line in body.decode('utf-8').splitlines()]
+        self.assertEqual([(row['id'], row['is_active']) for row in rows], [(music.id, True)])
@@ -0,0 +1,96 @@
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+
+from django.test import TestCase
+
+from api.filters import check_expense_filter_indexes
+from api.models import Expense
+from .helpers import create_client
+
+
+class ExpenseListFilterTests(TestCase):
+    def setUp(self):
+        self.user, self.client = create_client()
+        _, self.other_client = create_client('bob')
+        # Repeated dates and amounts so keyset ties are broken by id.
+        self.expenses = [
+            Expense.objects.create(
+                author=self.user, title=f'{"Coffee" if index % 3 else "Lunch"} {index}',
+                amount=Decimal(['3.20', '9.50', '12.00'][index % 3]),
+                date=date(2024, 1 + index % 4, 1 + index % 2), category=['Food', 'Travel'][index % 2]
+            )
+            for index in range(17)
+        ]
+
+    def ids(self, expenses):
+        return [expense.id for expense in expenses]
+
+    def walk(self, path='/api/expenses/', **params):
+        pages = []
+        response = self.client.get(path, {'page_size': 4, **params})
+        while True:
+            self.assertEqual(response.status_code, 200)
+            pages.append(response.data)
+            if not response.data['next']:
+                return pages
+            response = self.client.get(response.data['next'])
+
+    def test_every_sort_visits_each_row_once(self):
+        orderings = {
+            'date': lambda expense: (expense.date, expense.id),
+            '-date': lambda expense: (-expense.date.toordinal(), -expense.id),
+            'amount': lambda expense: (expense.amount, expense.id),
+            '-amount': lambda expense: (-expense.amount, -expense.id),
+        }
+        for sort, key in orderings.items():
+            with self.subTest(sort=sort):
+                pages = self.walk(sort=sort)
+                self.assertEqual(len(pages), 5)
+                self.assertTrue(all(len(page['results']) == 4 for page in pages[:-1]))
+                self.assertEqual(
+                    [row['id'] for page in pages for row in page['results']],
+                    self.ids(sorted(self.expenses, key=key))
+                )
+
+    def test_filters_carry_into_next_links(self):
+        pages = self.walk(category='Food', min_amount='5', sort='amount')
+        expected = sorted(
+            (expense for expense in self.expenses if expense.category == 'Food' and expense.amount >= 5),
+            key=lambda expense: (expense.amount, expense.id)
+        )
+        self.assertEqual([row['id'] for page in pages for row in page['results']], self.ids(expected))
+
+    def test_whitelisted_filters(self):
+        cases = [
+            ({'start': '2024-02-01', 'end': '2024-04-01'}, lambda e: date(2024, 2, 1) <= e.date < date(2024, 4, 1)),
+            ({'min_amount': '9.50', 'max_amount': '9.50'}, lambda e: e.amount == Decimal('9.50')),
+            ({'category': 'Travel'}, lambda e: e.category == 'Travel'),
+            ({'title': 'LUN'}, lambda e: e.title.startswith('Lunch')),
+            ({'author': 'someone', 'ordering': 'title'}, lambda e: True),
+        ]
+        for params, keep in cases:
+            with self.subTest(params=params):
+                response = self.client.get('/api/expenses/', {**params, 'sort': 'date'})
+                self.assertEqual(response.status_code, 200)
+                expected = sorted(filter(keep, self.expenses), key=lambda e: (e.date, e.id))
+                self.assertEqual([row['id'] for row in response.data], self.ids(expected))
+
+    def test_invalid_parameters_are_rejected(self):
+        for params in (
+            {'min_amount': 'lots'}, {'max_amount': 'NaN'}, {'start': '01/02/2024'}, {'end': '2024-13-01'},
+            {'sort': 'title'}, {'title': 'x' * 101},
+        ):
+            with self.subTest(params=params):
+                response = self.client.get('/api/expenses/', params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('error', response.data)
+
+    def test_missing_filter_index_is_reported(self):
+        self.assertEqual(check_expense_filter_indexes(), [])
+
+        indexes = [index for index in Expense._meta.indexes if index.name != 'expense_author_amount_idx']
+        with mock.patch.object(Expense._meta, 'indexes', indexes):
+            errors = check_expense_filter_indexes()
+        self.assertEqual([error.id for error in errors], ['api.E001'])
+        self.assertIn('expense_author_amount_idx', errors[0].msg)
@@ -0,0 +1,129 @@
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+import random
+
+from django.test import TestCase
+
+from api.models import Expense, Subscription
+from .helpers import create_client
+
+
+class CalendarHeatmapViewTests(TestCase):
+    def setUp(self):
+        self.user, self.client = create_client()
+        other, _ = create_client('bob')
+        rng = random.Random(19)
+        self.expenses = []
+        day = date(2024, 1, 1)
+        while day < date(2025, 1, 1):
+            # Most days have no spend; some have several expenses.
+            for _ in range(rng.choice([0, 0, 0, 1, 2])):
+                self.expenses.append(Expense(
+                    author=self.user, title='Item', date=day, category=rng.choice(['Food', 'Travel']),
+                    amount=Decimal(rng.randrange(100, 5000)) / 100
+                ))
+            day += timedelta(days=1)
+        Expense.objects.bulk_create(self.expenses)
+        Expense.objects.create(author=other, title='Other', date=date(2024, 3, 4), amount=Decimal('999.00'))
+
+        self.music = Subscription.objects.create(
+            author=self.user, title='Music', amount=Decimal('10.00'), frequency='monthly', renewal_date=date(2024, 1, 31)
+        )
+        self.video = Subscription.objects.create(
+            author=self.user, title='Video', amount=Decimal('15.00'), frequency='monthly', renewal_date=date(2024, 1, 31)
+        )
+        self.domain = Subscription.objects.create(
+            author=self.user, title='Domain', amount=Decimal('12.00'), frequency='yearly', renewal_date=date(2023, 3, 4)
+        )
+        Subscription.objects.create(
+            author=self.user, title='Paused', amount=Decimal('50.00'), frequency='monthly',
+            renewal_date=date(2024, 1, 2), is_active=False
+        )
+
+    def heatmap(self, **params):
+        response = self.client.get('/api/calendar/heatmap/', params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data
+
+    def test_day_totals_match_python_sums(self):
+        start, end = date(2024, 2, 10), date(2024, 4, 20)
+        data = self.heatmap(start=start.isoformat(), end=end.isoformat())
+
+        expected = defaultdict(lambda: {'total': Decimal('0'), 'count': 0, 'subscription_total': Decimal('0'),
+                                        'subscription_count': 0})
+        for expense in self.expenses:
+            if start <= expense.date < end:
+                expected[expense.date]['total'] += expense.amount
+                expected[expense.date]['count'] += 1
+        # Music and Video clamp to the 29th after February; Domain renews yearly on March 4.
+        for renewal, amount, count in (
+            (date(2024, 2, 29), Decimal('25.00'), 2), (date(2024, 3, 29), Decimal('25.00'), 2),
+            (date(2024, 3, 4), Decimal('12.00'), 1),
+        ):
+            expected[renewal]['subscription_total'] += amount
+            expected[renewal]['subscription_count'] += count
+
+        self.assertEqual(data['days'], [
+            {
+                'date': day.isoformat(), 'total': float(values['total']), 'count': values['count'],
+                'subscription_total': float(values['subscription_total']),
+                'subscription_count': values['subscription_count'],
+            }
+            for day, values in sorted(expected.items())
+        ])
+        self.assertEqual(data['max_total'], max(float(values['total']) for values in expected.values()))
+
+    def test_split_by_category(self):
+        data = self.heatmap(start='2024-06-01', end='2024-07-01', split='category')
+        expected = defaultdict(lambda: defaultdict(lambda: [Decimal('0'), 0]))
+        for expense in self.expenses:
+            if date(2024, 6, 1) <= expense.date < date(2024, 7, 1):
+                expected[expense.date.isoformat()][expense.category][0] += expense.amount
+                expected[expense.date.isoformat()][expense.category][1] += 1
+
+        for day in data['days']:
+            with self.subTest(day=day['date']):
+                categories = expected.get(day['date'], {})
+                self.assertEqual(day['categories'], {
+                    category: {'total': float(total), 'count': count} for category, (total, count) in categories.items()
+                })
+                self.assertAlmostEqual(day['total'], float(sum(total for total, _ in categories.values())))
+
+    def test_invalid_ranges_are_rejected(self):
+        for params in (
+            {'start': '2024-13-01'}, {'end': 'soon'}, {'start': '2024-05-01', 'end': '2024-05-01'},
+            {'start': '2024-05-02', 'end': '2024-05-01'}, {'start': '2019-01-01', 'end': '2025-01-01'},
+        ):
+            with self.subTest(params=params):
+                response = self.client.get('/api/calendar/heatmap/', params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('error', response.data)
+
+    def test_day_drill_down(self):
+        day = date(2024, 3, 29)
+        response = self.client.get('/api/calendar/day/', {'date': day.isoformat()})
+        self.assertEqual(response.status_code, 200)
+
+        expected = [expense for expense in self.expenses if expense.date == day]
+        self.assertEqual(
+            [(row['title'], row['amount'], row['date']) for row in response.data['expenses']],
+            [(expense.title, str(expense.amount), day.isoformat()) for expense in expected]
+        )
+        self.assertEqual(
+            [(row['id'], row['renewal_date'], row['is_projected']) for row in response.data['subscriptions']],
+            [(self.music.id, '2024-03-29', True), (self.video.id, '2024-03-29', True)]
+        )
+
+        response = self.client.get('/api/calendar/day/', {'date': '2024-01-31'})
+        self.assertEqual(
+            [(row['id'], row['is_projected']) for row in response.data['subscriptions']],
+            [(self.music.id, False), (self.video.id, False)]
+        )
+
+    def test_day_drill_down_rejects_bad_dates(self):
+        for params in ({}, {'date': '29/03/2024'}, {'date': '2024-02-30'}):
+            with self.subTest(params=params):
+                response = self.client.get('/api/calendar/day/', params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('error', response.data)
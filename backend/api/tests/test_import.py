@@ -0,0 +1,158 @@
+from datetime import date
+from decimal import Decimal
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+
+from api.models import Expense, MonthlySpend
+from .helpers import create_client
+
+OFX_SGML = b"""OFXHEADER:100
+DATA:OFXSGML
+VERSION:102
+ENCODING:USASCII
+
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>
+<STMTTRN>
+<TRNTYPE>DEBIT
+<DTPOSTED>20240105120000
+<TRNAMT>-12.50
+<NAME>Grocer &amp; Co
+<MEMO>weekly shop
+</STMTTRN>
+<STMTTRN>
+<TRNTYPE>CREDIT
+<DTPOSTED>20240106
+<TRNAMT>1500.00
+<NAME>Salary
+</STMTTRN>
+<STMTTRN>
+<TRNTYPE>DEBIT
+<DTPOSTED>20240220
+<TRNAMT>-7.25
+<NAME>Bakery
+</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+OFX_XML = b"""<?xml version="1.0" encoding="UTF-8"?>
+<?OFX OFXHEADER="200" VERSION="220"?>
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>
+<STMTTRN><TRNTYPE>DEBIT</TRNTYPE><DTPOSTED>20240210</DTPOSTED><TRNAMT>-3.20</TRNAMT><NAME>Cafe</NAME><MEMO>flat white</MEMO></STMTTRN>
+<STMTTRN><TRNTYPE>CREDIT</TRNTYPE><DTPOSTED>20240211</DTPOSTED><TRNAMT>25.00</TRNAMT><NAME>Refund</NAME></STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+OFX_CREDITS_ONLY = b"""<OFX><BANKTRANLIST>
+<STMTTRN><TRNTYPE>CREDIT</TRNTYPE><DTPOSTED>20240301</DTPOSTED><TRNAMT>100.00</TRNAMT><NAME>Salary</NAME></STMTTRN>
+<STMTTRN><TRNTYPE>CREDIT</TRNTYPE><DTPOSTED>20240315</DTPOSTED><TRNAMT>40.00</TRNAMT><NAME>Refund</NAME></STMTTRN>
+</BANKTRANLIST></OFX>
+"""
+
+
+class ExpenseImportViewTests(TestCase):
+    def setUp(self):
+        self.user, self.client = create_client()
+
+    def upload(self, name, content, **data):
+        return self.client.post(
+            '/api/expenses/import/', {'file': SimpleUploadedFile(name, content), **data}, format='multipart'
+        )
+
+    def imported(self):
+        return list(Expense.objects.filter(author=self.user).order_by('date').values_list(
+            'title', 'date', 'amount', 'description', 'category'
+        ))
+
+    def rollups(self):
+        return {
+            (rollup.month, rollup.category): (rollup.total, rollup.count)
+            for rollup in MonthlySpend.objects.filter(author=self.user).exclude(count=0)
+        }
+
+    def test_csv(self):
+        content = (
+            'Date,Payee,Amount,Memo,Category,Ignored\n'
+            '2024-01-05,"Grocer, Inc",12.50,"said ""thanks""",Food,x\n'
+            '\n'
+            '2024-01-20,Train,4.00,,Transport,\n'
+            '2024-02-03,Lunch,9.75,,Food,\n'
+        ).encode()
+        response = self.upload('statement.csv', content)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {
+            'created': 3, 'failed': 0, 'skipped': 0, 'errors': [], 'errors_truncated': False
+        })
+        self.assertEqual(self.imported(), [
+            ('Grocer, Inc', date(2024, 1, 5), Decimal('12.50'), 'said "thanks"', 'Food'),
+            ('Train', date(2024, 1, 20), Decimal('4.00'), None, 'Transport'),
+            ('Lunch', date(2024, 2, 3), Decimal('9.75'), None, 'Food'),
+        ])
+        self.assertEqual(self.rollups(), {
+            (date(2024, 1, 1), 'Food'): (Decimal('12.50'), 1),
+            (date(2024, 1, 1), 'Transport'): (Decimal('4.00'), 1),
+            (date(2024, 2, 1), 'Food'): (Decimal('9.75'), 1),
+        })
+        self.assertEqual(self.client.get('/api/expenses/all-time/').data['total'], 26.25)
+
+    def test_ofx_sgml(self):
+        response = self.upload('statement.ofx', OFX_SGML)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['created'], response.data['skipped']), (2, 1))
+        self.assertEqual(self.imported(), [
+            ('Grocer & Co', date(2024, 1, 5), Decimal('12.50'), 'weekly shop', 'Other'),
+            ('Bakery', date(2024, 2, 20), Decimal('7.25'), '', 'Other'),
+        ])
+        self.assertEqual(self.rollups(), {
+            (date(2024, 1, 1), 'Other'): (Decimal('12.50'), 1),
+            (date(2024, 2, 1), 'Other'): (Decimal('7.25'), 1),
+        })
+
+    def test_ofx_xml(self):
+        response = self.upload('export.xml', OFX_XML, file_format='qfx')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['created'], response.data['skipped']), (1, 1))
+        self.assertEqual(self.imported(), [('Cafe', date(2024, 2, 10), Decimal('3.20'), 'flat white', 'Other')])
+
+    def test_file_with_only_skipped_rows_is_not_an_error(self):
+        response = self.upload('credits.ofx', OFX_CREDITS_ONLY)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {
+            'created': 0, 'failed': 0, 'skipped': 2, 'errors': [], 'errors_truncated': False
+        })
+        self.assertEqual(self.imported(), [])
+
+    def test_row_errors_are_reported_by_line(self):
+        content = (
+            'title,date,amount\n'
+            'Coffee,2024-01-05,3.20\n'
+            'Broken date,05/01/2024,3.20\n'
+            'Refund,2024-01-06,-4\n'
+            ',2024-01-07,1.00\n'
+        ).encode()
+        response = self.upload('mixed.csv', content)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['created'], response.data['failed']), (1, 3))
+        self.assertEqual([error['row'] for error in response.data['errors']], [3, 4, 5])
+        self.assertEqual(set(response.data['errors'][0]['errors']), {'date'})
+        self.assertEqual(set(response.data['errors'][1]['errors']), {'amount'})
+        self.assertEqual(set(response.data['errors'][2]['errors']), {'title'})
+        self.assertEqual(self.rollups(), {(date(2024, 1, 1), 'Other'): (Decimal('3.20'), 1)})
+
+    def test_file_with_only_bad_rows_is_rejected(self):
+        response = self.upload('bad.csv', b'title,date,amount\nCoffee,yesterday,3.20\n')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual((response.data['created'], response.data['failed']), (0, 1))
+        self.assertEqual(self.imported(), [])
+
+    def test_unsupported_or_missing_file(self):
+        self.assertEqual(self.upload('notes.txt', b'hello').status_code, 400)
+        self.assertEqual(self.upload('latin1.csv', 'title\nCaf\xe9\n'.encode('latin-1')).status_code, 400)
+        response = self.client.post('/api/expenses/import/', {}, format='multipart')
+        self.assertEqual(response.status_code, 400)
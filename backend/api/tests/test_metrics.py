@@ -0,0 +1,111 @@
+import json
+import re
+import tempfile
+
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from api.metrics import MetricsRegistry, registry, render_metrics
+from .helpers import create_client
+
+TOKEN = 'scrape-token'
+
+
+@override_settings(METRICS_ENABLED=True, METRICS_TOKEN=TOKEN)
+class MetricsViewTests(TestCase):
+    def setUp(self):
+        self.user, self.client = create_client()
+
+    def scrape(self, client=None, **headers):
+        return (client or APIClient()).get('/metrics', **headers)
+
+    def sample(self, text, name, **labels):
+        pattern = re.escape(name) + r'\{([^}]*)\} (\S+)'
+        for label_text, value in re.findall(pattern, text):
+            if dict(re.findall(r'(\w+)="([^"]*)"', label_text)) == {key: str(value) for key, value in labels.items()}:
+                return float(value)
+        return 0.0
+
+    def test_scrape_reports_request_counters(self):
+        before = self.scrape(HTTP_AUTHORIZATION=f'Bearer {TOKEN}').content.decode()
+        self.client.get('/api/expenses/')
+        self.client.get('/api/expenses/')
+        self.client.post('/api/expenses/', {'title': 'Lunch', 'amount': '-1', 'date': '2024-05-01'}, format='json')
+        response = self.scrape(HTTP_AUTHORIZATION=f'Bearer {TOKEN}')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/plain; version=0.0.4; charset=utf-8')
+        text = response.content.decode()
+        self.assertIn('# TYPE spendio_http_requests_total counter', text)
+        self.assertIn('# TYPE spendio_http_request_duration_seconds histogram', text)
+        labels = {'method': 'GET', 'route': 'api/expenses/', 'status': 200}
+        self.assertEqual(
+            self.sample(text, 'spendio_http_requests_total', **labels)
+            - self.sample(before, 'spendio_http_requests_total', **labels),
+            2
+        )
+        labels = {'method': 'POST', 'route': 'api/expenses/', 'status': 400}
+        self.assertEqual(
+            self.sample(text, 'spendio_http_requests_total', **labels)
+            - self.sample(before, 'spendio_http_requests_total', **labels),
+            1
+        )
+        self.assertGreater(self.sample(
+            text, 'spendio_http_request_duration_seconds_bucket', method='GET', route='api/expenses/', le='+Inf'
+        ), 0)
+
+    def test_access_requires_the_token_or_staff(self):
+        self.assertEqual(self.scrape().status_code, 403)
+        self.assertEqual(self.scrape(HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+        self.assertEqual(self.scrape(self.client).status_code, 403)
+        self.assertEqual(self.scrape(self.client, HTTP_AUTHORIZATION=f'Bearer {TOKEN}x').status_code, 403)
+
+        self.assertEqual(self.scrape(HTTP_AUTHORIZATION=f'Bearer {TOKEN}').status_code, 200)
+        self.user.is_staff = True
+        self.user.save()
+        self.assertEqual(self.scrape(self.client).status_code, 200)
+
+    @override_settings(METRICS_TOKEN='')
+    def test_empty_token_never_matches(self):
+        self.assertEqual(self.scrape(HTTP_AUTHORIZATION='Bearer ').status_code, 403)
+
+
+class MetricsRegistryTests(TestCase):
+    def test_per_process_files_are_merged(self):
+        with tempfile.TemporaryDirectory() as directory, override_settings(
+            METRICS_ENABLED=True, METRICS_DIR=directory, METRICS_FLUSH_INTERVAL=3600
+        ):
+            first, second = MetricsRegistry(), MetricsRegistry()
+            self.assertNotEqual(first.path, second.path)
+
+            first.inc('spendio_http_requests_total', route='api/expenses/', method='GET', status=200)
+            second.inc('spendio_http_requests_total', 2, route='api/expenses/', method='GET', status=200)
+            first.observe('spendio_http_request_duration_seconds', 0.02, route='api/expenses/', method='GET')
+            second.observe('spendio_http_request_duration_seconds', 12, route='api/expenses/', method='GET')
+            second.flush()
+            # A file another worker is still writing, or from another version, is skipped.
+            (first.path.parent / 'broken.json').write_text('{')
+            (first.path.parent / 'old.json').write_text(json.dumps([['spendio_removed_total', [], 5]]))
+
+            totals = first.collect()
+            self.assertEqual(
+                totals[('spendio_http_requests_total', (('method', 'GET'), ('route', 'api/expenses/'), ('status', 200)))],
+                3
+            )
+            histogram = totals[('spendio_http_request_duration_seconds', (('method', 'GET'), ('route', 'api/expenses/')))]
+            self.assertEqual(histogram[2], 1)
+            self.assertEqual(histogram[-2], 1)
+            self.assertAlmostEqual(histogram[-1], 12.02)
+            self.assertNotIn('spendio_removed_total', {name for name, _ in totals})
+
+            text = render_metrics(totals)
+            self.assertIn('spendio_http_requests_total{method="GET",route="api/expenses/",status="200"} 3', text)
+            self.assertIn(
+                'spendio_http_request_duration_seconds_count{method="GET",route="api/expenses/"} 2', text
+            )
+
+    def test_disabled_registry_records_nothing(self):
+        with override_settings(METRICS_ENABLED=False):
+            before = registry.snapshot()
+            registry.inc('spendio_http_requests_total', route='x', method='GET', status=200)
+            self.assertEqual(registry.snapshot(), before)
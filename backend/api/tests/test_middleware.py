@@ -0,0 +1,45 @@
+import json
+import re
+
+from django.test import TestCase, override_settings
+
+from .helpers import create_client
+
+
+@override_settings(REQUEST_TIMING_ENABLED=True, REQUEST_TIMING_SAMPLE_RATE=1, SLOW_REQUEST_THRESHOLD_MS=60000)
+class RequestTimingMiddlewareTests(TestCase):
+    def setUp(self):
+        self.user, self.client = create_client()
+
+    def test_sampled_request_gets_server_timing(self):
+        response = self.client.get('/api/expenses/')
+        self.assertEqual(response.status_code, 200)
+        phases = [metric.split(';')[0] for metric in response['Server-Timing'].split(', ')]
+        self.assertEqual(phases, ['total', 'db', 'auth', 'serialize', 'view'])
+        queries = re.search(r'db;dur=[\d.]+;desc="(\d+) queries"', response['Server-Timing'])
+        self.assertGreaterEqual(int(queries.group(1)), 2)
+
+    def test_no_header_when_disabled_or_unsampled(self):
+        with override_settings(REQUEST_TIMING_ENABLED=False):
+            self.assertNotIn('Server-Timing', self.client.get('/api/expenses/'))
+        with override_settings(REQUEST_TIMING_SAMPLE_RATE=0):
+            self.assertNotIn('Server-Timing', self.client.get('/api/expenses/'))
+
+    @override_settings(SLOW_REQUEST_THRESHOLD_MS=0, SLOW_REQUEST_TOP_SQL=2)
+    def test_slow_requests_are_logged(self):
+        with self.assertLogs('api.middleware', level='WARNING') as logs:
+            self.client.get('/api/expenses/', {'category': 'Food'})
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(
+            {key: record[key] for key in ('method', 'path', 'status', 'user_id', 'sampled')},
+            {'method': 'GET', 'path': '/api/expenses/', 'status': 200, 'user_id': self.user.id, 'sampled': True}
+        )
+        self.assertGreaterEqual(record['queries'], 2)
+        self.assertLessEqual(len(record['top_sql']), 2)
+        self.assertEqual(set(record['top_sql'][0]), {'sql', 'count', 'ms'})
+
+        with override_settings(REQUEST_TIMING_SAMPLE_RATE=0), self.assertLogs('api.middleware') as logs:
+            self.client.get('/api/expenses/')
+        record = json.loads(logs.records[0].getMessage())
+        self.assertFalse(record['sampled'])
+        self.assertNotIn('queries', record)
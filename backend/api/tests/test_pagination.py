@@ -0,0 +1,67 @@
+from datetime import date
+from decimal import Decimal
+
+from django.test import TestCase
+
+from api.models import Expense
+from .helpers import create_client
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.user, self.client = create_client()
+        _, self.other_client = create_client('bob')
+        # Repeated dates and amounts so keyset ties are broken by id.
+        self.expenses = [
+            Expense.objects.create(
+                author=self.user, title=f'{"Coffee" if index % 3 else "Lunch"} {index}',
+                amount=Decimal(['3.20', '9.50', '12.00'][index % 3]),
+                date=date(2024, 1 + index % 4, 1 + index % 2), category=['Food', 'Travel'][index % 2]
+            )
+            for index in range(17)
+        ]
+
+    def ids(self, expenses):
+        return [expense.id for expense in expenses]
+
+    def walk(self, path='/api/expenses/', **params):
+        pages = []
+        response = self.client.get(path, {'page_size': 4, **params})
+        while True:
+            self.assertEqual(response.status_code, 200)
+            pages.append(response.data)
+            if not response.data['next']:
+                return pages
+            response = self.client.get(response.data['next'])
+
+    def test_walk_visits_each_row_once(self):
+        pages = self.walk(page_size=3)
+        self.assertEqual([len(page['results']) for page in pages], [3, 3, 3, 3, 3, 2])
+        self.assertEqual(
+            [row['id'] for page in pages for row in page['results']],
+            self.ids(sorted(self.expenses, key=lambda e: (e.date, e.id), reverse=True))
+        )
+
+    def test_invalid_cursor_is_rejected(self):
+        for cursor in ('not-base64!', 'WyJ4Il0=', 'WyIyMDI0LTk5LTAxIiwgMV0='):
+            with self.subTest(cursor=cursor):
+                response = self.client.get('/api/expenses/', {'cursor': cursor})
+                self.assertEqual(response.status_code, 404)
+                self.assertEqual(str(response.data['detail']), 'Invalid cursor')
+
+    def test_all_time_total_is_only_on_the_first_page(self):
+        pages = self.walk('/api/expenses/all-time/')
+        self.assertEqual(pages[0]['total'], float(sum(expense.amount for expense in self.expenses)))
+        self.assertTrue(all('total' not in page for page in pages[1:]))
+        self.assertEqual(
+            [row['id'] for page in pages for row in page['expenses']],
+            self.ids(sorted(self.expenses, key=lambda e: (e.date, e.id), reverse=True))
+        )
+
+        response = self.client.get('/api/expenses/all-time/')
+        self.assertEqual(len(response.data['expenses']), 17)
+        self.assertEqual(response.data['total'], pages[0]['total'])
+
+    def test_other_users_rows_are_never_listed(self):
+        response = self.other_client.get('/api/expenses/', {'page_size': 4})
+        self.assertEqual(response.data, {'next': None, 'results': []})
@@ -0,0 +1,80 @@
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from api.models import Subscription
+
+
+class ProcessRenewalsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='alice', password='correct-horse-battery')
+
+    def subscribe(self, frequency, renewal_date, is_active=True):
+        return Subscription.objects.create(
+            author=self.user, title='Plan', amount=Decimal('9.99'), frequency=frequency,
+            renewal_date=renewal_date, is_active=is_active
+        )
+
+    def renew(self, *args, **options):
+        stdout = StringIO()
+        call_command('process_renewals', *args, stdout=stdout, **options)
+        return stdout.getvalue()
+
+    def renewal_dates(self):
+        return dict(Subscription.objects.values_list('id', 'renewal_date'))
+
+    def test_overdue_rows_reach_first_renewal_on_or_after_as_of(self):
+        monthly = self.subscribe('monthly', date(2024, 1, 20))
+        on_as_of = self.subscribe('monthly', date(2024, 2, 15))
+        yearly = self.subscribe('yearly', date(2021, 6, 1))
+        yearly_same_month = self.subscribe('yearly', date(2023, 5, 20))
+        month_end = self.subscribe('monthly', date(2024, 1, 31))
+        leap_day = self.subscribe('yearly', date(2020, 2, 29))
+        future = self.subscribe('monthly', date(2024, 6, 1))
+        inactive = self.subscribe('monthly', date(2023, 1, 10), is_active=False)
+
+        output = self.renew(as_of='2024-05-15', batch_size=1)
+
+        self.assertIn('Renewed 6 subscriptions (20 missed periods)', output)
+        self.assertEqual(self.renewal_dates(), {
+            monthly.id: date(2024, 5, 20),
+            on_as_of.id: date(2024, 5, 15),
+            yearly.id: date(2024, 6, 1),
+            yearly_same_month.id: date(2024, 5, 20),
+            # Jan 31 -> Feb 29 -> Mar 29 -> Apr 29, the clamped day carries forward.
+            month_end.id: date(2024, 5, 29),
+            leap_day.id: date(2025, 2, 28),
+            future.id: date(2024, 6, 1),
+            inactive.id: date(2023, 1, 10),
+        })
+
+    def test_dry_run_writes_nothing(self):
+        self.subscribe('monthly', date(2024, 1, 20))
+        self.subscribe('yearly', date(2022, 6, 1))
+        before = self.renewal_dates()
+        updated = set(Subscription.objects.values_list('updated_at', flat=True))
+
+        output = self.renew(as_of='2024-05-15', dry_run=True)
+
+        self.assertIn('2 subscriptions would be renewed (6 missed periods)', output)
+        self.assertEqual(self.renewal_dates(), before)
+        self.assertEqual(set(Subscription.objects.values_list('updated_at', flat=True)), updated)
+
+    def test_second_run_renews_nothing(self):
+        self.subscribe('monthly', date(2024, 1, 20))
+        self.subscribe('yearly', date(2022, 6, 1))
+
+        self.assertIn('Renewed 2 subscriptions (6 missed periods)', self.renew(as_of='2024-05-15'))
+        after = self.renewal_dates()
+        self.assertIn('Renewed 0 subscriptions', self.renew(as_of='2024-05-15'))
+        self.assertEqual(self.renewal_dates(), after)
+
+    def test_invalid_options(self):
+        with self.assertRaises(CommandError):
+            self.renew(as_of='15/05/2024')
+        with self.assertRaises(CommandError):
+            self.renew(batch_size=0)
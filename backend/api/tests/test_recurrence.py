@@ -0,0 +1,139 @@
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from unittest import mock
+import random
+
+from django.test import SimpleTestCase, TestCase
+
+from api.models import Subscription
+from api.recurrence import add_months, add_years, next_renewal_on_or_after, project_occurrences
+from .helpers import create_client
+
+
+def renewals_by_stepping(renewal_date, frequency, start, end):
+    """The renewals in [start, end) found by calling get_next_renewal_date repeatedly."""
+    subscription = Subscription(renewal_date=renewal_date, frequency=frequency)
+    occurrences = []
+    while subscription.renewal_date < end:
+        if subscription.renewal_date >= start:
+            occurrences.append(subscription.renewal_date)
+        subscription.renewal_date = subscription.get_next_renewal_date()
+    return tuple(occurrences)
+
+
+class ProjectOccurrencesTests(SimpleTestCase):
+    def test_month_end_clamp_carries_forward(self):
+        self.assertEqual(
+            project_occurrences(date(2023, 1, 31), 'monthly', date(2023, 1, 1), date(2023, 5, 1)),
+            (date(2023, 1, 31), date(2023, 2, 28), date(2023, 3, 28), date(2023, 4, 28))
+        )
+        self.assertEqual(add_months(date(2023, 1, 31), 3), date(2023, 4, 28))
+        self.assertEqual(add_months(date(2024, 1, 30), 1), date(2024, 2, 29))
+
+    def test_leap_day_settles_on_feb_28(self):
+        self.assertEqual(add_years(date(2024, 2, 29), 1), date(2025, 2, 28))
+        self.assertEqual(add_years(date(2024, 2, 29), 4), date(2028, 2, 28))
+        self.assertEqual(
+            project_occurrences(date(2024, 2, 29), 'yearly', date(2024, 1, 1), date(2029, 1, 1)),
+            (date(2024, 2, 29), date(2025, 2, 28), date(2026, 2, 28), date(2027, 2, 28), date(2028, 2, 28))
+        )
+
+    def test_range_is_half_open(self):
+        self.assertEqual(
+            project_occurrences(date(2024, 1, 15), 'monthly', date(2024, 2, 15), date(2024, 4, 15)),
+            (date(2024, 2, 15), date(2024, 3, 15))
+        )
+        self.assertEqual(project_occurrences(date(2024, 5, 1), 'monthly', date(2024, 4, 1), date(2024, 5, 1)), ())
+
+    def test_nothing_is_projected_before_the_renewal_date(self):
+        self.assertEqual(
+            project_occurrences(date(2024, 3, 10), 'monthly', date(2024, 1, 1), date(2024, 5, 1)),
+            (date(2024, 3, 10), date(2024, 4, 10))
+        )
+
+    def test_fixed_anchors_match_stepping(self):
+        anchors = [
+            date(2023, 1, 31), date(2023, 1, 30), date(2023, 1, 29), date(2023, 1, 28),
+            date(2024, 2, 29), date(2023, 12, 31), date(2023, 3, 31), date(2023, 8, 31), date(2024, 6, 1),
+        ]
+        ranges = [
+            (date(2023, 1, 1), date(2023, 2, 1)),
+            (date(2024, 2, 1), date(2024, 3, 1)),
+            (date(2024, 1, 1), date(2025, 1, 1)),
+            (date(2025, 3, 15), date(2031, 3, 15)),
+        ]
+        for anchor in anchors:
+            for frequency in ('monthly', 'yearly'):
+                for start, end in ranges:
+                    with self.subTest(anchor=anchor, frequency=frequency, start=start, end=end):
+                        self.assertEqual(
+                            project_occurrences(anchor, frequency, start, end),
+                            renewals_by_stepping(anchor, frequency, start, end)
+                        )
+
+    def test_random_anchors_match_stepping(self):
+        rng = random.Random(20240229)
+        origin = date(2020, 1, 1)
+        for _ in range(500):
+            anchor = origin + timedelta(days=rng.randrange(3 * 366))
+            start = origin + timedelta(days=rng.randrange(8 * 366))
+            end = start + timedelta(days=rng.randrange(1, 4 * 366))
+            frequency = rng.choice(('monthly', 'yearly'))
+            with self.subTest(anchor=anchor, frequency=frequency, start=start, end=end):
+                self.assertEqual(
+                    project_occurrences(anchor, frequency, start, end),
+                    renewals_by_stepping(anchor, frequency, start, end)
+                )
+                as_of = start
+                expected = renewals_by_stepping(anchor, frequency, as_of, date(2040, 1, 1))[0]
+                self.assertEqual(next_renewal_on_or_after(anchor, frequency, as_of)[0], expected)
+
+
+class ProjectedRenewalViewTests(TestCase):
+    def setUp(self):
+        self.user, self.client = create_client()
+        now = datetime(2024, 1, 10, 12, tzinfo=dt_timezone.utc)
+        patcher = mock.patch('django.utils.timezone.now', return_value=now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def subscribe(self, title, amount, frequency, renewal_date, is_active=True):
+        return Subscription.objects.create(
+            author=self.user, title=title, amount=Decimal(amount), frequency=frequency,
+            renewal_date=renewal_date, is_active=is_active
+        )
+
+    def test_calendar_marks_projected_renewals(self):
+        stored = self.subscribe('Gym', '30.00', 'monthly', date(2024, 3, 5))
+        projected = self.subscribe('Music', '10.00', 'monthly', date(2024, 1, 31))
+        self.subscribe('Domain', '12.00', 'yearly', date(2023, 6, 1))
+        self.subscribe('Paused', '99.00', 'monthly', date(2024, 1, 3), is_active=False)
+
+        response = self.client.get('/api/calendar/', {'month': 3, 'year': 2024})
+        self.assertEqual(response.status_code, 200)
+        renewals = [(row['id'], row['renewal_date'], row['is_projected']) for row in response.data['subscriptions']]
+        self.assertEqual(renewals, [(stored.id, '2024-03-05', False), (projected.id, '2024-03-29', True)])
+        self.assertEqual(response.data['summary']['total_subscriptions'], 40.0)
+
+    def test_forecast_month_totals(self):
+        self.subscribe('Music', '10.00', 'monthly', date(2024, 1, 31))
+        self.subscribe('Video', '15.00', 'monthly', date(2023, 11, 5))
+        self.subscribe('Domain', '12.00', 'yearly', date(2023, 3, 1))
+        self.subscribe('Paused', '99.00', 'monthly', date(2024, 1, 20), is_active=False)
+
+        response = self.client.get('/api/subscriptions/forecast/', {'months': 4})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['start'], '2024-01-10')
+        self.assertEqual(response.data['end'], '2024-05-01')
+        # The Video renewal on Jan 5 is before today and is not forecast.
+        self.assertEqual(
+            [(row['year'], row['month'], row['total'], row['count']) for row in response.data['months']],
+            [(2024, 1, 10.0, 1), (2024, 2, 25.0, 2), (2024, 3, 37.0, 3), (2024, 4, 25.0, 2)]
+        )
+        self.assertEqual(response.data['total'], 97.0)
+
+    def test_forecast_rejects_bad_months(self):
+        for months in ('0', '61', 'abc'):
+            with self.subTest(months=months):
+                response = self.client.get('/api/subscriptions/forecast/', {'months': months})
+                self.assertEqual(response.status_code, 400)
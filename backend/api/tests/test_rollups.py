@@ -0,0 +1,65 @@
+from datetime import date
+from decimal import Decimal
+
+from django.test import TestCase
+
+from api.models import Expense, MonthlySpend
+from .helpers import create_client
+
+
+class MonthlySpendRollupTests(TestCase):
+    maxDiff = None
+    def setUp(self):
+        self.user, self.client = create_client()
+        self.expenses = [
+            Expense.objects.create(author=self.user, title=f'Item {index}', amount=Decimal('10.50'),
+                                   date=date(2024, 1 + index % 3, 5), category='Food')
+            for index in range(6)
+        ]
+
+    def assertRollupsMatchExpenses(self):
+        expected = {
+            (row['rollup_month'], row['category']): (row['rollup_total'], row['rollup_count'])
+            for row in MonthlySpend.from_expenses(Expense.objects.filter(author=self.user))
+        }
+        actual = {
+            (rollup.month, rollup.category): (rollup.total, rollup.count)
+            for rollup in MonthlySpend.objects.filter(author=self.user).exclude(count=0)
+        }
+        self.assertEqual(actual, expected)
+
+    def test_instance_save_and_delete(self):
+        self.assertRollupsMatchExpenses()
+        expense = self.expenses[0]
+        expense.amount = Decimal('99.99')
+        expense.date = date(2023, 12, 31)
+        expense.save()
+        self.assertRollupsMatchExpenses()
+        expense.delete()
+        self.assertRollupsMatchExpenses()
+
+    def test_stale_instance_save(self):
+        stale = Expense.objects.get(pk=self.expenses[1].pk)
+        fresh = Expense.objects.get(pk=self.expenses[1].pk)
+        fresh.category = 'Travel'
+        fresh.save()
+        stale.amount = Decimal('1.00')
+        stale.save()
+        self.assertRollupsMatchExpenses()
+
+    def test_queryset_update_and_delete(self):
+        Expense.objects.filter(author=self.user, date__month=1).update(category='Bills', amount=Decimal('3.00'))
+        self.assertRollupsMatchExpenses()
+        Expense.objects.filter(author=self.user).update(title='Renamed')
+        self.assertRollupsMatchExpenses()
+        Expense.objects.filter(author=self.user, date__month=2).delete()
+        self.assertRollupsMatchExpenses()
+
+    def test_batch_endpoint(self):
+        response = self.client.post('/api/expenses/batch/', {'operations': [
+            {'op': 'delete', 'id': self.expenses[0].id},
+            {'op': 'update', 'id': self.expenses[1].id, 'data': {'amount': '7.25'}},
+            {'op': 'create', 'data': {'title': 'New', 'amount': '4.00', 'date': '2024-03-01', 'category': 'Car'}},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertRollupsMatchExpenses()
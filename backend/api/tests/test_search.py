@@ -0,0 +1,55 @@
+from datetime import date
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+
+from api.models import Expense
+from api.search import SQLITE_FTS_TABLE
+from .helpers import create_client
+
+
+class ExpenseSearchViewTests(TestCase):
+    def setUp(self):
+        self.user, self.client = create_client()
+        self.other, _ = create_client('bob')
+
+    def create(self, author, title, description=''):
+        return Expense.objects.create(
+            author=author, title=title, description=description,
+            amount=Decimal('5.00'), date=date(2024, 5, 1), category='Food'
+        )
+
+    def search(self, query):
+        response = self.client.get('/api/expenses/search/', {'q': query})
+        self.assertEqual(response.status_code, 200)
+        return [expense['id'] for expense in response.data['results']]
+
+    def test_index_follows_inserts_updates_and_deletes(self):
+        coffee = self.create(self.user, 'Coffee', 'flat white')
+        self.create(self.other, 'Coffee')
+        self.assertEqual(self.search('coff'), [coffee.id])
+        self.assertEqual(self.search('white'), [coffee.id])
+
+        coffee.title = 'Tea'
+        coffee.save()
+        self.assertEqual(self.search('coffee'), [])
+        self.assertEqual(self.search('tea'), [coffee.id])
+
+        coffee.delete()
+        self.assertEqual(self.search('tea'), [])
+
+    def test_index_survives_migrations(self):
+        # A later migration that remakes api_expense on SQLite drops these
+        # triggers silently; this fails CI instead of freezing the index.
+        with connection.cursor() as cursor:
+            if connection.vendor == 'sqlite':
+                cursor.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'api_expense'"
+                )
+                self.assertTrue({
+                    f'{SQLITE_FTS_TABLE}_insert', f'{SQLITE_FTS_TABLE}_delete', f'{SQLITE_FTS_TABLE}_update'
+                } <= {row[0] for row in cursor.fetchall()})
+            else:
+                columns = connection.introspection.get_table_description(cursor, 'api_expense')
+                self.assertIn('search_vector', {column.name for column in columns})
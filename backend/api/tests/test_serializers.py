@@ -0,0 +1,43 @@
+from datetime import date
+from decimal import Decimal
+
+from django.test import TestCase
+from rest_framework.renderers import JSONRenderer
+
+from api.models import Expense, Subscription
+from api.serializers import (
+    ExpenseSerializer, SubscriptionSerializer, fast_expense_serializer, fast_subscription_serializer
+)
+from .helpers import create_client
+
+
+class FastRowSerializerTests(TestCase):
+    def setUp(self):
+        self.user, _ = create_client()
+        for amount, day, description in [
+            (Decimal('5'), date(2024, 2, 29), None),
+            (Decimal('0.10'), date(1999, 12, 31), ''),
+            (Decimal('1234567.89'), date(2025, 1, 1), 'Multi\nline "quoted" é'),
+        ]:
+            Expense.objects.create(author=self.user, title='Item', amount=amount, date=day,
+                                   description=description, category='Food')
+        for amount, frequency, renewal_date, active in [
+            (Decimal('9.99'), 'monthly', date(2024, 1, 31), True),
+            (Decimal('120'), 'yearly', date(2024, 2, 29), False),
+        ]:
+            Subscription.objects.create(author=self.user, title='Plan', amount=amount, frequency=frequency,
+                                        renewal_date=renewal_date, is_active=active)
+
+    def assertSameBytes(self, queryset, serializer_class, fast_serializer):
+        queryset = queryset.order_by('id')
+        expected = JSONRenderer().render(serializer_class(queryset, many=True).data)
+        actual = JSONRenderer().render(fast_serializer.serialize(queryset))
+        self.assertEqual(actual, expected)
+
+    def test_expenses_render_identically(self):
+        self.assertSameBytes(Expense.objects.filter(author=self.user), ExpenseSerializer, fast_expense_serializer)
+
+    def test_subscriptions_render_identically(self):
+        self.assertSameBytes(
+            Subscription.objects.filter(author=self.user), SubscriptionSerializer, fast_subscription_serializer
+        )
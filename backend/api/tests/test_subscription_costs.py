@@ -0,0 +1,59 @@
+from datetime import date
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+
+from api.models import Budget, Expense, Subscription
+from .helpers import create_client
+
+
+class SubscriptionCostQueryTests(TestCase):
+    def setUp(self):
+        self.user, self.client = create_client()
+        today = timezone.now().date()
+        self.today = today
+        for index in range(5):
+            Subscription.objects.create(author=self.user, title=f'Monthly {index}', amount=Decimal('10.00'),
+                                        frequency='monthly', renewal_date=today.replace(day=1), category='Bills')
+        for index in range(3):
+            Subscription.objects.create(author=self.user, title=f'Yearly {index}', amount=Decimal('120.00'),
+                                        frequency='yearly', renewal_date=today.replace(day=1), category='Other')
+        Subscription.objects.create(author=self.user, title='Paused', amount=Decimal('99.00'),
+                                    frequency='monthly', renewal_date=today, category='Other', is_active=False)
+        Budget.objects.create(author=self.user, amount=Decimal('1000.00'))
+        for index in range(4):
+            Expense.objects.create(author=self.user, title=f'Lunch {index}', amount=Decimal('5.00'),
+                                   date=today.replace(day=1), category='Food')
+
+    def test_dashboard_summary(self):
+        with self.assertNumQueries(4):
+            response = self.client.get('/api/dashboard/summary/')
+        self.assertEqual(response.data['total_subscriptions'], 80.0)
+        self.assertEqual(response.data['remaining_budget'], 1000 - 20 - 80)
+
+    def test_calendar(self):
+        with self.assertNumQueries(7):
+            response = self.client.get('/api/calendar/', {'month': self.today.month, 'year': self.today.year})
+        self.assertEqual(response.data['summary']['remaining_budget'], 1000 - 20 - 80)
+
+    def test_monthly_subscriptions(self):
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/subscriptions/monthly/')
+        # 5 x 10.00 monthly plus 3 x 120.00 yearly spread over twelve months.
+        self.assertEqual(response.data['total'], 80.0)
+        self.assertEqual((response.data['month'], response.data['year']), (self.today.month, self.today.year))
+        self.assertEqual(len(response.data['subscriptions']), 8)
+
+    def test_yearly_subscriptions(self):
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/subscriptions/yearly/')
+        # 5 x 10.00 over twelve months plus 3 x 120.00.
+        self.assertEqual(response.data['total'], 960.0)
+        self.assertEqual(response.data['year'], self.today.year)
+        self.assertEqual(len(response.data['subscriptions']), 8)
+
+    def test_subscription_total(self):
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/subscriptions/total/')
+        self.assertEqual(response.data['total'], Decimal('410.00'))
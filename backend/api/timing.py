@@ -0,0 +1,83 @@
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+import time
+
+from rest_framework.renderers import JSONRenderer
+
+# The timing of the request being handled, or None when it is not sampled.
+# Context variables follow sync_to_async into its worker thread, so queries run
+# from async views are attributed to the right request.
+current_timing = ContextVar('request_timing', default=None)
+
+
+class RequestTiming:
+    """Durations collected for one sampled request, in seconds."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.durations = defaultdict(float)
+        self.query_count = 0
+        self.query_time = 0.0
+        self.statements = defaultdict(lambda: [0, 0.0])
+        self.active = None
+
+    def record_query(self, sql, seconds):
+        self.query_count += 1
+        self.query_time += seconds
+        statement = self.statements[sql]
+        statement[0] += 1
+        statement[1] += seconds
+
+    def top_statements(self, limit):
+        ranked = sorted(self.statements.items(), key=lambda item: (-item[1][0], -item[1][1]))
+        return [
+            {'sql': sql, 'count': count, 'ms': round(seconds * 1000, 2)}
+            for sql, (count, seconds) in ranked[:limit]
+        ]
+
+
+@contextmanager
+def timed(name):
+    """
+    Add the time spent in the block to ``name`` for the current request. Queries
+    run inside the block count as db time only, and nested blocks count once.
+    """
+    timing = current_timing.get()
+    if timing is None or timing.active is not None:
+        yield
+        return
+
+    timing.active = name
+    query_time = timing.query_time
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        timing.durations[name] += elapsed - (timing.query_time - query_time)
+        timing.active = None
+
+
+def time_queries(execute, sql, params, many, context):
+    timing = current_timing.get()
+    if timing is None:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timing.record_query(sql, time.perf_counter() - started)
+
+
+def install_query_timer(sender, connection, **kwargs):
+    """connection_created handler adding the query timer to every new connection."""
+    if time_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_queries)
+
+
+class TimedJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with timed('serialize'):
+            return super().render(data, accepted_media_type, renderer_context)
@@ -1,27 +1,36 @@
 from django.urls import path
 from .views import (
-    ExpenseListView, ExpenseDetailView, 
-    SubscriptionListView, ActiveSubscriptionListView, SubscriptionDetailView, SubscriptionRenewView, SubscriptionTotalView,
-    MonthlySubscriptionView, YearlySubscriptionView, SubscriptionToggleActiveView, SubscriptionReactivateView,
+    ExpenseListView, ExpenseDetailView, ExpenseImportView, ExpenseExportView, ExpenseBatchView, ExpenseAnalyticsView, ExpenseSearchView,
+    SubscriptionListView, ActiveSubscriptionListView, SubscriptionExportView, SubscriptionDetailView, SubscriptionRenewView, SubscriptionTotalView,
+    MonthlySubscriptionView, YearlySubscriptionView, SubscriptionForecastView, SubscriptionToggleActiveView, SubscriptionReactivateView,
     BudgetListView, BudgetDetailView, CurrentBudgetView,
-    DashboardSummaryView, CalendarView,
+    DashboardSummaryView, CalendarView, CalendarHeatmapView, CalendarDayView,
     MonthlyExpenseView, YearlyExpenseView, AllTimeExpenseView,
-    ChatUsageView, ChatView,
+    ChatUsageView, ChatContextView, ChatView, CacheStatsView,
     update_user_account
 )
 
 urlpatterns = [
     path('dashboard/summary/', DashboardSummaryView.as_view(), name='dashboard-summary'),
     path('calendar/', CalendarView.as_view(), name='calendar'),
+    path('calendar/heatmap/', CalendarHeatmapView.as_view(), name='calendar-heatmap'),
+    path('calendar/day/', CalendarDayView.as_view(), name='calendar-day'),
     path('expenses/', ExpenseListView.as_view(), name='expenses-list'),
     path('expenses/<int:pk>/', ExpenseDetailView.as_view(), name='expenses-detail'),
     path('expenses/monthly/', MonthlyExpenseView.as_view(), name='expenses-monthly'),
     path('expenses/yearly/', YearlyExpenseView.as_view(), name='expenses-yearly'),
     path('expenses/all-time/', AllTimeExpenseView.as_view(), name='expenses-all-time'),
+    path('expenses/import/', ExpenseImportView.as_view(), name='expenses-import'),
+    path('expenses/analytics/', ExpenseAnalyticsView.as_view(), name='expense-analytics'),
+    path('expenses/search/', ExpenseSearchView.as_view(), name='expenses-search'),
+    path('expenses/export/', ExpenseExportView.as_view(), name='expenses-export'),
+    path('expenses/batch/', ExpenseBatchView.as_view(), name='expenses-batch'),
     path('subscriptions/', SubscriptionListView.as_view(), name='subscription-list'),
+    path('subscriptions/export/', SubscriptionExportView.as_view(), name='subscription-export'),
     path('subscriptions/active/', ActiveSubscriptionListView.as_view(), name='active-subscription-list'),
     path('subscriptions/monthly/', MonthlySubscriptionView.as_view(), name='subscription-monthly'),
     path('subscriptions/yearly/', YearlySubscriptionView.as_view(), name='subscription-yearly'),
+    path('subscriptions/forecast/', SubscriptionForecastView.as_view(), name='subscription-forecast'),
     path('subscriptions/<int:pk>/', SubscriptionDetailView.as_view(), name='subscription-detail'),
     path('subscriptions/total/', SubscriptionTotalView.as_view(), name='subscription-total'),
     path('subscriptions/<int:subscription_id>/renew/', SubscriptionRenewView.as_view(), name='subscription-renew'),
@@ -31,6 +40,8 @@ urlpatterns = [
     path('budgets/<int:pk>/', BudgetDetailView.as_view(), name='budget-detail'),
     path('budgets/current/', CurrentBudgetView.as_view(), name='current-budget'),
     path('chat/usage/', ChatUsageView.as_view(), name='chat-usage'),
+    path('chat/context/', ChatContextView.as_view(), name='chat-context'),
     path('chat/message/', ChatView.as_view(), name='chat-message'),
     path('user/update/', update_user_account, name='user-update'),
+    path('cache/stats/', CacheStatsView.as_view(), name='cache-stats'),
 ]
@@ -1,17 +1,49 @@
-from django.db.models import Sum
+from django.db.models import Count, Sum
 from django.contrib.auth.models import User
 from rest_framework import generics, status
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.parsers import MultiPartParser
+from rest_framework.utils.urls import replace_query_param
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from django.contrib.auth import authenticate
-from .models import Expense, Subscription, Budget, ChatUsage
+from .models import Expense, MonthlySpend, Subscription, Budget, ChatUsage, parse_weekly_limit
 from .serializers import UserSerializer, ExpenseSerializer, SubscriptionSerializer, BudgetSerializer, ChatUsageSerializer
+from .serializers import fast_expense_serializer, fast_subscription_serializer, serialize_occurrences
+from .dates import month_bounds, year_bounds, parse_date, parse_month
+from .pagination import KeysetPagination
+from .cache import cache_per_user, get_cache_stats, CACHED_SCOPES
+from .etags import conditional_get
+from .imports import open_text, iter_csv_rows, iter_ofx_rows, import_expenses
+from .exports import ExportParameterError, filter_export_queryset, parse_categories, streaming_export
+from .batch import BatchError, apply_expense_batch
+from .recurrence import expand_subscriptions, project_occurrences
+from .analytics import ANALYTICS_SECTIONS, spending_analytics
+from .search import search_expense_ids
+from .filters import FilterError, filter_expenses
+from .authentication import CookieJWTAuthentication
+from .context import TIMEFRAMES, get_financial_context
+from .metrics import HasMetricsToken, registry, render_metrics
+from .chat import build_chat_messages, build_system_content, create_completion, stream_completion, sse_event
+from .chat import completion_cache_key, get_cached_completion, cache_completion, get_chat_cache_stats
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from contextlib import aclosing
+from datetime import timedelta
+from dateutil.relativedelta import relativedelta
+from decimal import Decimal
+import asyncio
+import json
 import os
-from openai import OpenAI
+import time
 
 class CookieTokenObtainPairView(TokenObtainPairView):
     def finalize_response(self, request, response, *args, **kwargs):
@@ -81,13 +113,179 @@ class UserView(generics.CreateAPIView):
 class ExpenseListView(generics.ListCreateAPIView):
     serializer_class = ExpenseSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
     
     def get_queryset(self):
         return Expense.objects.filter(author=self.request.user).order_by('-date')
 
+    def get_etag_querysets(self, request):
+        return [Expense.objects.filter(author=request.user)]
+
+    @conditional_get
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        try:
+            queryset, self.keyset_ordering = filter_expenses(self.filter_queryset(self.get_queryset()), request.query_params)
+        except FilterError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        return Response(fast_expense_serializer.serialize(queryset))
+
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
 
+class ExpenseImportView(generics.GenericAPIView):
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser]
+    row_readers = {
+        'csv': iter_csv_rows,
+        'ofx': iter_ofx_rows,
+        'qfx': iter_ofx_rows,
+    }
+    
+    def post(self, request):
+        uploaded_file = request.FILES.get('file')
+        if not uploaded_file:
+            return Response({'error': 'A file is required'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        file_format = request.data.get('file_format') or os.path.splitext(uploaded_file.name)[1].lstrip('.')
+        read_rows = self.row_readers.get(file_format.lower())
+        if not read_rows:
+            return Response(
+                {'error': 'Unsupported file format. Use CSV or OFX.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        stream = open_text(uploaded_file)
+        try:
+            result = import_expenses(request.user, read_rows(stream))
+        except UnicodeDecodeError:
+            return Response({'error': 'File must be UTF-8 encoded'}, status=status.HTTP_400_BAD_REQUEST)
+        finally:
+            stream.detach()
+        
+        # A file whose rows were all skipped (e.g. an OFX statement of credits)
+        # is a valid import; only a file with nothing but bad rows is an error.
+        if result.errors and not result.created:
+            return Response(result.as_dict(), status=status.HTTP_400_BAD_REQUEST)
+        return Response(result.as_dict())
+
+class ExpenseBatchView(generics.GenericAPIView):
+    permission_classes = [IsAuthenticated]
+    
+    def post(self, request):
+        if not isinstance(request.data, dict):
+            return Response(
+                {'error': 'Request body must be an object with an operations list'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            ok, results = apply_expense_batch(request.user, request.data.get('operations'))
+        except BatchError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response(
+            {'applied': ok, 'results': results},
+            status=status.HTTP_200_OK if ok else status.HTTP_400_BAD_REQUEST
+        )
+
+class ExpenseExportView(generics.GenericAPIView):
+    permission_classes = [IsAuthenticated]
+    export_fields = ['id', 'title', 'date', 'amount', 'description', 'category', 'created_at']
+    
+    def get(self, request):
+        try:
+            expenses = filter_export_queryset(
+                Expense.objects.filter(author=request.user),
+                request.query_params,
+                'date'
+            ).order_by('date', 'id')
+            return streaming_export(expenses, self.export_fields, request.query_params, 'expenses')
+        except ExportParameterError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+class ExpenseAnalyticsView(generics.GenericAPIView):
+    permission_classes = [IsAuthenticated]
+    
+    @cache_per_user('expense-analytics')
+    def get(self, request):
+        today = timezone.now().date()
+        end = month_bounds(today.year, today.month)[1]
+        start = end - relativedelta(years=1)
+        try:
+            if request.query_params.get('start'):
+                start = parse_date(request.query_params['start'])
+            if request.query_params.get('end'):
+                end = parse_date(request.query_params['end'])
+        except ValueError:
+            return Response({'error': 'Dates must use the YYYY-MM-DD format'}, status=status.HTTP_400_BAD_REQUEST)
+        if end <= start:
+            return Response({'error': 'end must be after start'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        sections = [
+            section.strip()
+            for section in request.query_params.get('include', ','.join(ANALYTICS_SECTIONS)).split(',')
+            if section.strip()
+        ]
+        if not sections or any(section not in ANALYTICS_SECTIONS for section in sections):
+            return Response(
+                {'error': f'include must list some of: {", ".join(ANALYTICS_SECTIONS)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        expenses = Expense.objects.filter(author=request.user)
+        categories = parse_categories(request.query_params)
+        if categories:
+            expenses = expenses.filter(category__in=categories)
+        return Response(spending_analytics(expenses, start, end, sections))
+
+class ExpenseSearchView(generics.GenericAPIView):
+    permission_classes = [IsAuthenticated]
+    page_size = 50
+    max_page_size = 200
+    
+    def get(self, request):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({'error': 'q is required'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            start = parse_date(request.query_params['start']) if request.query_params.get('start') else None
+            end = parse_date(request.query_params['end']) if request.query_params.get('end') else None
+        except ValueError:
+            return Response({'error': 'Dates must use the YYYY-MM-DD format'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            page = int(request.query_params.get('page', 1))
+            page_size = int(request.query_params.get('page_size', self.page_size))
+        except ValueError:
+            return Response({'error': 'page and page_size must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+        if page < 1 or page_size < 1:
+            return Response({'error': 'page and page_size must be positive'}, status=status.HTTP_400_BAD_REQUEST)
+        page_size = min(page_size, self.max_page_size)
+        
+        # Fetch one extra id to know whether another page exists without a COUNT.
+        ids = search_expense_ids(
+            request.user, query, start=start, end=end,
+            categories=parse_categories(request.query_params),
+            limit=page_size + 1, offset=(page - 1) * page_size
+        )
+        next_link = None
+        if len(ids) > page_size:
+            ids = ids[:page_size]
+            next_link = replace_query_param(request.build_absolute_uri(), 'page', page + 1)
+        
+        rows = {row['id']: row for row in fast_expense_serializer.serialize(Expense.objects.filter(id__in=ids))}
+        return Response({
+            'next': next_link,
+            'results': [rows[expense_id] for expense_id in ids if expense_id in rows],
+        })
+
 class ExpenseDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = ExpenseSerializer
     permission_classes = [IsAuthenticated]
@@ -98,65 +296,76 @@ class ExpenseDetailView(generics.RetrieveUpdateDestroyAPIView):
 class MonthlyExpenseView(generics.GenericAPIView):
     permission_classes = [IsAuthenticated]
     
+    @cache_per_user('expenses-monthly')
     def get(self, request):
         user = request.user
         current_month = timezone.now().month
         current_year = timezone.now().year
+        month_start, month_end = month_bounds(current_year, current_month)
         
         monthly_expenses = Expense.objects.filter(
             author=user,
-            date__month=current_month,
-            date__year=current_year
+            date__gte=month_start,
+            date__lt=month_end
         ).order_by('-date')
         
-        total_amount = monthly_expenses.aggregate(total=Sum('amount'))['total'] or 0
-        
-        expense_serializer = ExpenseSerializer(monthly_expenses, many=True)
+        total_amount = MonthlySpend.total_for(user, month_start, month_end)
         
         return Response({
             'month': current_month,
             'year': current_year,
             'total': float(total_amount),
-            'expenses': expense_serializer.data
+            'expenses': fast_expense_serializer.serialize(monthly_expenses)
         })
 
 class YearlyExpenseView(generics.GenericAPIView):
     permission_classes = [IsAuthenticated]
     
+    @cache_per_user('expenses-yearly')
     def get(self, request):
         user = request.user
         current_year = timezone.now().year
+        year_start, year_end = year_bounds(current_year)
         
         yearly_expenses = Expense.objects.filter(
             author=user,
-            date__year=current_year
+            date__gte=year_start,
+            date__lt=year_end
         ).order_by('-date')
         
-        total_amount = yearly_expenses.aggregate(total=Sum('amount'))['total'] or 0
-        
-        expense_serializer = ExpenseSerializer(yearly_expenses, many=True)
+        total_amount = MonthlySpend.total_for(user, year_start, year_end)
         
         return Response({
             'year': current_year,
             'total': float(total_amount),
-            'expenses': expense_serializer.data
+            'expenses': fast_expense_serializer.serialize(yearly_expenses)
         })
 
 class AllTimeExpenseView(generics.GenericAPIView):
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
     
     def get(self, request):
         user = request.user
         
         all_expenses = Expense.objects.filter(author=user).order_by('-date')
         
-        total_amount = all_expenses.aggregate(total=Sum('amount'))['total'] or 0
+        page = self.paginate_queryset(all_expenses)
+        if page is not None:
+            data = {
+                'next': self.paginator.get_next_link(),
+                'expenses': ExpenseSerializer(page, many=True).data
+            }
+            if self.paginator.is_first_page:
+                total_amount = MonthlySpend.total_for(user)
+                data['total'] = float(total_amount)
+            return Response(data)
         
-        expense_serializer = ExpenseSerializer(all_expenses, many=True)
+        total_amount = MonthlySpend.total_for(user)
         
         return Response({
             'total': float(total_amount),
-            'expenses': expense_serializer.data
+            'expenses': fast_expense_serializer.serialize(all_expenses)
         })
 
 class SubscriptionListView(generics.ListCreateAPIView):
@@ -166,6 +375,17 @@ class SubscriptionListView(generics.ListCreateAPIView):
     def get_queryset(self):
         return Subscription.objects.filter(author=self.request.user).order_by('renewal_date')
 
+    def get_etag_querysets(self, request):
+        return [Subscription.objects.filter(author=request.user)]
+
+    @conditional_get
+    @cache_per_user('subscriptions')
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        return Response(fast_subscription_serializer.serialize(self.get_queryset()))
+
     def perform_create(self, serializer):
         subscription = serializer.save(author=self.request.user)
         return subscription
@@ -181,6 +401,21 @@ class ActiveSubscriptionListView(generics.ListCreateAPIView):
         subscription = serializer.save(author=self.request.user)
         return subscription
 
+class SubscriptionExportView(generics.GenericAPIView):
+    permission_classes = [IsAuthenticated]
+    export_fields = ['id', 'title', 'amount', 'frequency', 'renewal_date', 'category', 'is_active', 'created_at']
+    
+    def get(self, request):
+        try:
+            subscriptions = filter_export_queryset(
+                Subscription.objects.filter(author=request.user),
+                request.query_params,
+                'renewal_date'
+            ).order_by('renewal_date', 'id')
+            return streaming_export(subscriptions, self.export_fields, request.query_params, 'subscriptions')
+        except ExportParameterError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
 class SubscriptionDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = SubscriptionSerializer
     permission_classes = [IsAuthenticated]
@@ -193,7 +428,7 @@ class SubscriptionTotalView(generics.GenericAPIView):
     
     def get(self, request):
         user = request.user
-        total = Subscription.objects.filter(author=user, is_active=True).aggregate(total=Sum('amount'))['total'] or 0
+        total = Subscription.cost_totals(Subscription.objects.filter(author=user, is_active=True))['total']
         return Response({'total': total})
 
 class SubscriptionRenewView(generics.GenericAPIView):
@@ -225,22 +460,18 @@ class MonthlySubscriptionView(generics.GenericAPIView):
         user = request.user
         current_month = timezone.now().month
         current_year = timezone.now().year
+        month_start, month_end = month_bounds(current_year, current_month)
         
         monthly_subscriptions = Subscription.objects.filter(
             author=user,
             is_active=True,
-            renewal_date__month=current_month,
-            renewal_date__year=current_year
+            renewal_date__gte=month_start,
+            renewal_date__lt=month_end
         ).order_by('renewal_date')
         
-        monthly_total = 0
-        all_active_subs = Subscription.objects.filter(author=user, is_active=True)
-        
-        for sub in all_active_subs:
-            if sub.frequency == 'monthly':
-                monthly_total += float(sub.amount)
-            else:
-                monthly_total += float(sub.amount) / 12
+        monthly_total = float(Subscription.cost_totals(
+            Subscription.objects.filter(author=user, is_active=True)
+        )['monthly'])
         
         subscription_serializer = SubscriptionSerializer(monthly_subscriptions, many=True)
         
@@ -264,13 +495,7 @@ class YearlySubscriptionView(generics.GenericAPIView):
             is_active=True
         ).order_by('renewal_date')
         
-        # Calculate yearly total
-        yearly_total = 0
-        for sub in yearly_subscriptions:
-            if sub.frequency == 'monthly':
-                yearly_total += float(sub.amount) * 12
-            else:  # yearly
-                yearly_total += float(sub.amount)
+        yearly_total = float(Subscription.cost_totals(yearly_subscriptions)['yearly'])
         
         subscription_serializer = SubscriptionSerializer(yearly_subscriptions, many=True)
         
@@ -280,6 +505,58 @@ class YearlySubscriptionView(generics.GenericAPIView):
             'subscriptions': subscription_serializer.data
         })
 
+class SubscriptionForecastView(generics.GenericAPIView):
+    permission_classes = [IsAuthenticated]
+    max_months = 60
+    
+    @cache_per_user('subscription-forecast')
+    def get(self, request):
+        try:
+            months = int(request.query_params.get('months', 12))
+        except ValueError:
+            months = 0
+        if not 1 <= months <= self.max_months:
+            return Response(
+                {'error': f'months must be between 1 and {self.max_months}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        today = timezone.now().date()
+        last_year, last_month = divmod(today.month - 1 + months - 1, 12)
+        end = month_bounds(today.year + last_year, last_month + 1)[1]
+        
+        # Subscriptions sharing a renewal date and frequency renew together, so
+        # each group is projected once with its summed amount.
+        groups = Subscription.objects.filter(
+            author=request.user,
+            is_active=True,
+            renewal_date__lt=end
+        ).values_list('renewal_date', 'frequency').annotate(
+            group_total=Sum('amount'),
+            group_count=Count('id')
+        ).order_by()
+        
+        buckets = {}
+        for renewal_date, frequency, group_total, group_count in groups:
+            for occurrence in project_occurrences(renewal_date, frequency, today, end):
+                bucket = buckets.setdefault((occurrence.year, occurrence.month), [Decimal('0'), 0])
+                bucket[0] += group_total
+                bucket[1] += group_count
+        
+        forecast = []
+        year, month = today.year, today.month
+        for _ in range(months):
+            total, count = buckets.get((year, month), (Decimal('0'), 0))
+            forecast.append({'year': year, 'month': month, 'total': float(total), 'count': count})
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        
+        return Response({
+            'start': today.isoformat(),
+            'end': end.isoformat(),
+            'total': float(sum(bucket[0] for bucket in buckets.values())),
+            'months': forecast
+        })
+
 class SubscriptionToggleActiveView(generics.GenericAPIView):
     permission_classes = [IsAuthenticated]
     
@@ -351,6 +628,7 @@ class BudgetDetailView(generics.RetrieveUpdateDestroyAPIView):
 class CurrentBudgetView(generics.GenericAPIView):
     permission_classes = [IsAuthenticated]
     
+    @cache_per_user('current-budget')
     def get(self, request):
         current_budget = Budget.objects.filter(
             author=request.user,
@@ -372,35 +650,55 @@ class CurrentBudgetView(generics.GenericAPIView):
 class CalendarView(generics.GenericAPIView):
     permission_classes = [IsAuthenticated]
     
+    def get_period(self, request):
+        return parse_month(request.query_params, timezone.now().date())
+    
+    def get_etag_querysets(self, request):
+        month_start, month_end = month_bounds(*self.get_period(request))
+        
+        return [
+            Expense.objects.filter(author=request.user, date__gte=month_start, date__lt=month_end),
+            Subscription.objects.filter(
+                author=request.user,
+                is_active=True,
+                renewal_date__lt=month_end
+            ),
+            Budget.objects.filter(author=request.user, is_active=True)
+        ]
+    
+    @conditional_get
     def get(self, request):
-        month = int(request.query_params.get('month', timezone.now().month))
-        year = int(request.query_params.get('year', timezone.now().year))
+        try:
+            year, month = self.get_period(request)
+        except ValueError:
+            return Response(
+                {'error': 'month must be 1-12 and year a valid year'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
         user = request.user
+        month_start, month_end = month_bounds(year, month)
         
         monthly_expenses = Expense.objects.filter(
             author=user,
-            date__month=month,
-            date__year=year
+            date__gte=month_start,
+            date__lt=month_end
         ).order_by('date')
         
-        monthly_subscriptions = Subscription.objects.filter(
+        # Every active subscription renewing before the month ends may recur in it.
+        active_subscriptions = Subscription.objects.filter(
             author=user,
             is_active=True,
-            renewal_date__month=month,
-            renewal_date__year=year
-        ).order_by('renewal_date')
+            renewal_date__lt=month_end
+        )
+        occurrences = expand_subscriptions(active_subscriptions, month_start, month_end)
         
         expense_serializer = ExpenseSerializer(monthly_expenses, many=True)
-        subscription_serializer = SubscriptionSerializer(monthly_subscriptions, many=True)
         
-        total_expenses = monthly_expenses.aggregate(
-            total=Sum('amount')
-        )['total'] or 0
+        total_expenses = MonthlySpend.total_for(user, month_start, month_end)
         
-        total_subscriptions = monthly_subscriptions.aggregate(
-            total=Sum('amount')
-        )['total'] or 0
+        total_subscriptions = sum((subscription.amount for subscription, _ in occurrences), Decimal('0'))
+        renewing_ids = {subscription.id for subscription, _ in occurrences}
         
         current_budget = Budget.objects.filter(
             author=user,
@@ -409,13 +707,10 @@ class CalendarView(generics.GenericAPIView):
         
         budget_amount = float(current_budget.amount) if current_budget and current_budget.amount else 0
         
-        # Calculate monthly subscription cost for remaining budget
-        monthly_subscription_cost = 0
-        for sub in monthly_subscriptions:
-            if sub.frequency == 'monthly':
-                monthly_subscription_cost += float(sub.amount)
-            else:  # yearly
-                monthly_subscription_cost += float(sub.amount) / 12
+        # Monthly subscription cost for remaining budget
+        monthly_subscription_cost = float(Subscription.cost_totals(
+            active_subscriptions.filter(id__in=renewing_ids)
+        )['monthly'])
         
         remaining_budget = budget_amount - float(total_expenses) - monthly_subscription_cost
         
@@ -423,7 +718,7 @@ class CalendarView(generics.GenericAPIView):
             'month': month,
             'year': year,
             'expenses': expense_serializer.data,
-            'subscriptions': subscription_serializer.data,
+            'subscriptions': serialize_occurrences(occurrences),
             'summary': {
                 'total_expenses': float(total_expenses),
                 'total_subscriptions': float(total_subscriptions),
@@ -433,37 +728,131 @@ class CalendarView(generics.GenericAPIView):
             }
         })
 
+class CalendarHeatmapView(generics.GenericAPIView):
+    permission_classes = [IsAuthenticated]
+    max_days = 5 * 366
+    
+    @cache_per_user('calendar-heatmap')
+    def get(self, request):
+        today = timezone.now().date()
+        start, end = year_bounds(today.year)
+        try:
+            if request.query_params.get('start'):
+                start = parse_date(request.query_params['start'])
+            if request.query_params.get('end'):
+                end = parse_date(request.query_params['end'])
+        except ValueError:
+            return Response({'error': 'Dates must use the YYYY-MM-DD format'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        if not 0 < (end - start).days <= self.max_days:
+            return Response(
+                {'error': f'end must be after start and at most {self.max_days} days later'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        split = request.query_params.get('split') == 'category'
+        fields = ('date', 'category') if split else ('date',)
+        rows = Expense.objects.filter(
+            author=request.user,
+            date__gte=start,
+            date__lt=end
+        ).values_list(*fields).annotate(
+            day_total=Sum('amount'),
+            day_count=Count('id')
+        ).order_by(*fields)
+        
+        days = {}
+        
+        def get_day(day):
+            if day not in days:
+                days[day] = {
+                    'total': Decimal('0'),
+                    'count': 0,
+                    'subscription_total': Decimal('0'),
+                    'subscription_count': 0
+                }
+                if split:
+                    days[day]['categories'] = {}
+            return days[day]
+        
+        for row in rows:
+            day = get_day(row[0])
+            day['total'] += row[-2]
+            day['count'] += row[-1]
+            if split:
+                day['categories'][row[1]] = {'total': float(row[-2]), 'count': row[-1]}
+        
+        groups = Subscription.objects.filter(
+            author=request.user,
+            is_active=True,
+            renewal_date__lt=end
+        ).values_list('renewal_date', 'frequency').annotate(
+            group_total=Sum('amount'),
+            group_count=Count('id')
+        ).order_by()
+        for renewal_date, frequency, group_total, group_count in groups:
+            for occurrence in project_occurrences(renewal_date, frequency, start, end):
+                day = get_day(occurrence)
+                day['subscription_total'] += group_total
+                day['subscription_count'] += group_count
+        
+        results = []
+        for day in sorted(days):
+            values = days[day]
+            values['total'] = float(values['total'])
+            values['subscription_total'] = float(values['subscription_total'])
+            results.append({'date': day.isoformat(), **values})
+        
+        return Response({
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'max_total': max((day['total'] for day in results), default=0),
+            'days': results
+        })
+
+class CalendarDayView(generics.GenericAPIView):
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        try:
+            day = parse_date(request.query_params.get('date', ''))
+        except ValueError:
+            return Response({'error': 'date must use the YYYY-MM-DD format'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        expenses = Expense.objects.filter(author=request.user, date=day).order_by('id')
+        subscriptions = Subscription.objects.filter(
+            author=request.user,
+            is_active=True,
+            renewal_date__lte=day
+        )
+        occurrences = expand_subscriptions(subscriptions, day, day + timedelta(days=1))
+        
+        return Response({
+            'date': day.isoformat(),
+            'expenses': fast_expense_serializer.serialize(expenses),
+            'subscriptions': serialize_occurrences(occurrences)
+        })
+
 class DashboardSummaryView(generics.GenericAPIView):
     permission_classes = [IsAuthenticated]
     
+    @cache_per_user('dashboard-summary')
     def get(self, request):
         user = request.user
         
         current_month = timezone.now().month
         current_year = timezone.now().year
-        
-        monthly_expenses = Expense.objects.filter(
-            author=user,
-            date__month=current_month,
-            date__year=current_year
-        )     
+        month_start, month_end = month_bounds(current_year, current_month)
 
         active_subscriptions = Subscription.objects.filter(
             author=user,
             is_active=True
         )
         
-        total_expenses = monthly_expenses.aggregate(
-            total=Sum('amount')
-        )['total'] or 0
+        total_expenses = MonthlySpend.total_for(user, month_start, month_end)
         
-        # Calculate monthly subscription cost (same as for remaining budget)
-        monthly_subscription_cost = 0
-        for sub in active_subscriptions:
-            if sub.frequency == 'monthly':
-                monthly_subscription_cost += float(sub.amount)
-            else:  # yearly
-                monthly_subscription_cost += float(sub.amount) / 12
+        # Monthly subscription cost (same as for remaining budget)
+        monthly_subscription_cost = float(Subscription.cost_totals(active_subscriptions)['monthly'])
         
         total_subscriptions = monthly_subscription_cost
         
@@ -483,6 +872,28 @@ class DashboardSummaryView(generics.GenericAPIView):
             'remaining_budget': float(remaining_budget)
         })
 
+class CacheStatsView(generics.GenericAPIView):
+    permission_classes = [IsAdminUser]
+    
+    def get(self, request):
+        stats = get_cache_stats(CACHED_SCOPES)
+        stats['chat'] = get_chat_cache_stats()
+        return Response(stats)
+
+class MetricsView(generics.GenericAPIView):
+    permission_classes = [HasMetricsToken | IsAdminUser]
+    
+    def permission_denied(self, request, message=None, code=None):
+        # Scrapers send the bearer token rather than a session cookie, so a
+        # refused scrape is forbidden, not a prompt to log in.
+        raise PermissionDenied(message, code)
+    
+    def get(self, request):
+        return HttpResponse(
+            render_metrics(registry.collect()),
+            content_type='text/plain; version=0.0.4; charset=utf-8'
+        )
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def update_user_account(request):
@@ -507,6 +918,7 @@ def update_user_account(request):
         if new_password:
             user.set_password(new_password)
         
+        # Saving evicts the user from the auth cache (api.authentication.evict_cached_user).
         user.save()
         
         return Response({
@@ -518,6 +930,19 @@ def update_user_account(request):
         return Response({'error': 'An error occurred'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+class ChatContextView(generics.GenericAPIView):
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        timeframe = request.query_params.get('timeframe', 'monthly')
+        if timeframe not in TIMEFRAMES:
+            return Response(
+                {'error': f'timeframe must be one of: {", ".join(TIMEFRAMES)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(get_financial_context(request.user, timeframe))
+
+
 class ChatUsageView(generics.GenericAPIView):
     permission_classes = [IsAuthenticated]
     
@@ -530,18 +955,23 @@ class ChatUsageView(generics.GenericAPIView):
             return Response({'error': 'An error occurred'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
     def post(self, request):
+        if not isinstance(request.data, dict):
+            return Response({'error': 'Request body must be an object'}, status=status.HTTP_400_BAD_REQUEST)
         try:
-            weekly_limit = request.data.get('weekly_limit', 5)
-            
-            if not ChatUsage.can_send_message(request.user, weekly_limit):
+            weekly_limit = parse_weekly_limit(request.data.get('weekly_limit', 5))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            allowed, new_count = ChatUsage.reserve_message(request.user, weekly_limit)
+            if not allowed:
+                registry.inc('spendio_chat_quota_rejections_total', view='usage')
                 return Response({
                     'can_send': False,
                     'message': f'Weekly limit of {weekly_limit} messages reached. Please try again next week.',
-                    'current_count': ChatUsage.get_current_week_usage(request.user).message_count
+                    'current_count': new_count
                 }, status=status.HTTP_429_TOO_MANY_REQUESTS)
             
-            new_count = ChatUsage.increment_usage(request.user)
-            
             return Response({
                 'can_send': True,
                 'message': 'Message sent successfully',
@@ -553,132 +983,178 @@ class ChatUsageView(generics.GenericAPIView):
             return Response({'error': 'An error occurred'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-class ChatView(generics.GenericAPIView):
-    permission_classes = [IsAuthenticated]
+@method_decorator(csrf_exempt, name='dispatch')
+class ChatView(View):
+    http_method_names = ['post']
     
-    def post(self, request):
+    async def post(self, request):
+        user = await CookieJWTAuthentication().authenticate_async(request)
+        if user is None:
+            return JsonResponse(
+                {'detail': 'Authentication credentials were not provided.'},
+                status=status.HTTP_401_UNAUTHORIZED
+            )
+        
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            return JsonResponse({'error': 'Request body must be valid JSON'}, status=status.HTTP_400_BAD_REQUEST)
+        if not isinstance(data, dict):
+            return JsonResponse({'error': 'Request body must be a JSON object'}, status=status.HTTP_400_BAD_REQUEST)
+        
         try:
-            message = request.data.get('message', '').strip()
-            conversation_history = request.data.get('conversation_history', [])
-            financial_data = request.data.get('financial_data', None)
-            weekly_limit = request.data.get('weekly_limit', 5)
+            message = data.get('message', '').strip()
+            conversation_history = data.get('conversation_history', [])
+            # Older clients sent the whole financial_data payload; only its
+            # timeframe is used now, the figures come from the database.
+            timeframe = data.get('timeframe') or (data.get('financial_data') or {}).get('timeframe')
+            
+            try:
+                weekly_limit = parse_weekly_limit(data.get('weekly_limit', 5))
+            except ValueError as e:
+                return JsonResponse({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
             
             if not message:
-                return Response(
+                return JsonResponse(
                     {'error': 'Message is required'}, 
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
             if len(message) > 900:
-                return Response(
+                return JsonResponse(
                     {'error': 'Message too long. Maximum 900 characters allowed.'}, 
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            if not ChatUsage.can_send_message(request.user, weekly_limit):
-                return Response({
-                    'error': f'Weekly limit of {weekly_limit} messages reached. Please try again next week.',
-                    'current_count': ChatUsage.get_current_week_usage(request.user).message_count
-                }, status=status.HTTP_429_TOO_MANY_REQUESTS)
+            if timeframe is not None and timeframe not in TIMEFRAMES:
+                return JsonResponse(
+                    {'error': f'timeframe must be one of: {", ".join(TIMEFRAMES)}'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
             
-            system_content ='''You are a specialized financial assistant focused on personal finance and budgeting advice. Your core responsibilities:
-
-                                1. Financial Focus: Only provide advice on finance, budgeting, spending, saving, and related topics. If asked about unrelated topics, politely redirect to financial matters.
-
-                                2. Data-Driven Analysis: When financial data is provided (expenses, budgets, subscriptions), analyze it thoroughly and provide specific, actionable advice on:
-                                - Budget optimization
-                                - Cost reduction opportunities
-                                - Spending pattern analysis
-                                - Savings recommendations
-                                - Subscription management
-
-                                3. Concise Responses: Keep all responses under 900 characters while being comprehensive and actionable.
-
-                                4. Practical Advice: Focus on realistic, implementable suggestions that users can act on immediately.
-
-                                5. Professional Tone: Be helpful, accurate, and professional while maintaining a friendly approach.
-
-                                6. No Formatting: Do not use markdown formatting, quotes, or special characters. Write in plain text only.
-
-                                Always prioritize actionable financial insights over general information.
-                            '''
-
-            if financial_data:
-                expenses = financial_data.get('expenses', {})
-                budget = financial_data.get('budget', {})
-                subscriptions = financial_data.get('subscriptions', [])
-                
-                system_content += f'''
-
-                                    CURRENT FINANCIAL DATA CONTEXT:
-                                    Timeframe: {financial_data.get('timeframe', 'Unknown')}
-
-                                    Expenses: ${float(expenses.get('total', 0))} total ({len(expenses.get('expenses', []))} transactions)
-                                    Budget: ${float(budget.get('amount', 0))} (monthly)
-                                    Active Subscriptions: {len(subscriptions)} subscriptions (${sum(float(sub.get('amount', 0)) for sub in subscriptions)} total monthly)
-
-                                    Use this data to provide specific, personalized financial advice.
-                                '''
-
-            messages = [
-                {
-                    'role': 'system',
-                    'content': system_content
-                }
-            ]
+            context = None
+            if timeframe:
+                context = await sync_to_async(get_financial_context)(user, timeframe)
             
-            for msg in conversation_history[-4:]:
-                if msg.get('type') == 'user':
-                    messages.append({
-                        'role': 'user',
-                        'content': msg.get('content', '')
-                    })
-                elif msg.get('type') == 'ai':
-                    messages.append({
-                        'role': 'assistant',
-                        'content': msg.get('content', '')
-                    })
+            messages = build_chat_messages(
+                build_system_content(context),
+                conversation_history,
+                message
+            )
             
-            messages.append({
-                'role': 'user',
-                'content': message
-            })
+            stream = data.get('stream') or request.GET.get('stream') == '1'
+            cache_key = completion_cache_key(messages)
+            cached_response = await get_cached_completion(cache_key)
             
-            openai_api_key = os.getenv('OPEN_AI_API_KEY')
-            if not openai_api_key:
-                return Response(
+            if cached_response is None and not os.getenv('OPEN_AI_API_KEY'):
+                return JsonResponse(
                     {'error': 'OpenAI API key not configured. Please check your environment variables.'}, 
                     status=status.HTTP_500_INTERNAL_SERVER_ERROR
                 )
             
+            # The message is counted up front so concurrent requests cannot all
+            # pass the limit, and given back if no answer is delivered.
+            if cached_response is None or settings.CHAT_CACHE_HITS_COUNT_AGAINST_QUOTA:
+                allowed, new_count = await ChatUsage.areserve_message(user, weekly_limit)
+                if not allowed:
+                    registry.inc('spendio_chat_quota_rejections_total', view='chat')
+                    return JsonResponse({
+                        'error': f'Weekly limit of {weekly_limit} messages reached. Please try again next week.',
+                        'current_count': new_count
+                    }, status=status.HTTP_429_TOO_MANY_REQUESTS)
+            else:
+                new_count = await ChatUsage.aget_current_count(user)
+            
+            if stream:
+                return self.stream(user, messages, new_count, weekly_limit, cache_key, cached_response)
+            
+            if cached_response is not None:
+                return JsonResponse({
+                    'message': cached_response,
+                    'current_count': new_count,
+                    'remaining': weekly_limit - new_count,
+                    'cached': True
+                })
+            
             try:
-                client = OpenAI(api_key=openai_api_key)
-                
-                response = client.chat.completions.create(
-                    model="gpt-4o-mini",
-                    messages=messages,
-                    max_tokens=900,
-                    temperature=0.7,
-                    user=str(request.user.id)
-                )
-                
-                ai_response = response.choices[0].message.content
-                    
+                started = time.perf_counter()
+                ai_response = await create_completion(messages, user.id)
             except Exception as e:
-                return Response({
+                registry.observe(
+                    'spendio_chat_upstream_duration_seconds',
+                    time.perf_counter() - started,
+                    mode='complete',
+                    outcome='error'
+                )
+                await ChatUsage.arelease_message(user)
+                return JsonResponse({
                     'error': f'OpenAI API error: {str(e)}'
                 }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
             
-            new_count = ChatUsage.increment_usage(request.user)
+            latency = time.perf_counter() - started
+            registry.observe('spendio_chat_upstream_duration_seconds', latency, mode='complete', outcome='ok')
+            await cache_completion(cache_key, ai_response, latency)
     
-            return Response({
+            return JsonResponse({
                 'message': ai_response,
                 'current_count': new_count,
-                'remaining': weekly_limit - new_count
+                'remaining': weekly_limit - new_count,
+                'cached': False
             })
             
         except Exception as e:
-            return Response(
+            return JsonResponse(
                 {'error': 'An error occurred'}, 
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+    
+    def stream(self, user, messages, new_count, weekly_limit, cache_key, cached_response=None):
+        async def events():
+            if cached_response is not None:
+                yield sse_event('token', {'content': cached_response})
+                yield sse_event('done', {
+                    'current_count': new_count,
+                    'remaining': weekly_limit - new_count,
+                    'cached': True
+                })
+                return
+            
+            chunks = []
+            error = None
+            started = time.perf_counter()
+            
+            try:
+                async with aclosing(stream_completion(messages, user.id)) as contents:
+                    async for content in contents:
+                        chunks.append(content)
+                        yield sse_event('token', {'content': content})
+            except Exception as e:
+                error = str(e)
+            finally:
+                latency = time.perf_counter() - started
+                registry.observe(
+                    'spendio_chat_upstream_duration_seconds',
+                    latency,
+                    mode='stream',
+                    outcome='ok' if chunks and not error else 'error'
+                )
+                # Give the reserved message back if the user received nothing. The
+                # shield keeps the write alive when the client disconnects.
+                if not chunks:
+                    await asyncio.shield(ChatUsage.arelease_message(user))
+            
+            if chunks and not error:
+                await cache_completion(cache_key, ''.join(chunks), latency)
+            if error:
+                yield sse_event('error', {'error': f'OpenAI API error: {error}'})
+            if chunks:
+                yield sse_event('done', {
+                    'current_count': new_count,
+                    'remaining': weekly_limit - new_count,
+                    'cached': False
+                })
+        
+        response = StreamingHttpResponse(events(), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
@@ -40,6 +40,10 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
+    "DEFAULT_RENDERER_CLASSES": [
+        "api.timing.TimedJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
 }
 
 SIMPLE_JWT = {
@@ -54,6 +58,42 @@ SIMPLE_JWT = {
     "AUTH_COOKIE_SAMESITE": "Lax",
 }
 
+# Opt-in: resolve authenticated users from a per-process cache instead of
+# querying auth_user on every request. Saving a user evicts them in the process
+# that saved; other workers keep accepting the cached copy until it expires
+# after AUTH_USER_CACHE_TTL seconds. That covers deactivation too: a user set
+# is_active=False can still authenticate on other workers for up to the TTL.
+AUTH_USER_CACHE_ENABLED = os.getenv('AUTH_USER_CACHE_ENABLED', 'False').lower() == 'true'
+AUTH_USER_CACHE_TTL = int(os.getenv('AUTH_USER_CACHE_TTL', 60))
+AUTH_USER_CACHE_SIZE = int(os.getenv('AUTH_USER_CACHE_SIZE', 1024))
+
+# Per-request timing (api.middleware.RequestTimingMiddleware). Sampled requests
+# get a Server-Timing header; any request slower than the threshold is logged.
+REQUEST_TIMING_ENABLED = os.getenv('REQUEST_TIMING_ENABLED', 'True').lower() == 'true'
+REQUEST_TIMING_SAMPLE_RATE = float(os.getenv('REQUEST_TIMING_SAMPLE_RATE', '1.0' if DEBUG else '0.1'))
+SLOW_REQUEST_THRESHOLD_MS = float(os.getenv('SLOW_REQUEST_THRESHOLD_MS', 500))
+SLOW_REQUEST_TOP_SQL = int(os.getenv('SLOW_REQUEST_TOP_SQL', 5))
+
+# Metrics served at /metrics (api.metrics), recorded by the timing middleware.
+# Under gunicorn set METRICS_DIR so every worker's values are merged into each
+# scrape, and empty that directory before the server starts. Scrapers send
+# "Authorization: Bearer <METRICS_TOKEN>"; staff users can always read it.
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True').lower() == 'true'
+METRICS_DIR = os.getenv('METRICS_DIR', '')
+METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', 5))
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'api.middleware': {'handlers': ['console'], 'level': 'WARNING', 'propagate': False},
+    },
+}
+
 # Application definition
 
 INSTALLED_APPS = [
@@ -69,6 +109,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.RequestTimingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -120,9 +161,52 @@ else:
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            # A file rather than the shared-cache in-memory database, so tests
+            # running queries from several threads wait for locks instead of failing.
+            'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
         }
     }
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Response caching relies on a cache shared by all workers in production
+# (e.g. CACHE_BACKEND=django.core.cache.backends.redis.RedisCache): with a
+# per-process LocMemCache a write handled by one worker would not invalidate the
+# responses cached by the others.
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'spendio'),
+    },
+    # Chat completions are cached separately so they can be sized and evicted
+    # (least recently used first) without pushing out response caches.
+    'chat': {
+        'BACKEND': os.getenv('CHAT_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CHAT_CACHE_LOCATION', 'spendio-chat'),
+        'TIMEOUT': int(os.getenv('CHAT_CACHE_TIMEOUT', 60 * 60 * 24)),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('CHAT_CACHE_MAX_ENTRIES', 1000)),
+        },
+    },
+}
+
+RESPONSE_CACHE_TIMEOUT = int(os.getenv('RESPONSE_CACHE_TIMEOUT', 300))
+# On by default only with a cache shared between workers; a single-process
+# development server may opt in with RESPONSE_CACHE_ENABLED=True.
+RESPONSE_CACHE_ENABLED = os.getenv(
+    'RESPONSE_CACHE_ENABLED',
+    str('locmem' not in CACHES['default']['BACKEND'])
+).lower() == 'true'
+
+# Chat upstream (OpenAI-compatible API)
+
+OPENAI_BASE_URL = os.getenv('OPENAI_BASE_URL', '')
+CHAT_MAX_CONCURRENT_REQUESTS = int(os.getenv('CHAT_MAX_CONCURRENT_REQUESTS', 8))
+CHAT_UPSTREAM_TIMEOUT = float(os.getenv('CHAT_UPSTREAM_TIMEOUT', 30))
+CHAT_UPSTREAM_MAX_RETRIES = int(os.getenv('CHAT_UPSTREAM_MAX_RETRIES', 1))
+CHAT_CACHE_HITS_COUNT_AGAINST_QUOTA = os.getenv('CHAT_CACHE_HITS_COUNT_AGAINST_QUOTA', 'True').lower() == 'true'
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -16,7 +16,7 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
-from api.views import UserView, CookieTokenObtainPairView, CookieTokenRefreshView, logout_view
+from api.views import UserView, CookieTokenObtainPairView, CookieTokenRefreshView, MetricsView, logout_view
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
 urlpatterns = [
@@ -26,5 +26,6 @@ urlpatterns = [
     path("api/token/refresh/", CookieTokenRefreshView.as_view(), name="refresh-token"),
     path("api/logout/", logout_view, name="logout"),
     path("api-auth/", include("rest_framework.urls"), name="authentication"),
-    path("api/", include("api.urls"), name="extensions")
+    path("api/", include("api.urls"), name="extensions"),
+    path("metrics", MetricsView.as_view(), name="metrics")
 ]
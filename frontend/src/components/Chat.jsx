@@ -32,38 +32,13 @@ function Chat() {
     const sendData = async (timeframe) => {
         setDataLoading(true)
         try {
-            let data = {}
-            
-            let expensesResponse
-            switch (timeframe) {
-                case 'monthly':
-                    expensesResponse = await api.get('/api/expenses/monthly/')
-                    break
-                case 'yearly':
-                    expensesResponse = await api.get('/api/expenses/yearly/')
-                    break
-                case 'all-time':
-                    expensesResponse = await api.get('/api/expenses/all-time/')
-                    break
-                default:
-                    break
-            }
-            
-            const budgetResponse = await api.get('/api/budgets/current/')
-            
-            const subscriptionsResponse = await api.get('/api/subscriptions/')
-            
-            data = {
-                timeframe,
-                expenses: expensesResponse?.data || {},
-                budget: budgetResponse?.data || {},
-                subscriptions: subscriptionsResponse?.data || []
-            }
+            const contextResponse = await api.get('/api/chat/context/', { params: { timeframe } })
+            const data = contextResponse.data
             
             const userMessage = {
                 id: Date.now(),
                 type: 'user',
-                content: `Sent ${timeframe} financial data (${data.expenses?.expenses?.length || 0} expenses, ${data.subscriptions?.length || 0} subscriptions, ${data.budget?.amount ? '$' + data.budget.amount : 'no'} budget)`,
+                content: `Sent ${timeframe} financial data (${data.expense_count} expenses, ${data.subscription_count} subscriptions, ${data.budget_amount ? '$' + data.budget_amount : 'no'} budget)`,
                 timestamp: new Date().toLocaleTimeString(),
                 data: data
             }
@@ -135,7 +110,7 @@ function Chat() {
             const response = await api.post('/api/chat/message/', {
                 message: content,
                 conversation_history: conversationHistory,
-                financial_data: recentDataMessage?.data || null,
+                timeframe: recentDataMessage?.data.timeframe || null,
                 weekly_limit: weeklyLimit
             })
             